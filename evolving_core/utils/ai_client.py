@@ -4,7 +4,6 @@ AI Client - Claude API integration for analysis and categorization
 
 import os
 from typing import Dict, Any, Optional, List
-from anthropic import Anthropic
 
 
 class AIClient:
@@ -21,6 +20,9 @@ class AIClient:
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY must be provided or set in environment")
 
+        # Imported here so processes without an API key never load the SDK
+        from anthropic import Anthropic
+
         self.client = Anthropic(api_key=self.api_key)
         self.model = "claude-sonnet-4-20250514"  # Latest Sonnet
 
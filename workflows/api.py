@@ -6,11 +6,11 @@ REST API and WebSocket endpoints for workflow management.
 
 import asyncio
 import json
-from datetime import datetime
+import os
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Query
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
@@ -18,10 +18,13 @@ from workflows.engine import (
     WorkflowRunner,
     load_workflow,
     list_workflows,
-    WorkflowContext,
     StepStatus,
 )
 from workflows.engine.audit import AuditLogger
+from workflows.engine.context import generate_run_id
+from workflows.engine.run_index import RunIndex
+from workflows.engine.run_registry import RunRegistry
+from workflows.engine.streaming import RunStream
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -41,10 +44,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
-# Active workflow runs
-active_runs: Dict[str, Dict[str, Any]] = {}
+# Runs started by this service; completed runs are evicted and then
+# served from their logs. Set WORKFLOW_RUNS_DB to share runs between
+# several uvicorn workers.
+runs = RunRegistry(db_path=os.environ.get("WORKFLOW_RUNS_DB") or None)
+
+LOGS_DIR = Path("workflows/logs")
+
+# Run history (reads only what the runners appended since the last query)
+run_index = RunIndex(LOGS_DIR)
+
+# Idle WebSocket streams send a ping after this many seconds
+STREAM_KEEPALIVE_SECONDS = 30.0
+
+
+def _load_run_log(name: str, run_id: str) -> Optional[Dict[str, Any]]:
+    """Read the persisted log of a completed run."""
+    log_path = LOGS_DIR / f"{name}-{run_id}.json"
+    if not log_path.exists():
+        return None
+    return json.loads(log_path.read_text())
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -54,6 +76,7 @@ active_runs: Dict[str, Dict[str, Any]] = {}
 class WorkflowRunRequest(BaseModel):
     variables: Optional[Dict[str, Any]] = None
     dry_run: bool = False
+    incremental_from: Optional[str] = None
 
 
 class WorkflowRunResponse(BaseModel):
@@ -206,26 +229,19 @@ async def run_workflow(name: str, request: WorkflowRunRequest):
 
     runner = WorkflowRunner()
 
-    # Generate run ID
-    context = WorkflowContext(workflow_name=name)
-    run_id = context.run_id
-
-    # Store run info
-    active_runs[run_id] = {
-        "workflow_name": name,
-        "status": "starting",
-        "context": context,
-        "started_at": datetime.now().isoformat(),
-    }
+    # The runner's context uses the same run ID
+    run_id = generate_run_id()
+    record = runs.start(run_id, name, total_steps=len(workflow.steps))
 
     # Start execution in background
-    asyncio.create_task(_execute_workflow(runner, name, run_id, request))
+    task = asyncio.create_task(_execute_workflow(runner, name, run_id, request))
+    runs.attach(run_id, task=task)
 
     return WorkflowRunResponse(
         run_id=run_id,
         workflow_name=name,
         status="starting",
-        started_at=active_runs[run_id]["started_at"],
+        started_at=record.started_at,
         message="Workflow execution started",
     )
 
@@ -238,128 +254,98 @@ async def _execute_workflow(
 ):
     """Background task to execute workflow."""
     try:
-        active_runs[run_id]["status"] = "running"
+        runs.update(run_id, status="running")
 
         if request.dry_run:
-            result = await runner.dry_run(name, variables=request.variables)
+            execution = runner.dry_run(name, variables=request.variables)
         else:
-            result = await runner.run(name, variables=request.variables)
+            execution = runner.run(
+                name,
+                variables=request.variables,
+                incremental_from=request.incremental_from,
+                run_id=run_id,
+                on_context=lambda context: runs.attach(run_id, context=context),
+            )
+
+        # Mirror progress into the run record (shared with other workers)
+        follow = asyncio.create_task(runs.follow(run_id))
+        try:
+            result = await execution
+        finally:
+            follow.cancel()
 
-        active_runs[run_id]["status"] = result.status.value
-        active_runs[run_id]["result"] = result
-        active_runs[run_id]["completed_at"] = datetime.now().isoformat()
+        runs.complete(run_id, result.status.value, result=result)
+
+    except asyncio.CancelledError:
+        runs.complete(run_id, "stopped")
 
     except Exception as e:
-        active_runs[run_id]["status"] = "failed"
-        active_runs[run_id]["error"] = str(e)
-        active_runs[run_id]["completed_at"] = datetime.now().isoformat()
+        runs.complete(run_id, "failed", error=str(e))
 
 
 @app.get("/api/workflows/{name}/runs/{run_id}", response_model=WorkflowStatusResponse)
 async def get_run_status(name: str, run_id: str):
     """Get status of a workflow run."""
-    if run_id not in active_runs:
-        # Try to load from logs
-        log_path = Path(f"workflows/logs/{name}-{run_id}.json")
-        if log_path.exists():
-            log_data = json.loads(log_path.read_text())
-            return WorkflowStatusResponse(
-                run_id=run_id,
-                workflow_name=name,
-                status=log_data.get("status", "unknown"),
-                current_step=len(log_data.get("step_results", {})),
-                total_steps=len(log_data.get("step_results", {})),
-                progress_percent=100.0,
-                tokens_used=log_data.get("total_tokens", 0),
-                cost=log_data.get("total_cost", 0.0),
-                started_at=log_data.get("started_at", ""),
-                completed_at=log_data.get("completed_at"),
-                error=log_data.get("error"),
-            )
-        raise HTTPException(status_code=404, detail="Run not found")
-
-    run = active_runs[run_id]
-    context = run.get("context")
-    result = run.get("result")
-
-    if result:
-        total_steps = len(result.step_results)
-        current_step = total_steps
-        progress = 100.0
-    elif context:
-        workflow = load_workflow(name)
-        total_steps = len(workflow.steps)
-        current_step = context.current_step
-        progress = (current_step / total_steps * 100) if total_steps > 0 else 0
-    else:
-        total_steps = 0
-        current_step = 0
-        progress = 0
+    record = runs.get(run_id)
+
+    if record is None:
+        # Evicted or started elsewhere - load from logs
+        log_data = _load_run_log(name, run_id)
+        if log_data is None:
+            raise HTTPException(status_code=404, detail="Run not found")
+        return WorkflowStatusResponse(
+            run_id=run_id,
+            workflow_name=name,
+            status=log_data.get("status", "unknown"),
+            current_step=len(log_data.get("step_results", {})),
+            total_steps=len(log_data.get("step_results", {})),
+            progress_percent=100.0,
+            tokens_used=log_data.get("total_tokens", 0),
+            cost=log_data.get("total_cost", 0.0),
+            started_at=log_data.get("started_at", ""),
+            completed_at=log_data.get("completed_at"),
+            error=log_data.get("error"),
+        )
 
     return WorkflowStatusResponse(
         run_id=run_id,
         workflow_name=name,
-        status=run["status"],
-        current_step=current_step,
-        total_steps=total_steps,
-        progress_percent=progress,
-        tokens_used=result.total_tokens if result else (context.token_usage if context else 0),
-        cost=result.total_cost if result else (context.cost if context else 0.0),
-        started_at=run["started_at"],
-        completed_at=run.get("completed_at"),
-        error=run.get("error"),
+        status=record.status,
+        current_step=record.current_step,
+        total_steps=record.total_steps,
+        progress_percent=record.progress_percent,
+        tokens_used=record.tokens_used,
+        cost=record.cost,
+        started_at=record.started_at,
+        completed_at=record.completed_at,
+        error=record.error,
     )
 
 
 @app.get("/api/workflows/{name}/runs/{run_id}/result", response_model=WorkflowResultResponse)
 async def get_run_result(name: str, run_id: str):
     """Get full result of a completed workflow run."""
-    # First check active runs
-    if run_id in active_runs:
-        run = active_runs[run_id]
-        result = run.get("result")
-
-        if not result:
-            raise HTTPException(status_code=400, detail="Run not completed yet")
+    record = runs.get(run_id)
+    if record is not None and record.active:
+        raise HTTPException(status_code=400, detail="Run not completed yet")
 
+    # Results are served from the run log, not kept in memory
+    log_data = _load_run_log(name, run_id)
+    if log_data is not None:
         steps = []
-        for step_name, step_data in result.step_results.items():
+        for step_name, metrics in log_data.get("steps", {}).items():
             steps.append(StepResult(
                 name=step_name,
-                status="success",
-                duration_ms=None,
-                tokens_used=None,
-                error=None,
-            ))
-
-        return WorkflowResultResponse(
-            run_id=run_id,
-            workflow_name=name,
-            status=result.status.value,
-            started_at=result.started_at.isoformat(),
-            completed_at=result.completed_at.isoformat() if result.completed_at else None,
-            duration_seconds=result.duration_seconds,
-            total_tokens=result.total_tokens,
-            total_cost=result.total_cost,
-            steps=steps,
-            variables=result.variables,
-            error=result.error,
-        )
-
-    # Try to load from logs
-    log_path = Path(f"workflows/logs/{name}-{run_id}.json")
-    if log_path.exists():
-        log_data = json.loads(log_path.read_text())
-
-        steps = []
-        for step_name in log_data.get("step_results", {}).keys():
-            steps.append(StepResult(
-                name=step_name,
-                status="success",
-                duration_ms=None,
-                tokens_used=None,
-                error=None,
+                status=metrics.get("status", "success"),
+                duration_ms=metrics.get("duration_ms"),
+                tokens_used=metrics.get("tokens"),
+                error=metrics.get("error"),
             ))
+        if not steps:
+            steps = [
+                StepResult(name=step_name, status="success", duration_ms=None, tokens_used=None, error=None)
+                for step_name in log_data.get("step_results", {})
+            ]
 
         return WorkflowResultResponse(
             run_id=run_id,
@@ -375,25 +361,38 @@ async def get_run_result(name: str, run_id: str):
             error=log_data.get("error"),
         )
 
+    if record is not None:
+        # Dry runs and runs that failed before execution have no log
+        return WorkflowResultResponse(
+            run_id=run_id,
+            workflow_name=name,
+            status=record.status,
+            started_at=record.started_at,
+            completed_at=record.completed_at,
+            duration_seconds=0.0,
+            total_tokens=record.tokens_used,
+            total_cost=record.cost,
+            steps=[],
+            variables={},
+            error=record.error,
+        )
+
     raise HTTPException(status_code=404, detail="Run not found")
 
 
 @app.delete("/api/workflows/{name}/runs/{run_id}")
 async def stop_run(name: str, run_id: str):
     """Stop a running workflow."""
-    if run_id not in active_runs:
+    record = runs.get(run_id)
+    if record is None:
         raise HTTPException(status_code=404, detail="Run not found")
 
-    run = active_runs[run_id]
-
-    if run["status"] not in ("starting", "running"):
+    if not record.active:
         raise HTTPException(status_code=400, detail="Run is not active")
 
-    # Mark as stopped
-    run["status"] = "stopped"
-    run["completed_at"] = datetime.now().isoformat()
-
-    # TODO: Actually cancel the asyncio task
+    if not runs.cancel(run_id):
+        # Started by another API worker
+        raise HTTPException(status_code=409, detail="Run is owned by another worker")
 
     return {"message": "Run stopped", "run_id": run_id}
 
@@ -403,59 +402,77 @@ async def stop_run(name: str, run_id: str):
 # ═══════════════════════════════════════════════════════════════
 
 @app.websocket("/api/workflows/{name}/stream")
-async def workflow_stream(websocket: WebSocket, name: str, run_id: Optional[str] = Query(None)):
-    """WebSocket for live workflow output streaming."""
+async def workflow_stream(
+    websocket: WebSocket,
+    name: str,
+    run_id: Optional[str] = Query(None),
+    cursor: int = Query(0, ge=0),
+):
+    """
+    WebSocket for live workflow output streaming.
+
+    Pushes {"type": "batch", "cursor": n, "events": [...]} whenever the
+    run changes (step_update, log and gap events), {"type": "ping"} after
+    STREAM_KEEPALIVE_SECONDS of silence, and a final {"type": "complete"}.
+    A reconnecting client passes the last cursor to resume without
+    duplicate log entries.
+    """
     await websocket.accept()
 
-    if not run_id or run_id not in active_runs:
+    record = runs.get(run_id) if run_id else None
+    if record is None:
         await websocket.send_json({"error": "Run not found"})
         await websocket.close()
         return
 
-    run = active_runs[run_id]
-    last_step = -1
-
     try:
-        while True:
-            context = run.get("context")
-
-            if context and context.current_step > last_step:
-                # Send step update
-                await websocket.send_json({
-                    "type": "step_update",
-                    "step": context.current_step,
-                    "step_name": context.current_step_name,
-                    "status": run["status"],
-                    "tokens": context.token_usage,
-                    "cost": context.cost,
-                })
-                last_step = context.current_step
-
-            # Send log updates
-            if context and context.logs:
-                recent_logs = context.logs[-5:]
-                for log in recent_logs:
+        context = await runs.wait_for_context(run_id)
+
+        if context is not None:
+            stream = RunStream(context, cursor=cursor)
+            while not stream.finished:
+                events = await stream.next_batch(timeout=STREAM_KEEPALIVE_SECONDS)
+                if events is None:
+                    await websocket.send_json({"type": "ping"})
+                elif events:
                     await websocket.send_json({
-                        "type": "log",
-                        "level": log.type.value,
-                        "message": log.message,
-                        "step": log.step,
-                        "timestamp": log.timestamp.isoformat(),
+                        "type": "batch",
+                        "cursor": stream.cursor,
+                        "events": events,
                     })
-
-            # Check if complete
-            if run["status"] in ("success", "failed", "stopped", "paused"):
-                result = run.get("result")
-                await websocket.send_json({
-                    "type": "complete",
-                    "status": run["status"],
-                    "tokens": result.total_tokens if result else 0,
-                    "cost": result.total_cost if result else 0.0,
-                    "error": run.get("error"),
-                })
-                break
-
-            await asyncio.sleep(0.5)
+        else:
+            # Run executes in another API worker: follow its shared record
+            last_step = None
+            while record is not None and record.active:
+                if record.current_step != last_step:
+                    last_step = record.current_step
+                    await websocket.send_json({
+                        "type": "batch",
+                        "cursor": cursor,
+                        "events": [{
+                            "type": "step_update",
+                            "step": record.current_step,
+                            "step_name": None,
+                            "status": record.status,
+                            "tokens": record.tokens_used,
+                            "cost": record.cost,
+                        }],
+                    })
+                updated_at = record.updated_at
+                record = await runs.wait_for_update(
+                    run_id, updated_at, timeout=STREAM_KEEPALIVE_SECONDS
+                )
+                if record is not None and record.active and record.updated_at == updated_at:
+                    await websocket.send_json({"type": "ping"})
+
+        record = runs.get(run_id)
+        await websocket.send_json({
+            "type": "complete",
+            "status": record.status if record else "unknown",
+            "tokens": record.tokens_used if record else 0,
+            "cost": record.cost if record else 0.0,
+            "error": record.error if record else None,
+        })
 
     except WebSocketDisconnect:
         pass
@@ -468,29 +485,43 @@ async def workflow_stream(websocket: WebSocket, name: str, run_id: Optional[str]
 @app.get("/api/workflows/{name}/runs")
 async def get_run_history(
     name: str,
-    limit: int = Query(default=20, le=100),
+    response: Response,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
 ):
-    """Get run history for a workflow."""
-    logs_dir = Path("workflows/logs")
-    runs = []
-
-    if logs_dir.exists():
-        for log_file in sorted(logs_dir.glob(f"{name}-*.json"), reverse=True)[:limit]:
-            try:
-                data = json.loads(log_file.read_text())
-                runs.append({
-                    "run_id": data.get("run_id", log_file.stem.split("-", 1)[1]),
-                    "status": data.get("status", "unknown"),
-                    "started_at": data.get("started_at", ""),
-                    "completed_at": data.get("completed_at"),
-                    "duration_seconds": data.get("duration_seconds", 0),
-                    "total_tokens": data.get("total_tokens", 0),
-                    "total_cost": data.get("total_cost", 0.0),
-                })
-            except Exception:
-                pass
-
-    return runs
+    """
+    Get run history for a workflow, newest first.
+
+    Filters: status, since/until (ISO date or timestamp of the start).
+    The number of matching runs is returned in X-Total-Count.
+    """
+    # Off the loop: the first query may have to backfill the index from the logs
+    page = await asyncio.to_thread(
+        run_index.query,
+        workflow=name,
+        status=status,
+        since=since,
+        until=until,
+        limit=limit,
+        offset=offset,
+    )
+    response.headers["X-Total-Count"] = str(page["total"])
+
+    return [
+        {
+            "run_id": summary["run_id"],
+            "status": summary["status"],
+            "started_at": summary["started_at"],
+            "completed_at": summary["completed_at"],
+            "duration_seconds": summary["duration_seconds"],
+            "total_tokens": summary["total_tokens"],
+            "total_cost": summary["total_cost"],
+        }
+        for summary in page["runs"]
+    ]
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -543,7 +574,8 @@ async def health_check():
         "status": "healthy",
         "version": "0.1.0",
         "workflows_available": len(list_workflows()),
-        "active_runs": len([r for r in active_runs.values() if r["status"] == "running"]),
+        "active_runs": len([r for r in runs.active() if r.status == "running"]),
+        "run_registry": runs.get_stats(),
     }
 
 
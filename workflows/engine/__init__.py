@@ -5,17 +5,30 @@ AI-nativer, deklarativer Workflow-Orchestrator für das Evolving-System.
 
 Modules:
     parser      - YAML → WorkflowDefinition
+    bundle      - Precompiled Definition Bundle
     validator   - Schema + Logic Validation
     interpolation - {{variable}} Resolution
     context     - State Management
     executor    - Step Execution
+    cache       - Step Result Cache
     permissions - Tool/File Access Control
     model_selector - Dynamic Model Selection
     knowledge_connector - KB Integration
     scheduler   - Cron Jobs
+    cron        - Cron Expression Compiler
     watcher     - File Watching
     events      - Event Bus
+    trigger_queue - Durable Trigger Queue
+    worker_pool - Worker Processes for the Daemon
     audit       - Logging & Audit Trail
+    run_registry - Bounded Registry of API Runs
+    run_index    - Indexed Run History
+    aggregates  - Per-Day Run Statistics
+    metrics_store - Columnar Step Metrics
+    estimator   - Cost & Duration Estimates from Run History
+    streaming   - Live Run Event Streaming
+    persistence - Background File Writer
+    import_budget - Startup Import-Time Check
     api         - FastAPI Endpoints
 
 Usage:
@@ -27,19 +40,10 @@ Usage:
 
 __version__ = "0.1.0"
 
-# Direct imports for implemented modules
-from workflows.engine.models import (
-    WorkflowDefinition,
-    StepDefinition,
-    StepResult,
-    WorkflowResult,
-    PermissionsProfile,
-    PreferencesProfile,
-    TriggerType,
-    StepStatus,
-    ErrorAction,
-    ModelType,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+# Exceptions are cheap and needed by almost every caller
 from workflows.engine.exceptions import (
     WorkflowError,
     WorkflowValidationError,
@@ -49,24 +53,134 @@ from workflows.engine.exceptions import (
     BudgetExceededError,
     InterpolationError,
 )
-from workflows.engine.parser import (
-    load_workflow,
-    load_permissions,
-    load_preferences,
-    list_workflows,
-)
-from workflows.engine.interpolation import Interpolator, interpolate, evaluate_condition
-from workflows.engine.context import WorkflowContext, ContextSnapshot
-from workflows.engine.executor import StepExecutor, ModelSelector
+
+# Everything else is imported on first attribute access (PEP 562), so
+# importing the package does not pull in yaml, asyncio, the executor etc.
+_LAZY_ATTRIBUTES = {
+    # Models
+    "WorkflowDefinition": "models",
+    "StepDefinition": "models",
+    "StepResult": "models",
+    "WorkflowResult": "models",
+    "PermissionsProfile": "models",
+    "PreferencesProfile": "models",
+    "TriggerType": "models",
+    "StepStatus": "models",
+    "ErrorAction": "models",
+    "ModelType": "models",
+    # Parser
+    "load_workflow": "parser",
+    "load_permissions": "parser",
+    "load_preferences": "parser",
+    "list_workflows": "parser",
+    "clear_definition_cache": "parser",
+    # Interpolation
+    "Interpolator": "interpolation",
+    "CompiledTemplate": "interpolation",
+    "compile_template": "interpolation",
+    "compile_condition": "interpolation",
+    "interpolate": "interpolation",
+    "evaluate_condition": "interpolation",
+    # Context
+    "WorkflowContext": "context",
+    "ContextSnapshot": "context",
+    # Executor
+    "StepExecutor": "executor",
+    "ModelSelector": "executor",
+    # Cache
+    "StepCache": "cache",
+    # Runner
+    "WorkflowRunner": "runner",
+    "run_workflow": "runner",
+    "run_workflow_sync": "runner",
+    # Permissions
+    "PermissionEngine": "permissions",
+    "PermissionGuard": "permissions",
+    # Knowledge
+    "KnowledgeConnector": "knowledge_connector",
+    "PromptRegistry": "knowledge_connector",
+    # Audit
+    "AuditLogger": "audit",
+    # Run Registry
+    "RunIndex": "run_index",
+    "RunAggregates": "aggregates",
+    "MetricsStore": "metrics_store",
+    "RunEstimator": "estimator",
+    "RunRegistry": "run_registry",
+    "RunStream": "streaming",
+    # Triggers
+    "TriggerManager": "triggers",
+    "WorkflowDaemon": "triggers",
+    "emit_event": "triggers",
+    "DurableTriggerQueue": "trigger_queue",
+    "WorkerPool": "worker_pool",
+    # Analytics
+    "WorkflowAnalytics": "analytics",
+    "WorkflowOptimizer": "analytics",
+    "DryRunner": "analytics",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(f"{__name__}.{module_name}")
+    value = getattr(module, name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 
-# Additional imports from implemented modules
-from workflows.engine.runner import WorkflowRunner, run_workflow, run_workflow_sync
-from workflows.engine.permissions import PermissionEngine, PermissionGuard
-from workflows.engine.knowledge_connector import KnowledgeConnector, PromptRegistry
-from workflows.engine.audit import AuditLogger
-from workflows.engine.triggers import TriggerManager, WorkflowDaemon, emit_event
-from workflows.engine.analytics import WorkflowAnalytics, WorkflowOptimizer, DryRunner
+if TYPE_CHECKING:
+    from workflows.engine.models import (
+        WorkflowDefinition,
+        StepDefinition,
+        StepResult,
+        WorkflowResult,
+        PermissionsProfile,
+        PreferencesProfile,
+        TriggerType,
+        StepStatus,
+        ErrorAction,
+        ModelType,
+    )
+    from workflows.engine.parser import (
+        load_workflow,
+        load_permissions,
+        load_preferences,
+        list_workflows,
+        clear_definition_cache,
+    )
+    from workflows.engine.interpolation import (
+        CompiledTemplate,
+        Interpolator,
+        compile_condition,
+        compile_template,
+        interpolate,
+        evaluate_condition,
+    )
+    from workflows.engine.context import WorkflowContext, ContextSnapshot
+    from workflows.engine.executor import StepExecutor, ModelSelector
+    from workflows.engine.cache import StepCache
+    from workflows.engine.runner import WorkflowRunner, run_workflow, run_workflow_sync
+    from workflows.engine.permissions import PermissionEngine, PermissionGuard
+    from workflows.engine.knowledge_connector import KnowledgeConnector, PromptRegistry
+    from workflows.engine.audit import AuditLogger
+    from workflows.engine.run_index import RunIndex
+    from workflows.engine.aggregates import RunAggregates
+    from workflows.engine.metrics_store import MetricsStore
+    from workflows.engine.estimator import RunEstimator
+    from workflows.engine.run_registry import RunRegistry
+    from workflows.engine.streaming import RunStream
+    from workflows.engine.triggers import TriggerManager, WorkflowDaemon, emit_event
+    from workflows.engine.trigger_queue import DurableTriggerQueue
+    from workflows.engine.worker_pool import WorkerPool
+    from workflows.engine.analytics import WorkflowAnalytics, WorkflowOptimizer, DryRunner
 
 
 __all__ = [
@@ -94,8 +208,12 @@ __all__ = [
     "load_permissions",
     "load_preferences",
     "list_workflows",
+    "clear_definition_cache",
     # Interpolation
     "Interpolator",
+    "CompiledTemplate",
+    "compile_template",
+    "compile_condition",
     "interpolate",
     "evaluate_condition",
     # Context
@@ -104,6 +222,8 @@ __all__ = [
     # Executor
     "StepExecutor",
     "ModelSelector",
+    # Cache
+    "StepCache",
     # Runner
     "WorkflowRunner",
     "run_workflow",
@@ -116,10 +236,19 @@ __all__ = [
     "PromptRegistry",
     # Audit
     "AuditLogger",
+    # Run Registry
+    "RunIndex",
+    "RunAggregates",
+    "MetricsStore",
+    "RunEstimator",
+    "RunRegistry",
+    "RunStream",
     # Triggers
     "TriggerManager",
     "WorkflowDaemon",
     "emit_event",
+    "DurableTriggerQueue",
+    "WorkerPool",
     # Analytics
     "WorkflowAnalytics",
     "WorkflowOptimizer",
@@ -0,0 +1,273 @@
+"""
+Workflow Engine - Run Aggregates
+
+Per-workflow, per-day run statistics (counts, sums, duration histogram),
+maintained incrementally from the run index and persisted compactly in
+workflows/logs/.aggregates.json.
+"""
+
+import json
+import threading
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from workflows.engine.persistence import get_writer
+from workflows.engine.run_index import RunIndex
+
+
+AGGREGATES_FILENAME = ".aggregates.json"
+
+# Upper bounds (seconds) of the duration histogram buckets; the last
+# bucket counts everything longer
+DURATION_BUCKETS = (1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Bump when the stored layout changes; older files are rebuilt
+FORMAT_VERSION = 2
+
+# Summary fields kept for runs that may still be replaced in the index
+PENDING_FIELDS = (
+    "workflow", "started_at", "status", "duration_seconds", "total_tokens", "total_cost",
+)
+
+
+@dataclass
+class DailyStats:
+    """Aggregated runs of one workflow on one day."""
+    runs: int = 0
+    successful: int = 0
+    failed: int = 0
+    duration_seconds: float = 0.0
+    tokens: int = 0
+    cost: float = 0.0
+    last_run: str = ""
+    duration_histogram: List[int] = field(
+        default_factory=lambda: [0] * (len(DURATION_BUCKETS) + 1)
+    )
+
+    def add(self, summary: Dict[str, Any]):
+        """Count one run summary (as written to the run index)."""
+        duration = summary.get("duration_seconds") or 0
+
+        self.runs += 1
+        if summary.get("status") == "success":
+            self.successful += 1
+        elif summary.get("status") == "failed":
+            self.failed += 1
+        self.duration_seconds += duration
+        self.tokens += summary.get("total_tokens") or 0
+        self.cost += summary.get("total_cost") or 0.0
+        self.last_run = max(self.last_run, summary.get("started_at") or "")
+        self.duration_histogram[_bucket(duration)] += 1
+
+    def remove(self, summary: Dict[str, Any]):
+        """Undo add() for a summary that was replaced."""
+        duration = summary.get("duration_seconds") or 0
+
+        self.runs -= 1
+        if summary.get("status") == "success":
+            self.successful -= 1
+        elif summary.get("status") == "failed":
+            self.failed -= 1
+        self.duration_seconds -= duration
+        self.tokens -= summary.get("total_tokens") or 0
+        self.cost -= summary.get("total_cost") or 0.0
+        self.duration_histogram[_bucket(duration)] -= 1
+
+    def merge(self, other: "DailyStats"):
+        self.runs += other.runs
+        self.successful += other.successful
+        self.failed += other.failed
+        self.duration_seconds += other.duration_seconds
+        self.tokens += other.tokens
+        self.cost += other.cost
+        self.last_run = max(self.last_run, other.last_run)
+        self.duration_histogram = [
+            a + b for a, b in zip(self.duration_histogram, other.duration_histogram)
+        ]
+
+    def duration_percentile(self, q: float) -> float:
+        """Approximate duration percentile (upper bound of its bucket)."""
+        if not self.runs:
+            return 0.0
+        rank = q / 100 * self.runs
+        seen = 0
+        for i, count in enumerate(self.duration_histogram):
+            seen += count
+            if count and seen >= rank:
+                return float(DURATION_BUCKETS[i]) if i < len(DURATION_BUCKETS) else float("inf")
+        return float("inf")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DailyStats":
+        return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data})
+
+
+def _bucket(duration: float) -> int:
+    for i, bound in enumerate(DURATION_BUCKETS):
+        if duration <= bound:
+            return i
+    return len(DURATION_BUCKETS)
+
+
+class RunAggregates:
+    """
+    Rolling run statistics per workflow and day.
+
+    Every run the runner appends to the run index is folded in exactly
+    once: the aggregates remember how far into the index they have read
+    and catch up on access, so reports cost O(days) plus the runs added
+    since the last call. A rebuilt index (new file) triggers a rebuild
+    of the aggregates.
+
+    A resumed run is indexed again under its run_id and replaces its
+    earlier entry. Runs that did not succeed keep their summary in
+    `_pending` until then, so the replaced contribution can be taken
+    out; successful runs are final (their checkpoint is cleared).
+
+    Usage:
+        aggregates = RunAggregates()
+        total = aggregates.totals("inbox-processing")
+        recent = aggregates.totals(since="2025-01-01")
+    """
+
+    def __init__(self, logs_dir: Optional[Path] = None, index: Optional[RunIndex] = None):
+        self.logs_dir = logs_dir or Path("workflows/logs")
+        self.index = index or RunIndex(self.logs_dir)
+        self.path = self.logs_dir / AGGREGATES_FILENAME
+
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._generation: Optional[int] = None
+        # workflow -> day (YYYY-MM-DD) -> stats
+        self._days: Dict[str, Dict[str, DailyStats]] = {}
+        # run_id -> summary of runs that may be resumed
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+
+    # ─────────────────────────────────────────────────────────────
+    # QUERIES
+    # ─────────────────────────────────────────────────────────────
+
+    def workflows(self) -> List[str]:
+        """Workflows with at least one recorded run."""
+        self.refresh()
+        return sorted(self._days)
+
+    def daily(
+        self,
+        workflow: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Dict[str, DailyStats]:
+        """Stats per day (YYYY-MM-DD, inclusive range) for one workflow."""
+        self.refresh()
+        return {
+            day: stats
+            for day, stats in sorted(self._days.get(workflow, {}).items())
+            if (not since or day >= since[:10]) and (not until or day <= until[:10])
+        }
+
+    def totals(
+        self,
+        workflow: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> DailyStats:
+        """Summed stats of one (or every) workflow over a day range."""
+        total = DailyStats()
+        for name in [workflow] if workflow else self.workflows():
+            for stats in self.daily(name, since, until).values():
+                total.merge(stats)
+        return total
+
+    # ─────────────────────────────────────────────────────────────
+    # MAINTENANCE
+    # ─────────────────────────────────────────────────────────────
+
+    def refresh(self):
+        """Fold in runs appended to the index since the last refresh."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+            # Creates the index from the run logs if it is missing
+            self.index.refresh()
+
+            generation = self.index.generation
+            if generation != self._generation:
+                self._days.clear()
+                self._pending.clear()
+                self._offset = 0
+                self._generation = generation
+
+            entries, offset = self.index.read_entries(self._offset)
+            if offset == self._offset:
+                return
+
+            for summary in entries:
+                self._add(summary)
+            self._offset = offset
+            self._save()
+
+    def rebuild(self, reindex: bool = False) -> int:
+        """Recompute everything from the index (optionally rebuilt from the logs first)."""
+        if reindex:
+            self.index.rebuild()
+        with self._lock:
+            self._loaded = True
+            self._generation = None
+        self.refresh()
+        return sum(stats.runs for days in self._days.values() for stats in days.values())
+
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    def _add(self, summary: Dict[str, Any]):
+        workflow = summary.get("workflow")
+        day = (summary.get("started_at") or "")[:10]
+        if not workflow or not day:
+            return
+
+        run_id = summary.get("run_id")
+        previous = self._pending.pop(run_id, None)
+        if previous is not None:
+            stats = self._days.get(previous["workflow"], {}).get(previous["started_at"][:10])
+            if stats is not None:
+                stats.remove(previous)
+
+        days = self._days.setdefault(workflow, {})
+        days.setdefault(day, DailyStats()).add(summary)
+        if run_id and summary.get("status") != "success":
+            self._pending[run_id] = {key: summary.get(key) for key in PENDING_FIELDS}
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("format") != FORMAT_VERSION:
+            return
+
+        self._offset = data["offset"]
+        self._generation = data["generation"]
+        self._pending = data["pending"]
+        self._days = {
+            workflow: {day: DailyStats.from_dict(stats) for day, stats in days.items()}
+            for workflow, days in data["workflows"].items()
+        }
+
+    def _save(self):
+        data = {
+            "format": FORMAT_VERSION,
+            "offset": self._offset,
+            "generation": self._generation,
+            "pending": dict(self._pending),
+            "workflows": {
+                workflow: {day: asdict(stats) for day, stats in days.items()}
+                for workflow, days in self._days.items()
+            },
+        }
+        get_writer().write(self.path, lambda: json.dumps(data, separators=(",", ":")))
@@ -4,14 +4,21 @@ Workflow Engine - Analytics & Optimization
 Usage tracking, ROI calculation, and optimization suggestions.
 """
 
-import json
+import math
+import statistics
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from workflows.engine.aggregates import RunAggregates
+from workflows.engine.context import estimate_cost
+from workflows.engine.dependencies import critical_path, parallel_levels, step_dependencies
+from workflows.engine.estimator import DEFAULT_DURATION_SECONDS, DEFAULT_TOKENS, RunEstimator
+from workflows.engine.metrics_store import MetricsStore, MetricsTable
 from workflows.engine.models import WorkflowDefinition, StepDefinition, ModelType
 from workflows.engine.parser import load_workflow, list_workflows
+from workflows.engine.run_index import RunIndex
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -66,6 +73,53 @@ class ROIReport:
     breakdown_by_workflow: Dict[str, Dict[str, Any]]
 
 
+# Two-sided 95% t quantiles by degrees of freedom (1-30); normal beyond
+T_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+
+@dataclass
+class SavingsEstimate:
+    """Predicted savings per run with a 95% confidence interval."""
+    metric: str             # "cost" (USD) or "seconds"
+    mean: float
+    low: float
+    high: float
+    samples: int
+    measured: bool = True
+
+    @classmethod
+    def from_samples(cls, metric: str, samples: List[float]) -> "SavingsEstimate":
+        """Mean of measured per-run savings with a t-interval."""
+        mean = statistics.fmean(samples)
+        if len(samples) < 2:
+            return cls(metric, mean, mean, mean, len(samples))
+        t = T_95[len(samples) - 2] if len(samples) <= len(T_95) + 1 else 1.96
+        half_width = t * statistics.stdev(samples) / math.sqrt(len(samples))
+        return cls(metric, mean, mean - half_width, mean + half_width, len(samples))
+
+    @classmethod
+    def guess(cls, metric: str, value: float) -> "SavingsEstimate":
+        """Static estimate for workflows without run history."""
+        return cls(metric, value, value, value, 0, measured=False)
+
+    def format(self, value: float) -> str:
+        return f"${value:.4f}" if self.metric == "cost" else f"{value:.1f}s"
+
+    def __str__(self) -> str:
+        if not self.measured:
+            return f"~{self.format(self.mean)} per run (estimate, no run history)"
+        if self.samples < 2:
+            return f"{self.format(self.mean)} per run (n=1)"
+        return (
+            f"{self.format(self.mean)} per run "
+            f"(95% CI {self.format(self.low)}–{self.format(self.high)}, n={self.samples})"
+        )
+
+
 @dataclass
 class OptimizationSuggestion:
     """A suggestion for workflow optimization."""
@@ -75,6 +129,9 @@ class OptimizationSuggestion:
     potential_savings: str
     priority: str
     details: Dict[str, Any] = field(default_factory=dict)
+    savings: List[SavingsEstimate] = field(default_factory=list)
+    # Predicted savings in USD per month (run time valued at the hourly rate)
+    impact: float = 0.0
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -108,53 +165,35 @@ class WorkflowAnalytics:
 
     def __init__(self, logs_dir: Optional[Path] = None):
         self.logs_dir = logs_dir or Path("workflows/logs")
+        self.index = RunIndex(self.logs_dir)
+        self.aggregates = RunAggregates(self.logs_dir, self.index)
+        self.metrics = MetricsStore(self.logs_dir / "metrics")
 
     def get_workflow_stats(self, workflow_name: str) -> WorkflowStats:
         """Get statistics for a single workflow."""
-        runs = self._load_runs(workflow_name)
-
-        if not runs:
-            return WorkflowStats(
-                workflow_name=workflow_name,
-                total_runs=0,
-                successful_runs=0,
-                failed_runs=0,
-                success_rate=0.0,
-                avg_duration_seconds=0.0,
-                avg_tokens=0,
-                avg_cost=0.0,
-                total_tokens=0,
-                total_cost=0.0,
-                estimated_time_saved_hours=0.0,
-            )
-
-        successful = [r for r in runs if r["status"] == "success"]
-        failed = [r for r in runs if r["status"] == "failed"]
-
-        total_duration = sum(r.get("duration_seconds", 0) for r in runs)
-        total_tokens = sum(r.get("total_tokens", 0) for r in runs)
-        total_cost = sum(r.get("total_cost", 0) for r in runs)
+        totals = self.aggregates.totals(workflow_name)
+        runs = totals.runs
 
         # Calculate time saved
         manual_time_minutes = MANUAL_TIME_ESTIMATES.get(
             workflow_name,
             MANUAL_TIME_ESTIMATES["default"]
         )
-        time_saved_hours = (len(successful) * manual_time_minutes) / 60
+        time_saved_hours = (totals.successful * manual_time_minutes) / 60
 
         return WorkflowStats(
             workflow_name=workflow_name,
-            total_runs=len(runs),
-            successful_runs=len(successful),
-            failed_runs=len(failed),
-            success_rate=len(successful) / len(runs) * 100 if runs else 0,
-            avg_duration_seconds=total_duration / len(runs) if runs else 0,
-            avg_tokens=total_tokens // len(runs) if runs else 0,
-            avg_cost=total_cost / len(runs) if runs else 0,
-            total_tokens=total_tokens,
-            total_cost=total_cost,
+            total_runs=runs,
+            successful_runs=totals.successful,
+            failed_runs=totals.failed,
+            success_rate=totals.successful / runs * 100 if runs else 0.0,
+            avg_duration_seconds=totals.duration_seconds / runs if runs else 0.0,
+            avg_tokens=totals.tokens // runs if runs else 0,
+            avg_cost=totals.cost / runs if runs else 0.0,
+            total_tokens=totals.tokens,
+            total_cost=totals.cost,
             estimated_time_saved_hours=time_saved_hours,
-            last_run=runs[-1].get("started_at") if runs else None,
+            last_run=totals.last_run or None,
         )
 
     def get_all_stats(self) -> List[WorkflowStats]:
@@ -169,40 +208,41 @@ class WorkflowAnalytics:
         days: int = 30,
         hourly_rate: float = 50.0,
     ) -> ROIReport:
-        """Generate ROI report for a period."""
+        """
+        Generate ROI report for a period.
+
+        The period is counted in whole days: runs on the cutoff date are
+        included from its start.
+        """
         cutoff = datetime.now() - timedelta(days=days)
         cutoff_str = cutoff.isoformat()
 
-        all_runs = []
-        for name in list_workflows():
-            runs = self._load_runs(name)
-            for run in runs:
-                if run.get("started_at", "") >= cutoff_str:
-                    run["workflow_name"] = name
-                    all_runs.append(run)
-
-        # Calculate totals
-        total_tokens = sum(r.get("total_tokens", 0) for r in all_runs)
-        total_cost = sum(r.get("total_cost", 0) for r in all_runs)
-        total_duration = sum(r.get("duration_seconds", 0) for r in all_runs)
+        total_runs = 0
+        total_tokens = 0
+        total_cost = 0.0
+        total_duration = 0.0
 
         # Calculate time saved
         breakdown = {}
         total_manual_hours = 0.0
 
         for name in list_workflows():
-            workflow_runs = [r for r in all_runs if r.get("workflow_name") == name]
-            successful = len([r for r in workflow_runs if r["status"] == "success"])
+            period = self.aggregates.totals(name, since=cutoff_str)
 
             manual_minutes = MANUAL_TIME_ESTIMATES.get(name, MANUAL_TIME_ESTIMATES["default"])
-            manual_hours = (successful * manual_minutes) / 60
+            manual_hours = (period.successful * manual_minutes) / 60
             total_manual_hours += manual_hours
 
+            total_runs += period.runs
+            total_tokens += period.tokens
+            total_cost += period.cost
+            total_duration += period.duration_seconds
+
             breakdown[name] = {
-                "runs": len(workflow_runs),
-                "successful": successful,
-                "tokens": sum(r.get("total_tokens", 0) for r in workflow_runs),
-                "cost": sum(r.get("total_cost", 0) for r in workflow_runs),
+                "runs": period.runs,
+                "successful": period.successful,
+                "tokens": period.tokens,
+                "cost": period.cost,
                 "manual_hours_saved": manual_hours,
             }
 
@@ -215,7 +255,7 @@ class WorkflowAnalytics:
         return ROIReport(
             period_start=cutoff_str,
             period_end=datetime.now().isoformat(),
-            total_workflows_run=len(all_runs),
+            total_workflows_run=total_runs,
             total_tokens_used=total_tokens,
             total_cost=total_cost,
             total_duration_hours=total_duration / 3600,
@@ -228,49 +268,81 @@ class WorkflowAnalytics:
 
     def get_recent_runs(self, limit: int = 20) -> List[RunSummary]:
         """Get most recent runs across all workflows."""
-        all_runs = []
-
-        for name in list_workflows():
-            runs = self._load_runs(name)
-            for run in runs:
-                all_runs.append(RunSummary(
-                    run_id=run.get("run_id", "unknown"),
-                    workflow_name=name,
-                    status=run.get("status", "unknown"),
-                    started_at=run.get("started_at", ""),
-                    completed_at=run.get("completed_at"),
-                    duration_seconds=run.get("duration_seconds", 0),
-                    tokens_used=run.get("total_tokens", 0),
-                    cost=run.get("total_cost", 0),
-                    steps_completed=len(run.get("step_results", {})),
-                    steps_failed=0,  # TODO: Calculate from step data
-                ))
-
-        # Sort by start time descending
-        all_runs.sort(key=lambda r: r.started_at, reverse=True)
-        return all_runs[:limit]
-
-    def _load_runs(self, workflow_name: str) -> List[Dict[str, Any]]:
-        """Load all runs for a workflow from logs."""
-        runs = []
+        return [
+            RunSummary(
+                run_id=run["run_id"],
+                workflow_name=run["workflow"],
+                status=run.get("status", "unknown"),
+                started_at=run.get("started_at", ""),
+                completed_at=run.get("completed_at"),
+                duration_seconds=run.get("duration_seconds", 0),
+                tokens_used=run.get("total_tokens", 0),
+                cost=run.get("total_cost", 0),
+                steps_completed=run.get("steps", 0),
+                steps_failed=0,  # TODO: Calculate from step data
+            )
+            for run in self.index.query(limit=limit)["runs"]
+        ]
 
-        if not self.logs_dir.exists():
-            return runs
+    # ─────────────────────────────────────────────────────────────
+    # STEP METRICS
+    # ─────────────────────────────────────────────────────────────
 
-        for log_file in self.logs_dir.glob(f"{workflow_name}-*.json"):
-            # Skip audit logs
-            if ".audit." in log_file.name:
-                continue
+    def get_step_stats(
+        self,
+        workflow_name: str,
+        since: Optional[datetime] = None,
+    ) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Per-step distributions of duration_ms, tokens and cost.
+
+        Returns {step: {metric: {count, sum, mean, p50, p95}}}.
+        """
+        table = self.metrics.load()
+        stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for metric in ("duration_ms", "tokens", "cost"):
+            for step, summary in table.summarize(
+                metric, by="step", workflow=workflow_name, since=since
+            ).items():
+                stats.setdefault(step, {})[metric] = summary
+        return stats
 
-            try:
-                data = json.loads(log_file.read_text())
-                runs.append(data)
-            except Exception:
-                pass
+    def get_model_breakdown(
+        self,
+        workflow_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Steps, tokens, cost and duration percentiles per model."""
+        table = self.metrics.load()
+        filters = {"workflow": workflow_name, "since": since}
+        tokens = table.summarize("tokens", by="model", **filters)
+        cost = table.summarize("cost", by="model", **filters)
+        duration = table.summarize("duration_ms", by="model", **filters)
+
+        return {
+            model or "none": {
+                "steps": int(tokens[model]["count"]),
+                "tokens": int(tokens[model]["sum"]),
+                "cost": cost[model]["sum"],
+                "duration_ms_p50": duration[model]["p50"],
+                "duration_ms_p95": duration[model]["p95"],
+            }
+            for model in tokens
+        }
 
-        # Sort by start time
-        runs.sort(key=lambda r: r.get("started_at", ""))
-        return runs
+    def get_trend(
+        self,
+        workflow_name: Optional[str] = None,
+        metric: str = "cost",
+        days: int = 30,
+    ) -> Dict[str, Dict[str, float]]:
+        """Daily (UTC) distribution of a step metric over the last days."""
+        table = self.metrics.load()
+        return table.daily(
+            metric,
+            workflow=workflow_name,
+            since=datetime.now() - timedelta(days=days),
+        )
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -281,15 +353,40 @@ class WorkflowOptimizer:
     """
     Analyzes workflows and suggests optimizations.
 
+    Savings are predicted from the step metrics of recent runs (see
+    MetricsStore) with 95% confidence intervals; without run history the
+    DryRunner estimates are used and the suggestion says so.
+    Suggestions are ranked by impact: predicted savings per run (cost
+    plus run time valued at `hourly_rate`) times runs in the last 30 days.
+
     Optimizations:
     - Model downgrades (opus → sonnet where possible)
-    - Parallelization opportunities
+    - Parallelization opportunities (critical path vs. sequential time)
     - Caching suggestions
     - Step consolidation
     """
 
+    # Runs older than this are ignored (definitions change over time)
+    HISTORY_DAYS = 90
+    # Impact (USD per month) for high/medium priority
+    HIGH_IMPACT = 10.0
+    MEDIUM_IMPACT = 1.0
+    # Parallelization must save at least this much per run
+    MIN_PARALLEL_SECONDS = 1.0
+
+    def __init__(
+        self,
+        logs_dir: Optional[Path] = None,
+        hourly_rate: float = 50.0,
+        history_days: int = HISTORY_DAYS,
+    ):
+        self.analytics = WorkflowAnalytics(logs_dir)
+        self.hourly_rate = hourly_rate
+        self.history_days = history_days
+        self._table: Optional[MetricsTable] = None
+
     def analyze(self, workflow_name: str) -> List[OptimizationSuggestion]:
-        """Analyze a workflow and return optimization suggestions."""
+        """Analyze a workflow and return optimization suggestions, highest impact first."""
         suggestions = []
 
         try:
@@ -297,107 +394,149 @@ class WorkflowOptimizer:
         except Exception:
             return suggestions
 
+        history = self._load_history(workflow)
+
         # Check for model optimization
-        suggestions.extend(self._check_model_optimization(workflow))
+        suggestions.extend(self._check_model_optimization(workflow, history))
 
         # Check for parallelization
-        suggestions.extend(self._check_parallelization(workflow))
+        suggestions.extend(self._check_parallelization(workflow, history))
 
         # Check for step consolidation
         suggestions.extend(self._check_consolidation(workflow))
 
         # Check for caching
-        suggestions.extend(self._check_caching(workflow))
+        suggestions.extend(self._check_caching(workflow, history))
 
+        self._rate(workflow.name, suggestions)
+        suggestions.sort(key=lambda s: s.impact, reverse=True)
         return suggestions
 
-    def _check_model_optimization(
-        self, workflow: WorkflowDefinition
+    def rank(
+        self,
+        workflow_names: Optional[List[str]] = None,
+        limit: Optional[int] = None,
     ) -> List[OptimizationSuggestion]:
-        """Check for steps that could use cheaper models."""
-        suggestions = []
+        """
+        Suggestions for several workflows, highest impact first.
 
-        for step in workflow.steps:
-            if step.model == ModelType.OPUS:
-                # Check if step is simple enough for sonnet
-                if self._is_simple_step(step):
-                    suggestions.append(OptimizationSuggestion(
-                        workflow_name=workflow.name,
-                        suggestion_type="model_downgrade",
-                        message=f"Step '{step.name}' could use Sonnet instead of Opus",
-                        potential_savings="~80% token cost reduction",
-                        priority="medium",
-                        details={
-                            "step": step.name,
-                            "current_model": "opus",
-                            "suggested_model": "sonnet",
-                        },
-                    ))
-            elif step.model == ModelType.SONNET:
-                # Check if step is simple enough for haiku
-                if self._is_trivial_step(step):
-                    suggestions.append(OptimizationSuggestion(
-                        workflow_name=workflow.name,
-                        suggestion_type="model_downgrade",
-                        message=f"Step '{step.name}' could use Haiku instead of Sonnet",
-                        potential_savings="~90% token cost reduction",
-                        priority="low",
-                        details={
-                            "step": step.name,
-                            "current_model": "sonnet",
-                            "suggested_model": "haiku",
-                        },
-                    ))
+        Defaults to every defined workflow that has recorded runs.
+        """
+        if workflow_names is None:
+            recorded = set(self.analytics.aggregates.workflows())
+            workflow_names = [name for name in list_workflows() if name in recorded]
 
-        return suggestions
+        suggestions = []
+        for name in workflow_names:
+            suggestions.extend(self.analyze(name))
+        suggestions.sort(key=lambda s: s.impact, reverse=True)
+        return suggestions[:limit] if limit else suggestions
 
-    def _check_parallelization(
-        self, workflow: WorkflowDefinition
+    # ─────────────────────────────────────────────────────────────
+    # CHECKS
+    # ─────────────────────────────────────────────────────────────
+
+    def _check_model_optimization(
+        self, workflow: WorkflowDefinition, history: Dict[str, Dict[str, Dict[str, Any]]]
     ) -> List[OptimizationSuggestion]:
-        """Check for steps that could run in parallel."""
+        """Check for steps that could use cheaper models."""
         suggestions = []
 
-        # Find independent steps
-        independent_groups = []
-        current_group = []
-
-        for i, step in enumerate(workflow.steps):
-            if step.depends_on:
-                if current_group:
-                    independent_groups.append(current_group)
-                    current_group = []
+        for step in workflow.steps:
+            current = self._step_model(step, history)
+            if current == "opus" and self._is_simple_step(step):
+                target, priority = "sonnet", "medium"
+            elif current == "sonnet" and self._is_trivial_step(step):
+                target, priority = "haiku", "low"
             else:
-                # Check if step depends on previous step's output
-                if i > 0:
-                    prev_step = workflow.steps[i - 1]
-                    if prev_step.store_as and f"{{{{{prev_step.store_as}}}}}" in str(step):
-                        if current_group:
-                            independent_groups.append(current_group)
-                            current_group = []
-                    else:
-                        current_group.append(step.name)
-                else:
-                    current_group.append(step.name)
-
-        if current_group:
-            independent_groups.append(current_group)
+                continue
 
-        # Suggest parallelization for groups > 1
-        for group in independent_groups:
-            if len(group) > 1:
-                suggestions.append(OptimizationSuggestion(
-                    workflow_name=workflow.name,
-                    suggestion_type="parallelization",
-                    message=f"Steps {group} could run in parallel",
-                    potential_savings="~50% time reduction",
-                    priority="medium",
-                    details={
-                        "steps": group,
-                    },
-                ))
+            samples = [
+                estimate_cost(run[step.name]["tokens"], current)
+                - estimate_cost(run[step.name]["tokens"], target)
+                for run in history.values()
+                if step.name in run and not run[step.name]["cache_hit"]
+            ]
+            if samples:
+                savings = SavingsEstimate.from_samples("cost", samples)
+                if savings.high <= 0:
+                    continue  # Uses no tokens (e.g. bash)
+            else:
+                tokens = DryRunner.TOKEN_ESTIMATES.get(step.get_execution_type(), 1000)
+                savings = SavingsEstimate.guess(
+                    "cost", estimate_cost(tokens, current) - estimate_cost(tokens, target)
+                )
+
+            suggestions.append(OptimizationSuggestion(
+                workflow_name=workflow.name,
+                suggestion_type="model_downgrade",
+                message=f"Step '{step.name}' could use {target.title()} instead of {current.title()}",
+                potential_savings=str(savings),
+                priority=priority,
+                details={
+                    "step": step.name,
+                    "current_model": current,
+                    "suggested_model": target,
+                },
+                savings=[savings],
+            ))
 
         return suggestions
 
+    def _check_parallelization(
+        self, workflow: WorkflowDefinition, history: Dict[str, Dict[str, Dict[str, Any]]]
+    ) -> List[OptimizationSuggestion]:
+        """Compare sequential run time with the critical path of the step graph."""
+        dependencies = step_dependencies(workflow)
+        groups = [level for level in parallel_levels(workflow, dependencies) if len(level) > 1]
+        if not groups:
+            return []
+
+        runs = [
+            {name: metrics["duration_ms"] / 1000 for name, metrics in run.items()}
+            for run in history.values()
+        ] or [{
+            step.name: DryRunner.DURATION_ESTIMATES.get(step.get_execution_type(), 30)
+            for step in workflow.steps
+        }]
+
+        sequential = [sum(durations.values()) for durations in runs]
+        critical = [critical_path(workflow, durations, dependencies)[0] for durations in runs]
+        samples = [s - c for s, c in zip(sequential, critical)]
+        if history:
+            savings = SavingsEstimate.from_samples("seconds", samples)
+        else:
+            savings = SavingsEstimate.guess("seconds", samples[0])
+
+        sequential_mean = sum(sequential) / len(sequential)
+        if savings.mean < max(self.MIN_PARALLEL_SECONDS, 0.05 * sequential_mean) or savings.low <= 0:
+            return []
+
+        mean_durations = {
+            step.name: sum(durations.get(step.name, 0.0) for durations in runs) / len(runs)
+            for step in workflow.steps
+        }
+        critical_length, path = critical_path(workflow, mean_durations, dependencies)
+
+        return [OptimizationSuggestion(
+            workflow_name=workflow.name,
+            suggestion_type="parallelization",
+            message=(
+                f"Running independent steps concurrently would cut runs from "
+                f"{sequential_mean:.0f}s to {critical_length:.0f}s "
+                f"(critical path: {' → '.join(path)})"
+            ),
+            potential_savings=str(savings),
+            priority="medium",
+            details={
+                "steps": groups,
+                "critical_path": path,
+                "sequential_seconds": round(sequential_mean, 1),
+                "critical_path_seconds": round(critical_length, 1),
+            },
+            savings=[savings],
+        )]
+
     def _check_consolidation(
         self, workflow: WorkflowDefinition
     ) -> List[OptimizationSuggestion]:
@@ -414,9 +553,8 @@ class WorkflowOptimizer:
                 else:
                     consecutive_prompts.append((step.name, i, step.name))
 
-        for group in consecutive_prompts:
-            if len(group) > 2:
-                start_name, _, end_name = group
+        for start_name, _, end_name in consecutive_prompts:
+            if start_name != end_name:
                 suggestions.append(OptimizationSuggestion(
                     workflow_name=workflow.name,
                     suggestion_type="consolidation",
@@ -431,29 +569,117 @@ class WorkflowOptimizer:
         return suggestions
 
     def _check_caching(
-        self, workflow: WorkflowDefinition
+        self, workflow: WorkflowDefinition, history: Dict[str, Dict[str, Dict[str, Any]]]
     ) -> List[OptimizationSuggestion]:
-        """Check for caching opportunities."""
+        """Check for caching opportunities (savings per repeated run)."""
         suggestions = []
 
         # Check for steps with static inputs that could be cached
         for step in workflow.steps:
-            if step.agent and not step.condition:
-                # Agent steps with no conditions could potentially cache results
-                suggestions.append(OptimizationSuggestion(
-                    workflow_name=workflow.name,
-                    suggestion_type="caching",
-                    message=f"Step '{step.name}' results could be cached",
-                    potential_savings="~100% cost for repeated runs",
-                    priority="low",
-                    details={
-                        "step": step.name,
-                        "type": "agent_result_cache",
-                    },
-                ))
+            if step.cache:
+                continue  # Already cached
+            if not step.agent or step.condition:
+                continue
+
+            executed = [
+                run[step.name] for run in history.values()
+                if step.name in run and not run[step.name]["cache_hit"]
+            ]
+            if executed:
+                savings = [
+                    SavingsEstimate.from_samples("cost", [m["cost"] for m in executed]),
+                    SavingsEstimate.from_samples("seconds", [m["duration_ms"] / 1000 for m in executed]),
+                ]
+            else:
+                step_type = step.get_execution_type()
+                tokens = DryRunner.TOKEN_ESTIMATES.get(step_type, 1000)
+                savings = [
+                    SavingsEstimate.guess("cost", estimate_cost(tokens, self._step_model(step, history) or "sonnet")),
+                    SavingsEstimate.guess("seconds", DryRunner.DURATION_ESTIMATES.get(step_type, 30)),
+                ]
+
+            # Agent steps with no conditions could potentially cache results
+            suggestions.append(OptimizationSuggestion(
+                workflow_name=workflow.name,
+                suggestion_type="caching",
+                message=f"Step '{step.name}' results could be cached",
+                potential_savings=" and ".join(str(s) for s in savings) + " for each repeated input",
+                priority="low",
+                details={
+                    "step": step.name,
+                    "type": "agent_result_cache",
+                    "config": "cache: 24h",
+                },
+                savings=savings,
+            ))
 
         return suggestions
 
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    def _load_history(self, workflow: WorkflowDefinition) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Measured step metrics of recent successful runs:
+        {run_id: {step: {duration_ms, tokens, cost, model, cache_hit}}}.
+        """
+        if self._table is None:
+            self._table = self.analytics.metrics.load()
+
+        filters = {
+            "workflow": workflow.name,
+            "since": datetime.now() - timedelta(days=self.history_days),
+        }
+        columns = ("run_id", "step", "status", "duration_ms", "tokens", "cost", "model", "cache_hit")
+        values = {column: self._table.values(column, **filters) for column in columns}
+
+        step_names = {step.name for step in workflow.steps}
+        runs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        failed = set()
+        for row in zip(*(values[column] for column in columns)):
+            metrics = dict(zip(columns, row))
+            if metrics["status"] == "failed":
+                failed.add(metrics["run_id"])
+            # Steps since removed from the definition are ignored
+            if metrics["step"] in step_names:
+                runs.setdefault(metrics["run_id"], {})[metrics["step"]] = metrics
+
+        return {run_id: steps for run_id, steps in runs.items() if run_id not in failed}
+
+    def _step_model(self, step: StepDefinition, history: Dict[str, Dict[str, Dict[str, Any]]]) -> Optional[str]:
+        """Model family a step ran on most often (else its configured model)."""
+        counts: Dict[str, int] = {}
+        for run in history.values():
+            model = run.get(step.name, {}).get("model") or ""
+            for family in (ModelType.OPUS, ModelType.SONNET, ModelType.HAIKU):
+                if family.value in model.lower():
+                    counts[family.value] = counts.get(family.value, 0) + 1
+        if counts:
+            return max(counts, key=counts.get)
+        return step.model.value if step.model != ModelType.AUTO else None
+
+    def _rate(self, workflow_name: str, suggestions: List[OptimizationSuggestion]):
+        """Set impact (USD per month) and, for measured savings, priority."""
+        since = (datetime.now() - timedelta(days=30)).isoformat()
+        runs_per_month = max(self.analytics.aggregates.totals(workflow_name, since=since).runs, 1)
+
+        for suggestion in suggestions:
+            per_run = sum(
+                s.mean if s.metric == "cost" else s.mean / 3600 * self.hourly_rate
+                for s in suggestion.savings
+            )
+            suggestion.impact = per_run * runs_per_month
+            suggestion.details["runs_per_month"] = runs_per_month
+
+            if suggestion.savings and all(s.measured for s in suggestion.savings):
+                if suggestion.impact >= self.HIGH_IMPACT:
+                    suggestion.priority = "high"
+                elif suggestion.impact >= self.MEDIUM_IMPACT:
+                    suggestion.priority = "medium"
+                else:
+                    suggestion.priority = "low"
+
     def _is_simple_step(self, step: StepDefinition) -> bool:
         """Check if step is simple enough for a smaller model."""
         # Check step type
@@ -498,6 +724,12 @@ class DryRunPreview:
     estimated_duration_seconds: float
     tools_used: List[str]
     files_affected: List[str]
+    # p95 of cost and duration; duration is the critical path (see RunEstimate)
+    estimated_cost_p95: float = 0.0
+    estimated_duration_p95_seconds: float = 0.0
+    sequential_duration_seconds: float = 0.0
+    critical_path: List[str] = field(default_factory=list)
+    history_runs: int = 0
 
 
 class DryRunner:
@@ -506,56 +738,30 @@ class DryRunner:
 
     Provides:
     - Step-by-step preview
-    - Resource estimates
+    - Resource estimates (p50/p95 from run history, see RunEstimator)
     - Tool usage preview
     - File impact analysis
     """
 
-    # Token estimates by step type
-    TOKEN_ESTIMATES = {
-        "bash": 100,
-        "command": 500,
-        "script": 200,
-        "prompt": 2000,
-        "agent": 5000,
-        "framework": 10000,
-        "output": 100,
-        "branch": 500,
-    }
-
-    # Duration estimates by step type (seconds)
-    DURATION_ESTIMATES = {
-        "bash": 5,
-        "command": 30,
-        "script": 10,
-        "prompt": 20,
-        "agent": 60,
-        "framework": 120,
-        "output": 2,
-        "branch": 10,
-    }
+    # Fallback estimates by step type (tokens / seconds)
+    TOKEN_ESTIMATES = DEFAULT_TOKENS
+    DURATION_ESTIMATES = DEFAULT_DURATION_SECONDS
+
+    def __init__(self, logs_dir: Optional[Path] = None):
+        self.estimator = RunEstimator(logs_dir)
 
     def preview(self, workflow_name: str) -> DryRunPreview:
         """Generate a dry run preview."""
         workflow = load_workflow(workflow_name)
+        estimate = self.estimator.estimate(workflow)
 
         steps = []
         tools_used = set()
         files_affected = []
-        total_tokens = 0
-        total_duration = 0
 
-        for step in workflow.steps:
+        for step, step_estimate in zip(workflow.steps, estimate.steps):
             step_type = step.get_execution_type()
 
-            # Estimate tokens
-            tokens = self.TOKEN_ESTIMATES.get(step_type, 1000)
-            total_tokens += tokens
-
-            # Estimate duration
-            duration = self.DURATION_ESTIMATES.get(step_type, 30)
-            total_duration += duration
-
             # Track tools
             if step_type == "bash":
                 tools_used.add("Bash")
@@ -569,23 +775,26 @@ class DryRunner:
             steps.append({
                 "name": step.name,
                 "type": step_type,
-                "model": step.model.value,
-                "estimated_tokens": tokens,
-                "estimated_duration": duration,
+                "model": step_estimate.model,
+                "estimated_tokens": round(step_estimate.tokens_p50),
+                "estimated_duration": step_estimate.duration_p50_seconds,
+                "estimate_source": step_estimate.source,
                 "condition": step.condition,
                 "output": step.output,
             })
 
-        # Estimate cost (using average pricing)
-        estimated_cost = (total_tokens / 1_000_000) * 5  # ~$5 per 1M tokens
-
         return DryRunPreview(
             workflow_name=workflow.name,
             version=workflow.version,
             steps=steps,
-            estimated_tokens=total_tokens,
-            estimated_cost=estimated_cost,
-            estimated_duration_seconds=total_duration,
+            estimated_tokens=round(estimate.tokens_p50),
+            estimated_cost=estimate.cost_p50,
+            estimated_duration_seconds=estimate.critical_path_p50_seconds,
             tools_used=list(tools_used),
             files_affected=files_affected,
+            estimated_cost_p95=estimate.cost_p95,
+            estimated_duration_p95_seconds=estimate.critical_path_p95_seconds,
+            sequential_duration_seconds=estimate.sequential_p50_seconds,
+            critical_path=estimate.critical_path,
+            history_runs=estimate.history_runs,
         )
@@ -12,6 +12,8 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from workflows.engine.persistence import get_writer
+
 
 # ═══════════════════════════════════════════════════════════════
 # AUDIT ENTRY TYPES
@@ -473,17 +475,20 @@ class AuditLogger:
         self._last_hash = entry_hash
 
     def _write(self):
-        """Write audit log to file."""
-        log_data = {
-            "workflow_name": self.workflow_name,
-            "run_id": self.run_id,
-            "entries": [e.to_dict() for e in self.entries],
-            "final_hash": self._last_hash,
-        }
+        """Queue the audit log for writing (see persistence.BackgroundWriter)."""
+        entries = list(self.entries)
+        final_hash = self._last_hash
 
-        self.log_path.write_text(
-            json.dumps(log_data, indent=2, ensure_ascii=False)
-        )
+        def encode() -> str:
+            return json.dumps({
+                "workflow_name": self.workflow_name,
+                "run_id": self.run_id,
+                "entries": [e.to_dict() for e in entries],
+                "final_hash": final_hash,
+            }, indent=2, ensure_ascii=False)
+
+        # Encoding and I/O happen on the background writer thread
+        get_writer().write(self.log_path, encode)
 
     def _redact_secrets(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Redact sensitive data."""
@@ -617,6 +622,10 @@ class AuditLogger:
     @classmethod
     def load(cls, log_path: Path) -> 'AuditLogger':
         """Load audit log from file."""
+        writer = get_writer()
+        if writer.is_pending(log_path):
+            writer.flush()
+
         data = json.loads(log_path.read_text())
 
         logger = cls(
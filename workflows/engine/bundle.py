@@ -0,0 +1,327 @@
+"""
+Workflow Engine - Definition Bundle
+
+Precompiled JSON bundle of all workflow definitions, resolved permission
+profiles and preferences for fast startup.
+
+Usage:
+    python -m workflows.engine.bundle build    # build and report timings
+    python -m workflows.engine.bundle check    # show bundle freshness
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from workflows.engine.cache import hash_content
+from workflows.engine.models import PermissionsProfile, ResourceLimits, ToolConstraint
+from workflows.engine import parser
+
+
+# Bump when the bundle layout or the meaning of its data changes
+BUNDLE_VERSION = 1
+
+BUNDLE_KINDS = ("workflows", "permissions", "preferences")
+
+
+def get_bundle_path() -> Path:
+    """Get the bundle file path."""
+    return parser.get_workflows_root() / ".bundle.json"
+
+
+def _file_sha256(path: Path) -> Optional[str]:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+# ═══════════════════════════════════════════════════════════════
+# BUNDLE
+# ═══════════════════════════════════════════════════════════════
+
+class DefinitionBundle:
+    """
+    Loaded bundle with per-entry freshness checks.
+
+    Every entry records its source files as (relative path, mtime_ns,
+    size, sha256). An entry is fresh if each source still has the same
+    stamp, or failing that (e.g. after a git checkout) the same content.
+    Stale entries are ignored and the caller falls back to YAML.
+    """
+
+    def __init__(self, data: Dict[str, Any], path: Path):
+        self.data = data
+        self.path = path
+        self.root = parser.get_workflows_root()
+
+    @property
+    def content_hash(self) -> str:
+        return self.data.get("content_hash", "")
+
+    def lookup(self, kind: str, name: str) -> Optional[Tuple[Any, List[Path]]]:
+        """Return (data, source paths) for a fresh entry, else None."""
+        entry = self.data.get(kind, {}).get(name)
+        if entry is None:
+            return None
+
+        paths = []
+        for relative, mtime_ns, size, sha in entry["sources"]:
+            path = self.root / relative
+            if not self._source_fresh(path, mtime_ns, size, sha):
+                return None
+            paths.append(path)
+
+        return entry["data"], paths
+
+    def stale_entries(self) -> List[str]:
+        """List entries whose sources changed, plus sources not in the bundle."""
+        stale = [
+            f"{kind}/{name}"
+            for kind in BUNDLE_KINDS
+            for name in self.data.get(kind, {})
+            if self.lookup(kind, name) is None
+        ]
+        for kind, names in _source_names().items():
+            stale.extend(
+                f"{kind}/{name} (new)"
+                for name in names
+                if name not in self.data.get(kind, {})
+            )
+        return stale
+
+    def _source_fresh(self, path: Path, mtime_ns: int, size: int, sha: str) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size):
+            return True
+        return stat.st_size == size and _file_sha256(path) == sha
+
+
+# ═══════════════════════════════════════════════════════════════
+# PROCESS-WIDE BUNDLE
+# ═══════════════════════════════════════════════════════════════
+
+_bundle: Optional[DefinitionBundle] = None
+_bundle_stamp = None
+_bundle_lock = threading.Lock()
+_enabled = True
+
+
+def get_bundle() -> Optional[DefinitionBundle]:
+    """
+    Get the loaded bundle, reading it in one go on first use.
+
+    Reloads when the bundle file changes; returns None if there is no
+    usable bundle.
+    """
+    global _bundle, _bundle_stamp
+
+    if not _enabled:
+        return None
+
+    path = get_bundle_path()
+    stamp = parser._file_stamp(path)
+
+    with _bundle_lock:
+        if stamp == _bundle_stamp:
+            return _bundle
+
+        _bundle, _bundle_stamp = None, stamp
+        if stamp is None:
+            return None
+
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if data.get("version") == BUNDLE_VERSION:
+            _bundle = DefinitionBundle(data, path)
+        return _bundle
+
+
+def set_bundle_enabled(enabled: bool):
+    """Enable or disable bundle lookups (e.g. to measure YAML loading)."""
+    global _enabled, _bundle, _bundle_stamp
+    with _bundle_lock:
+        _enabled = enabled
+        _bundle, _bundle_stamp = None, None
+
+
+def restore_permissions(data: Dict[str, Any]) -> PermissionsProfile:
+    """Rebuild a resolved permissions profile from its bundled form."""
+    return PermissionsProfile(**{
+        **data,
+        "allow_with_constraints": [ToolConstraint(**c) for c in data["allow_with_constraints"]],
+        "never_allow": [ToolConstraint(**c) for c in data["never_allow"]],
+        "resource_limits": ResourceLimits(**data["resource_limits"]),
+    })
+
+
+# ═══════════════════════════════════════════════════════════════
+# BUILD
+# ═══════════════════════════════════════════════════════════════
+
+def _source_names() -> Dict[str, List[str]]:
+    """Names of all definition sources currently on disk, by kind."""
+    return {
+        "workflows": sorted(parser.list_workflows()),
+        "permissions": sorted(p.stem for p in parser.get_permissions_path().glob("*.yaml")),
+        "preferences": sorted(p.stem for p in parser.get_preferences_path().glob("*.yaml")),
+    }
+
+
+def build_bundle(path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Compile all definitions into a bundle file.
+
+    Workflows and preferences are stored as their schema-checked YAML
+    data; permission profiles are stored fully resolved (after
+    inheritance). Returns a summary with the content hash and any
+    schema warnings.
+    """
+    path = path or get_bundle_path()
+    root = parser.get_workflows_root()
+    names = _source_names()
+    warnings: List[str] = []
+
+    def describe(source_paths: List[Path]) -> List[List[Any]]:
+        # Stamps before content, so edits during the build mark it stale
+        sources = []
+        for source in source_paths:
+            stat = source.stat()
+            sources.append([
+                source.relative_to(root).as_posix(),
+                stat.st_mtime_ns,
+                stat.st_size,
+                _file_sha256(source),
+            ])
+        return sources
+
+    bundle: Dict[str, Any] = {kind: {} for kind in BUNDLE_KINDS}
+
+    for name in names["workflows"]:
+        source = parser.get_definitions_path() / f"{name}.yaml"
+        sources = describe([source])
+        data = parser.load_yaml(source)
+        errors = parser.validate_against_schema(data, "workflow")
+        warnings.extend(f"workflows/{name}: {e}" for e in errors)
+        bundle["workflows"][name] = {"sources": sources, "data": data}
+
+    for name in names["permissions"]:
+        stamps: parser.FileStamps = []
+        profile = parser._load_permissions(name, {}, stamps)
+        sources = describe([p for p, _ in stamps])
+        bundle["permissions"][name] = {"sources": sources, "data": asdict(profile)}
+
+    for name in names["preferences"]:
+        source = parser.get_preferences_path() / f"{name}.yaml"
+        sources = describe([source])
+        bundle["preferences"][name] = {"sources": sources, "data": parser.load_yaml(source)}
+
+    content_hash = hash_content({
+        "version": BUNDLE_VERSION,
+        **{kind: bundle[kind] for kind in BUNDLE_KINDS},
+    })
+    document = {
+        "version": BUNDLE_VERSION,
+        "content_hash": content_hash,
+        "built_at": datetime.now().isoformat(),
+        **bundle,
+    }
+
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(
+        json.dumps(document, ensure_ascii=False, separators=(",", ":"), default=str),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, path)
+
+    return {
+        "path": str(path),
+        "content_hash": content_hash,
+        "entries": {kind: len(bundle[kind]) for kind in BUNDLE_KINDS},
+        "bytes": path.stat().st_size,
+        "warnings": warnings,
+    }
+
+
+def load_all_definitions() -> int:
+    """Load every workflow, permissions and preferences profile; return the count."""
+    count = 0
+    for name in parser.list_workflows():
+        parser.load_workflow(name)
+        count += 1
+    for name in _source_names()["permissions"]:
+        parser.load_permissions(name)
+        count += 1
+    for name in _source_names()["preferences"]:
+        parser.load_preferences(name)
+        count += 1
+    return count
+
+
+def measure_startup(use_bundle: bool) -> float:
+    """Time a cold load of all definitions (seconds), with or without bundle."""
+    parser.clear_definition_cache()
+    set_bundle_enabled(use_bundle)
+    try:
+        start = time.perf_counter()
+        load_all_definitions()
+        return time.perf_counter() - start
+    finally:
+        parser.clear_definition_cache()
+        set_bundle_enabled(True)
+
+
+# ═══════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    command = args[0] if args else "build"
+
+    if command == "build":
+        before = measure_startup(use_bundle=False)
+        summary = build_bundle()
+        after = measure_startup(use_bundle=True)
+
+        print(f"Bundle written: {summary['path']} ({summary['bytes']} bytes)")
+        print(f"Content hash:   {summary['content_hash']}")
+        print("Entries:        " + ", ".join(f"{k}={v}" for k, v in summary["entries"].items()))
+        for warning in summary["warnings"]:
+            print(f"Schema warning: {warning}")
+        print(f"Startup (YAML):   {before * 1000:.1f} ms")
+        print(f"Startup (bundle): {after * 1000:.1f} ms")
+        return 0
+
+    if command == "check":
+        bundle = get_bundle()
+        if bundle is None:
+            print("No bundle found - run: python -m workflows.engine.bundle build")
+            return 1
+        stale = bundle.stale_entries()
+        print(f"Bundle {bundle.content_hash[:12]} ({bundle.data.get('built_at')})")
+        if stale:
+            print("Stale (loaded from YAML): " + ", ".join(stale))
+            return 1
+        print("All entries fresh")
+        return 0
+
+    print(f"Unknown command: {command} (use 'build' or 'check')")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
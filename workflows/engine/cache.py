@@ -0,0 +1,296 @@
+"""
+Workflow Engine - Step Result Cache
+
+Persistent memoization of step results keyed on their interpolated inputs.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# ═══════════════════════════════════════════════════════════════
+# TTL PARSING
+# ═══════════════════════════════════════════════════════════════
+
+TTL_UNITS = {
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+}
+
+
+def parse_ttl(ttl: str) -> float:
+    """Parse a TTL string like '30m' or '7d' to seconds."""
+    ttl = str(ttl).strip()
+    if ttl and ttl[-1] in TTL_UNITS:
+        return float(ttl[:-1]) * TTL_UNITS[ttl[-1]]
+    return float(ttl)
+
+
+def hash_content(content: Any) -> str:
+    """Stable SHA-256 digest of a string, bytes or JSON-serializable value."""
+    if isinstance(content, bytes):
+        raw = content
+    elif isinstance(content, str):
+        raw = content.encode("utf-8")
+    else:
+        raw = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════
+# STEP CACHE
+# ═══════════════════════════════════════════════════════════════
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    step_name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+"""
+
+
+class StepCache:
+    """
+    Persistent LRU cache for step results.
+
+    Layout:
+        workflows/cache/index.db        - entry metadata (SQLite)
+        workflows/cache/<key>.json      - cached result payloads
+
+    Keys are derived from the step type, the selected model and a hash of
+    the fully interpolated inputs (see StepExecutor.resolve_inputs), so a
+    changed upstream value or referenced file always misses.
+
+    The index is shared by every cache instance and worker process on
+    the directory: inserts and evictions run in one SQLite transaction,
+    so the size limits hold across all of them. A hit only records its
+    access time when the stored one is older than ACCESS_RESOLUTION_SECONDS.
+    """
+
+    DEFAULT_MAX_ENTRIES = 500
+    DEFAULT_MAX_BYTES = 50 * 1024 * 1024  # 50MB
+    ACCESS_RESOLUTION_SECONDS = 60.0
+    BUSY_TIMEOUT_SECONDS = 30.0
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.cache_dir = cache_dir or Path("workflows/cache")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+    # ─────────────────────────────────────────────────────────────
+    # PUBLIC API
+    # ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def make_key(step_type: str, model: str, inputs: Dict[str, Any]) -> str:
+        """Build a cache key from step type, model and resolved inputs."""
+        return hash_content({
+            "type": step_type,
+            "model": model,
+            "inputs": hash_content(inputs),
+        })
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload for a key, or None on miss/expiry."""
+        row = self.conn.execute(
+            "SELECT expires_at, last_access FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        if now >= row["expires_at"]:
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        try:
+            payload = json.loads(self._entry_path(key).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        if now - row["last_access"] >= self.ACCESS_RESOLUTION_SECONDS:
+            with self.conn as conn:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+
+        self.hits += 1
+        return payload
+
+    def put(
+        self,
+        key: str,
+        step_name: str,
+        payload: Dict[str, Any],
+        ttl_seconds: float,
+    ):
+        """Store a payload and evict least-recently-used entries if needed."""
+        content = json.dumps(payload, ensure_ascii=False, default=str)
+        size = len(content.encode("utf-8"))
+
+        # Never cache values that could not fit at all
+        if size > self.max_bytes:
+            return
+
+        path = self._entry_path(key)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(content, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self.conn as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, step_name, created_at, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, step_name, now, now + ttl_seconds, now, size),
+            )
+            evicted = self._evict(conn, now)
+        self._unlink(evicted)
+
+    def invalidate(self, key: str):
+        """Remove a single entry."""
+        with self.conn as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._unlink([key])
+
+    def clear(self):
+        """Remove all cached results (including payloads no entry refers to)."""
+        with self.conn as conn:
+            conn.execute("DELETE FROM entries")
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        entries, total_bytes = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._open()
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        """Open the index; a corrupt one is replaced and its payloads dropped."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        db_path = self.cache_dir / "index.db"
+        try:
+            return self._connect(db_path)
+        except sqlite3.DatabaseError as e:
+            logging.warning(f"Step cache index {db_path} is unreadable ({e}); clearing the cache")
+            for path in [*self.cache_dir.glob("index.db*"), *self.cache_dir.glob("*.json")]:
+                path.unlink(missing_ok=True)
+            return self._connect(db_path)
+
+    def _connect(self, db_path: Path) -> sqlite3.Connection:
+        # Transactions are explicit (BEGIN IMMEDIATE for writes that evict)
+        conn = sqlite3.connect(str(db_path), timeout=self.BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._migrate_json_index(conn)
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def _migrate_json_index(self, conn: sqlite3.Connection):
+        """Import the entries of a legacy index.json."""
+        legacy = self.cache_dir / "index.json"
+        if not legacy.exists():
+            return
+        try:
+            entries = json.loads(legacy.read_text(encoding="utf-8")).get("entries", [])
+            rows = [
+                (e["key"], e["step_name"], e["created_at"], e["expires_at"], e["last_access"], e["size"])
+                for e in entries
+            ]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            rows = []
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO entries "
+                "(key, step_name, created_at, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        legacy.unlink(missing_ok=True)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _unlink(self, keys: List[str]):
+        for key in keys:
+            self._entry_path(key).unlink(missing_ok=True)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> List[str]:
+        """Delete expired entries, then LRU entries until within limits; return their keys."""
+        evicted = [
+            row["key"] for row in conn.execute("SELECT key FROM entries WHERE expires_at <= ?", (now,))
+        ]
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+
+        entries, total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if entries <= self.max_entries and total_bytes <= self.max_bytes:
+            return evicted
+
+        lru = []
+        for row in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            lru.append(row["key"])
+            entries -= 1
+            total_bytes -= row["size"]
+        conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in lru])
+        return evicted + lru
@@ -5,14 +5,21 @@ Manages workflow state, step results, and execution history.
 """
 
 import json
+import logging
+import time
 import uuid
+from collections import ChainMap, deque
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Union
 
+from workflows.engine.interpolation import SerializationCache
 from workflows.engine.models import StepStatus, LogLevel
+from workflows.engine.persistence import get_writer
+from workflows.engine.streaming import EventChannel
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -29,13 +36,30 @@ class LogType(str, Enum):
     TOOL_CALL = "tool_call"
 
 
-@dataclass
 class LogEntry:
-    timestamp: datetime
-    type: LogType
-    message: str
-    step: Optional[str] = None
-    data: Optional[Dict[str, Any]] = None
+    """A single log record (slotted to keep long runs compact)."""
+
+    __slots__ = ("seq", "ts", "type", "message", "step", "data")
+
+    def __init__(
+        self,
+        timestamp: Union[datetime, float],
+        type: LogType,
+        message: str,
+        step: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+        seq: int = 0,
+    ):
+        self.seq = seq
+        self.ts = timestamp.timestamp() if isinstance(timestamp, datetime) else timestamp
+        self.type = type
+        self.message = message
+        self.step = step
+        self.data = data
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.ts)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -47,6 +71,115 @@ class LogEntry:
         }
 
 
+# Log types recorded per log level
+LOG_LEVEL_TYPES = {
+    LogLevel.MINIMAL: frozenset({LogType.ERROR, LogType.STEP_START, LogType.STEP_END}),
+    LogLevel.STANDARD: frozenset(t for t in LogType if t != LogType.DEBUG),
+    LogLevel.VERBOSE: frozenset(LogType),
+}
+
+
+# ═══════════════════════════════════════════════════════════════
+# LOG STORE
+# ═══════════════════════════════════════════════════════════════
+
+class LogStore:
+    """
+    Bounded ring buffer of log entries with a per-step index.
+
+    When full, the oldest entries are dropped from memory and spilled
+    as JSON lines to spill_path. Spills are written by the caller in
+    batches of SPILL_BATCH entries (one small append per batch), so a
+    chatty step pays for its own I/O instead of growing a queue; call
+    flush_spill() before reading the spill file.
+    Entries carry a monotonically increasing sequence number.
+    """
+
+    DEFAULT_CAPACITY = 5000
+    SPILL_BATCH = 256
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, spill_path: Optional[Path] = None):
+        self.capacity = max(1, capacity)
+        self.spill_path = spill_path
+        self.spilled = 0
+
+        self._entries: Deque[LogEntry] = deque()
+        self._by_step: Dict[str, Deque[LogEntry]] = {}
+        self._next_seq = 0
+        # Evicted entries not yet written to spill_path
+        self._spill: List[LogEntry] = []
+
+    def append(self, entry: LogEntry):
+        """Add an entry, evicting (and spilling) the oldest when full."""
+        entry.seq = self._next_seq
+        self._next_seq += 1
+
+        if len(self._entries) >= self.capacity:
+            self._evict()
+
+        self._entries.append(entry)
+        if entry.step is not None:
+            self._by_step.setdefault(entry.step, deque()).append(entry)
+
+    def for_step(self, step: str) -> List[LogEntry]:
+        """Get in-memory entries for a step."""
+        return list(self._by_step.get(step, ()))
+
+    def since(self, seq: int) -> List[LogEntry]:
+        """Get in-memory entries with a sequence number >= seq."""
+        if not self._entries or seq <= self._entries[0].seq:
+            return list(self._entries)
+        offset = seq - self._entries[0].seq
+        return [self._entries[i] for i in range(offset, len(self._entries))]
+
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[LogEntry]:
+        return iter(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._entries)[index]
+        return self._entries[index]
+
+    def _evict(self):
+        """Drop the oldest entry, spilling it to disk if configured."""
+        entry = self._entries.popleft()
+
+        if entry.step is not None:
+            step_entries = self._by_step[entry.step]
+            step_entries.popleft()
+            if not step_entries:
+                del self._by_step[entry.step]
+
+        if self.spill_path is not None:
+            self._spill.append(entry)
+            if len(self._spill) >= self.SPILL_BATCH:
+                self.flush_spill()
+        self.spilled += 1
+
+    def flush_spill(self):
+        """Append the buffered spilled entries to spill_path."""
+        if not self._spill:
+            return
+        text = "".join(
+            json.dumps(entry.to_dict(), ensure_ascii=False, default=str) + "\n"
+            for entry in self._spill
+        )
+        self._spill.clear()
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(text)
+        except OSError as e:
+            logging.warning(f"Log spill to {self.spill_path} failed: {e}")
+
+
 # ═══════════════════════════════════════════════════════════════
 # CONTEXT SNAPSHOT (for checkpointing)
 # ═══════════════════════════════════════════════════════════════
@@ -62,6 +195,7 @@ class ContextSnapshot:
     token_usage: int
     cost: float
     timestamp: datetime
+    step_metrics: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -73,6 +207,7 @@ class ContextSnapshot:
             "token_usage": self.token_usage,
             "cost": self.cost,
             "timestamp": self.timestamp.isoformat(),
+            "step_metrics": self.step_metrics,
         }
 
     @classmethod
@@ -86,6 +221,7 @@ class ContextSnapshot:
             token_usage=data["token_usage"],
             cost=data["cost"],
             timestamp=datetime.fromisoformat(data["timestamp"]),
+            step_metrics=data.get("step_metrics", {}),
         )
 
 
@@ -95,15 +231,15 @@ class ContextSnapshot:
 
 # Approximate costs per 1M tokens (input/output averaged)
 MODEL_COSTS = {
-    "haiku": 0.00025,      # $0.25 per 1M tokens
-    "sonnet": 0.003,       # $3.00 per 1M tokens
-    "opus": 0.015,         # $15.00 per 1M tokens
-    "claude-3-haiku": 0.00025,
-    "claude-3-sonnet": 0.003,
-    "claude-3-opus": 0.015,
-    "claude-3-5-sonnet": 0.003,
-    "claude-sonnet-4": 0.003,
-    "claude-opus-4": 0.015,
+    "haiku": 0.25,         # $0.25 per 1M tokens
+    "sonnet": 3.00,        # $3.00 per 1M tokens
+    "opus": 15.00,         # $15.00 per 1M tokens
+    "claude-3-haiku": 0.25,
+    "claude-3-sonnet": 3.00,
+    "claude-3-opus": 15.00,
+    "claude-3-5-sonnet": 3.00,
+    "claude-sonnet-4": 3.00,
+    "claude-opus-4": 15.00,
 }
 
 
@@ -118,6 +254,17 @@ def estimate_cost(tokens: int, model: str) -> float:
     return (tokens / 1_000_000) * MODEL_COSTS["sonnet"]
 
 
+# ═══════════════════════════════════════════════════════════════
+# RUN IDS
+# ═══════════════════════════════════════════════════════════════
+
+def generate_run_id() -> str:
+    """Generate a unique run ID ("20250101-120000-1a2b3c4d")."""
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    short_uuid = str(uuid.uuid4())[:8]
+    return f"{timestamp}-{short_uuid}"
+
+
 # ═══════════════════════════════════════════════════════════════
 # WORKFLOW CONTEXT
 # ═══════════════════════════════════════════════════════════════
@@ -139,10 +286,14 @@ class WorkflowContext:
         workflow_name: str,
         run_id: Optional[str] = None,
         log_level: LogLevel = LogLevel.STANDARD,
+        log_capacity: int = LogStore.DEFAULT_CAPACITY,
+        blob_threshold: Optional[int] = None,
+        logs_dir: Optional[Path] = None,
     ):
         self.workflow_name = workflow_name
-        self.run_id = run_id or self._generate_run_id()
+        self.run_id = run_id or generate_run_id()
         self.log_level = log_level
+        self._log_types = LOG_LEVEL_TYPES[log_level]
 
         self.started_at = datetime.now()
         self.completed_at: Optional[datetime] = None
@@ -150,26 +301,54 @@ class WorkflowContext:
         # State
         self.variables: Dict[str, Any] = {}
         self.step_results: Dict[str, Any] = {}
+        self.step_metrics: Dict[str, Dict[str, Any]] = {}
         self.current_step: int = 0
         self.current_step_name: Optional[str] = None
         self.status: StepStatus = StepStatus.PENDING
 
+        # Layered read view: scope overlays > meta > step results > variables
+        self._scopes: List[Dict[str, Any]] = []
+        self._view: ChainMap = ChainMap()
+        self._rebuild_view()
+
+        # Rendered values for interpolation, invalidated on every store
+        self.serialization = SerializationCache(blob_threshold=blob_threshold)
+
         # Accounting
         self.token_usage: int = 0
         self.cost: float = 0.0
 
-        # Logs
-        self.logs: List[LogEntry] = []
+        # Logs (overflow spills next to the run log)
+        logs_dir = logs_dir or Path("workflows/logs")
+        self.logs = LogStore(
+            capacity=log_capacity,
+            spill_path=logs_dir / f"{workflow_name}-{self.run_id}.spill.jsonl",
+        )
+
+        # Change notifications for live subscribers (see streaming.RunStream)
+        self.events = EventChannel()
 
         # Checkpoint path
         self._checkpoint_dir = Path("workflows/checkpoints")
         self._checkpoint_dir.mkdir(parents=True, exist_ok=True)
 
-    def _generate_run_id(self) -> str:
-        """Generate unique run ID."""
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        short_uuid = str(uuid.uuid4())[:8]
-        return f"{timestamp}-{short_uuid}"
+        # Checkpoint journal state (keys changed since last checkpoint)
+        self._dirty: Dict[str, Set[str]] = {
+            "variables": set(),
+            "step_results": set(),
+            "step_metrics": set(),
+        }
+        self._needs_compaction = True
+        self._deltas_since_compaction = 0
+        # Writer sequence number of the latest checkpoint record
+        self.checkpoint_seq: Optional[int] = None
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self.checkpoint_stats: Dict[str, int] = {
+            "checkpoints": 0,
+            "compactions": 0,
+            "bytes_written": 0,
+        }
 
     # ─────────────────────────────────────────────────────────────
     # VARIABLE MANAGEMENT
@@ -178,10 +357,18 @@ class WorkflowContext:
     def store(self, key: str, value: Any):
         """Store a value in context."""
         self.variables[key] = value
-        self._log(LogType.DEBUG, f"Stored '{key}'", data={"key": key})
+        self._dirty["variables"].add(key)
+        self.serialization.bump()
+        if LogType.DEBUG in self._log_types:
+            self._log(LogType.DEBUG, f"Stored '{key}'", data={"key": key})
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get a value from context."""
+        # Innermost scope overlays first (e.g. loop variables)
+        for scope in reversed(self._scopes):
+            if key in scope:
+                return scope[key]
+
         # Check variables first
         if key in self.variables:
             return self.variables[key]
@@ -193,22 +380,79 @@ class WorkflowContext:
         return default
 
     def get_all(self) -> Dict[str, Any]:
-        """Get all context data for interpolation."""
-        return {
-            **self.variables,
-            **self.step_results,
-            "workflow": self.workflow_name,
-            "run_id": self.run_id,
-        }
+        """Get a merged copy of all context data (prefer view())."""
+        return dict(self._view)
+
+    def view(self) -> ChainMap:
+        """
+        Get a live, zero-copy view of all context data for interpolation.
+
+        Lookups read through scope overlays, then workflow/run_id, step
+        results and variables. Later stores are visible immediately.
+        """
+        return self._view
+
+    def scoped_variables(self) -> ChainMap:
+        """Get variables with active scope overlays applied (zero-copy)."""
+        return ChainMap(*reversed(self._scopes), self.variables)
+
+    @contextmanager
+    def scope(self, **bindings: Any):
+        """
+        Push a copy-on-write overlay for the duration of a block.
+
+        Bindings shadow existing values without modifying them and are
+        discarded when the block exits (used for loop variables).
+        """
+        overlay = dict(bindings)
+        self._scopes.append(overlay)
+        self._view.maps.insert(0, overlay)
+        try:
+            yield overlay
+        finally:
+            self._scopes.remove(overlay)
+            self._view.maps.remove(overlay)
+
+    def _rebuild_view(self):
+        """Re-link the view after state dicts were replaced."""
+        self._view.maps[:] = [
+            *reversed(self._scopes),
+            {"workflow": self.workflow_name, "run_id": self.run_id},
+            self.step_results,
+            self.variables,
+        ]
 
     def store_step_result(self, step_name: str, result: Any):
         """Store a step's result."""
         self.step_results[step_name] = result
-        self._log(
-            LogType.DEBUG,
-            f"Stored step result for '{step_name}'",
-            step=step_name,
-        )
+        self._dirty["step_results"].add(step_name)
+        self.serialization.bump()
+        if LogType.DEBUG in self._log_types:
+            self._log(
+                LogType.DEBUG,
+                f"Stored step result for '{step_name}'",
+                step=step_name,
+            )
+
+    def record_step(
+        self,
+        step_name: str,
+        result: Any = None,
+        fingerprint: Optional[str] = None,
+        reused: bool = False,
+    ):
+        """Record per-step execution metrics (status, fingerprint, usage)."""
+        self.step_metrics[step_name] = {
+            "status": result.status.value if result else StepStatus.SUCCESS.value,
+            "fingerprint": fingerprint,
+            "reused": reused,
+            "tokens": result.tokens_used if result else 0,
+            "duration_ms": result.duration_ms if result else 0,
+            "model": result.model_used if result else None,
+            "cache_hit": result.cache_hit if result else False,
+        }
+        self._dirty["step_metrics"].add(step_name)
+        self.events.publish()
 
     # ─────────────────────────────────────────────────────────────
     # TOKEN & COST TRACKING
@@ -218,6 +462,7 @@ class WorkflowContext:
         """Add token usage and update cost estimate."""
         self.token_usage += count
         self.cost += estimate_cost(count, model)
+        self.events.publish()
 
     def get_usage(self) -> Dict[str, Any]:
         """Get current usage statistics."""
@@ -226,6 +471,7 @@ class WorkflowContext:
             "cost": round(self.cost, 4),
             "steps_completed": len(self.step_results),
             "duration_seconds": self._get_duration_seconds(),
+            "checkpoint_bytes": self.checkpoint_stats["bytes_written"],
         }
 
     def _get_duration_seconds(self) -> float:
@@ -289,32 +535,40 @@ class WorkflowContext:
         data: Optional[Dict[str, Any]] = None,
     ):
         """Internal logging method."""
-        # Filter by log level
-        if self.log_level == LogLevel.MINIMAL:
-            if log_type not in (LogType.ERROR, LogType.STEP_START, LogType.STEP_END):
-                return
+        # Filter by log level before allocating anything
+        if log_type not in self._log_types:
+            return
 
-        entry = LogEntry(
-            timestamp=datetime.now(),
-            type=log_type,
-            message=message,
-            step=step,
-            data=data,
-        )
-        self.logs.append(entry)
+        self.logs.append(LogEntry(time.time(), log_type, message, step, data))
+        self.events.publish()
 
     def get_logs(self, step: Optional[str] = None) -> List[LogEntry]:
-        """Get logs, optionally filtered by step."""
+        """Get in-memory logs, optionally filtered by step."""
         if step:
-            return [log for log in self.logs if log.step == step]
-        return self.logs
+            return self.logs.for_step(step)
+        return list(self.logs)
 
     # ─────────────────────────────────────────────────────────────
     # CHECKPOINTING
     # ─────────────────────────────────────────────────────────────
 
+    # Compact the journal after this many deltas...
+    COMPACT_EVERY = 20
+    # ...or once it grows beyond this multiple of the last full snapshot
+    COMPACT_RATIO = 4
+
     def checkpoint(self) -> ContextSnapshot:
-        """Create a snapshot for crash recovery."""
+        """
+        Create a snapshot for crash recovery.
+
+        Persists to an append-only journal: only keys changed since the
+        previous checkpoint are written as a delta record. The journal is
+        periodically compacted into a single full snapshot record.
+
+        Records are written (and fsynced) by the background writer;
+        checkpoint_seq is the writer sequence number to flush for the
+        checkpoint to be durable.
+        """
         snapshot = ContextSnapshot(
             run_id=self.run_id,
             workflow_name=self.workflow_name,
@@ -324,15 +578,54 @@ class WorkflowContext:
             token_usage=self.token_usage,
             cost=self.cost,
             timestamp=datetime.now(),
+            step_metrics=self.step_metrics.copy(),
         )
 
-        # Persist to disk
-        checkpoint_path = self._get_checkpoint_path()
-        checkpoint_path.write_text(
-            json.dumps(snapshot.to_dict(), indent=2, ensure_ascii=False)
-        )
+        journal_path = self._get_journal_path()
+        writer = get_writer()
+
+        if (
+            self._needs_compaction
+            or self._deltas_since_compaction >= self.COMPACT_EVERY
+            or self._journal_bytes > self.COMPACT_RATIO * max(self._snapshot_bytes, 1)
+        ):
+            record = {"op": "snapshot", **snapshot.to_dict()}
+            self.checkpoint_seq = writer.write(
+                journal_path,
+                lambda: self._encode_journal_record(record),
+                on_written=self._on_snapshot_written,
+                durable=True,
+            )
+            self._deltas_since_compaction = 0
+            self._needs_compaction = False
+            self.checkpoint_stats["compactions"] += 1
+        else:
+            record = {
+                "op": "delta",
+                "current_step": self.current_step,
+                "token_usage": self.token_usage,
+                "cost": self.cost,
+                "timestamp": snapshot.timestamp.isoformat(),
+            }
+            for section, keys in self._dirty.items():
+                state = getattr(self, section)
+                if keys:
+                    record[section] = {k: state[k] for k in keys if k in state}
+            self.checkpoint_seq = writer.append(
+                journal_path,
+                lambda: self._encode_journal_record(record),
+                on_written=self._on_delta_written,
+                durable=True,
+            )
+            self._deltas_since_compaction += 1
+
+        for keys in self._dirty.values():
+            keys.clear()
 
-        self._log(LogType.DEBUG, f"Checkpoint created at step {self.current_step}")
+        self.checkpoint_stats["checkpoints"] += 1
+
+        if LogType.DEBUG in self._log_types:
+            self._log(LogType.DEBUG, f"Checkpoint created at step {self.current_step}")
         return snapshot
 
     def restore(self, snapshot: ContextSnapshot):
@@ -342,40 +635,108 @@ class WorkflowContext:
         self.current_step = snapshot.current_step
         self.variables = snapshot.variables.copy()
         self.step_results = snapshot.step_results.copy()
+        self.step_metrics = snapshot.step_metrics.copy()
         self.token_usage = snapshot.token_usage
         self.cost = snapshot.cost
+        self._rebuild_view()
+        self.serialization.bump()
+
+        # Next checkpoint rewrites the full state
+        self._needs_compaction = True
 
         self._log(
             LogType.INFO,
             f"Restored from checkpoint at step {self.current_step}",
         )
 
+    def _on_snapshot_written(self, size: int):
+        """Writer-thread callback after a journal compaction."""
+        self._snapshot_bytes = size
+        self._journal_bytes = size
+        self.checkpoint_stats["bytes_written"] += size
+
+    def _on_delta_written(self, size: int):
+        """Writer-thread callback after a delta append."""
+        self._journal_bytes += size
+        self.checkpoint_stats["bytes_written"] += size
+
+    def _encode_journal_record(self, record: Dict[str, Any]) -> str:
+        """Encode a journal record as a single compact JSON line."""
+        return json.dumps(
+            record, ensure_ascii=False, separators=(",", ":"), default=str
+        ) + "\n"
+
     def _get_checkpoint_path(self) -> Path:
-        """Get path for checkpoint file."""
+        """Get path for legacy (full JSON) checkpoint file."""
         return self._checkpoint_dir / f"{self.workflow_name}-{self.run_id}.json"
 
+    def _get_journal_path(self) -> Path:
+        """Get path for the checkpoint journal."""
+        return self._checkpoint_dir / f"{self.workflow_name}-{self.run_id}.journal"
+
     def clear_checkpoint(self):
-        """Remove checkpoint file after successful completion."""
-        checkpoint_path = self._get_checkpoint_path()
-        if checkpoint_path.exists():
-            checkpoint_path.unlink()
+        """Remove checkpoint files after successful completion."""
+        writer = get_writer()
+        writer.delete(self._get_journal_path())
+        writer.delete(self._get_checkpoint_path())
+        self._needs_compaction = True
 
     @classmethod
-    def load_checkpoint(cls, workflow_name: str, run_id: str) -> Optional['WorkflowContext']:
-        """Load context from a checkpoint file."""
+    def load_checkpoint(
+        cls, workflow_name: str, run_id: str, logs_dir: Optional[Path] = None
+    ) -> Optional['WorkflowContext']:
+        """Load context from a checkpoint journal (or legacy checkpoint file)."""
         checkpoint_dir = Path("workflows/checkpoints")
+        journal_path = checkpoint_dir / f"{workflow_name}-{run_id}.journal"
         checkpoint_path = checkpoint_dir / f"{workflow_name}-{run_id}.json"
 
-        if not checkpoint_path.exists():
+        # Make sure queued journal writes from this process are on disk
+        get_writer().flush()
+
+        if journal_path.exists():
+            snapshot = cls._replay_journal(journal_path)
+        elif checkpoint_path.exists():
+            data = json.loads(checkpoint_path.read_text())
+            snapshot = ContextSnapshot.from_dict(data)
+        else:
             return None
 
-        data = json.loads(checkpoint_path.read_text())
-        snapshot = ContextSnapshot.from_dict(data)
+        if snapshot is None:
+            return None
 
-        context = cls(workflow_name=workflow_name, run_id=run_id)
+        context = cls(workflow_name=workflow_name, run_id=run_id, logs_dir=logs_dir)
         context.restore(snapshot)
         return context
 
+    @staticmethod
+    def _replay_journal(journal_path: Path) -> Optional[ContextSnapshot]:
+        """Rebuild a snapshot by replaying journal records in order."""
+        state: Optional[Dict[str, Any]] = None
+
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write at the tail after a crash
+                    break
+
+                if record.get("op") == "snapshot":
+                    state = record
+                    state.setdefault("step_metrics", {})
+                elif state is not None:
+                    for section in ("variables", "step_results", "step_metrics"):
+                        state[section].update(record.get(section, {}))
+                    for key in ("current_step", "token_usage", "cost", "timestamp"):
+                        state[key] = record[key]
+
+        if state is None:
+            return None
+        return ContextSnapshot.from_dict(state)
+
     # ─────────────────────────────────────────────────────────────
     # STATUS MANAGEMENT
     # ─────────────────────────────────────────────────────────────
@@ -383,23 +744,27 @@ class WorkflowContext:
     def mark_running(self):
         """Mark workflow as running."""
         self.status = StepStatus.RUNNING
+        self.events.publish()
 
     def mark_completed(self):
         """Mark workflow as completed successfully."""
         self.status = StepStatus.SUCCESS
         self.completed_at = datetime.now()
         self.clear_checkpoint()
+        self.events.publish()
 
     def mark_failed(self, error: str):
         """Mark workflow as failed."""
         self.status = StepStatus.FAILED
         self.completed_at = datetime.now()
         self.log_error(error)
+        self.events.publish()
 
     def mark_paused(self):
         """Mark workflow as paused (for manual intervention)."""
         self.status = StepStatus.PAUSED
         self.checkpoint()
+        self.events.publish()
 
     # ─────────────────────────────────────────────────────────────
     # SERIALIZATION
@@ -416,9 +781,11 @@ class WorkflowContext:
             "current_step": self.current_step,
             "variables": self.variables,
             "step_results": self.step_results,
+            "step_metrics": self.step_metrics,
             "token_usage": self.token_usage,
             "cost": round(self.cost, 4),
             "logs": [log.to_dict() for log in self.logs],
+            "logs_spilled": self.logs.spilled,
         }
 
     def to_summary(self) -> Dict[str, Any]:
@@ -0,0 +1,218 @@
+"""
+Workflow Engine - Cron Expressions
+
+Compiles 5-field cron expressions into bitsets for fast next-fire lookup.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# (name, minimum, maximum) per field
+CRON_FIELDS: Tuple[Tuple[str, int, int], ...] = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),  # 0 and 7 are both Sunday
+)
+
+CRON_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTH_NAMES = {
+    name: i + 1
+    for i, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+    )
+}
+WEEKDAY_NAMES = {
+    name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])
+}
+
+# Upper bound for the day-by-day search (covers Feb 29 on a Monday etc.)
+MAX_SEARCH_DAYS = 366 * 28
+
+
+class CronExpression:
+    """
+    Cron expression compiled to one bitset per field.
+
+    Supports "*", values, ranges ("1-5"), steps ("*/15", "10-40/10",
+    "5/20"), lists ("1,15"), month/weekday names ("mon-fri", "jan") and
+    the @hourly/@daily/@weekly/@monthly/@yearly macros.
+
+    Day-of-month and day-of-week follow classic cron semantics: if both
+    are restricted, a day matches when either matches.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        source = CRON_MACROS.get(self.expression.lower(), self.expression)
+
+        parts = source.split()
+        if len(parts) != 5:
+            raise ValueError(
+                f"Invalid cron expression '{expression}': expected 5 fields, got {len(parts)}"
+            )
+
+        masks = [
+            self._compile_field(part, name, low, high)
+            for part, (name, low, high) in zip(parts, CRON_FIELDS)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = masks
+
+        # Fold Sunday=7 onto Sunday=0
+        if weekdays & (1 << 7):
+            weekdays = (weekdays | 1) & ~(1 << 7)
+        self.weekdays = weekdays
+
+        self._day_restricted = not parts[2].startswith("*")
+        self._weekday_restricted = not parts[4].startswith("*")
+
+    # ─────────────────────────────────────────────────────────────
+    # PUBLIC API
+    # ─────────────────────────────────────────────────────────────
+
+    def matches(self, moment: datetime) -> bool:
+        """Check whether a moment (minute resolution) matches."""
+        return (
+            self._bit(self.minutes, moment.minute)
+            and self._bit(self.hours, moment.hour)
+            and self._bit(self.months, moment.month)
+            and self._day_matches(moment)
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Return the first matching minute strictly after `moment`."""
+        current = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=MAX_SEARCH_DAYS)
+
+        while current < limit:
+            if not self._bit(self.months, current.month):
+                # Jump to the first day of the next month
+                year = current.year + (current.month == 12)
+                month = current.month % 12 + 1
+                current = current.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+
+            if not self._day_matches(current):
+                current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+
+            hour = self._next_bit(self.hours, current.hour)
+            if hour is None:
+                current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if hour != current.hour:
+                current = current.replace(hour=hour, minute=0)
+
+            minute = self._next_bit(self.minutes, current.minute)
+            if minute is None:
+                current = (current + timedelta(hours=1)).replace(minute=0)
+                continue
+
+            return current.replace(minute=minute)
+
+        raise ValueError(f"Cron expression '{self.expression}' never fires")
+
+    def iter_between(self, start: datetime, end: datetime) -> Iterator[datetime]:
+        """Yield matching minutes in (start, end]."""
+        current = self.next_after(start)
+        while current <= end:
+            yield current
+            current = self.next_after(current)
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = self._bit(self.days, moment.day)
+        # Python: Monday=0; cron: Sunday=0
+        weekday_ok = self._bit(self.weekdays, (moment.weekday() + 1) % 7)
+
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    @staticmethod
+    def _bit(mask: int, value: int) -> bool:
+        return bool(mask >> value & 1)
+
+    @staticmethod
+    def _next_bit(mask: int, start: int) -> Optional[int]:
+        """Lowest set bit >= start, or None."""
+        remaining = mask >> start
+        if not remaining:
+            return None
+        return start + (remaining & -remaining).bit_length() - 1
+
+    def _compile_field(self, part: str, name: str, low: int, high: int) -> int:
+        names: Dict[str, int] = {}
+        if name == "month":
+            names = MONTH_NAMES
+        elif name == "weekday":
+            names = WEEKDAY_NAMES
+
+        mask = 0
+        for item in part.lower().split(","):
+            range_part, _, step_part = item.partition("/")
+            step = int(step_part) if step_part else 1
+            if step < 1:
+                raise self._error(part, name)
+
+            if range_part == "*":
+                start, end = low, high
+            elif "-" in range_part:
+                first, _, last = range_part.partition("-")
+                start, end = self._value(first, names, part, name), self._value(last, names, part, name)
+            else:
+                start = self._value(range_part, names, part, name)
+                # "5/20" means from 5 to the end of the range
+                end = high if step_part else start
+
+            if not (low <= start <= high and low <= end <= high and start <= end):
+                raise self._error(part, name)
+
+            for value in range(start, end + 1, step):
+                mask |= 1 << value
+
+        return mask
+
+    def _value(self, token: str, names: Dict[str, int], part: str, name: str) -> int:
+        if token in names:
+            return names[token]
+        try:
+            return int(token)
+        except ValueError:
+            raise self._error(part, name)
+
+    def _error(self, part: str, name: str) -> ValueError:
+        return ValueError(f"Invalid cron {name} field '{part}' in '{self.expression}'")
+
+
+def parse_cron(expression: str) -> CronExpression:
+    """Compile a cron expression (raises ValueError if invalid)."""
+    return CronExpression(expression)
+
+
+def upcoming_runs(expression: str, count: int = 5, after: Optional[datetime] = None) -> List[datetime]:
+    """Return the next `count` fire times of an expression."""
+    cron = CronExpression(expression)
+    current = after or datetime.now()
+    runs = []
+    for _ in range(count):
+        current = cron.next_after(current)
+        runs.append(current)
+    return runs
@@ -0,0 +1,182 @@
+"""
+Workflow Engine - Step Dependencies
+
+Derives the step dependency graph from {{variable}} references.
+"""
+
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from workflows.engine.interpolation import Interpolator
+from workflows.engine.models import StepDefinition, WorkflowDefinition
+
+
+# Step fields that may contain {{variable}} references
+TEMPLATE_FIELDS = (
+    "command",
+    "prompt",
+    "bash",
+    "script",
+    "condition",
+    "loop",
+    "output",
+    "template",
+)
+
+
+def step_references(step: StepDefinition) -> Set[str]:
+    """
+    Return the root names a step references.
+
+    Includes references from nested branch steps, so a branch step
+    depends on everything its sub-steps read. For loop steps the loop
+    expression (bare "items" or "{{items}}") counts, the per-iteration
+    names (loop_as, loop_index) do not.
+    """
+    refs: Set[str] = set()
+
+    for field_name in TEMPLATE_FIELDS:
+        value = getattr(step, field_name, None)
+        if value:
+            refs.update(_template_roots(value))
+
+    for branch in step.branch or []:
+        refs.update(_template_roots(branch.condition))
+        for sub_step in branch.steps:
+            refs.update(step_references(sub_step))
+
+    if step.loop:
+        refs -= {step.loop_as or "item", "loop_index"}
+        refs.update(_template_roots(step.loop) or {_root(step.loop)})
+
+    return refs
+
+
+def step_outputs(step: StepDefinition) -> Set[str]:
+    """Return the context names a step writes (including branch sub-steps)."""
+    outputs: Set[str] = {step.name}
+    if step.store_as:
+        outputs.add(step.store_as)
+
+    for branch in step.branch or []:
+        for sub_step in branch.steps:
+            outputs.update(step_outputs(sub_step))
+
+    return outputs
+
+
+def step_dependencies(workflow: WorkflowDefinition) -> Dict[str, Set[str]]:
+    """
+    Map each step name to the names of the earlier steps it depends on.
+
+    A step depends on an earlier step if it references one of that step's
+    outputs, or names it via depends_on. A depends_on naming no earlier
+    step is ignored (the parser rejects it for loaded definitions).
+    """
+    producers: Dict[str, str] = {}
+    dependencies: Dict[str, Set[str]] = {}
+
+    for step in workflow.steps:
+        deps = {
+            producers[ref]
+            for ref in step_references(step)
+            if ref in producers and producers[ref] != step.name
+        }
+        if step.depends_on in dependencies:
+            deps.add(step.depends_on)
+
+        dependencies[step.name] = deps
+
+        for output in step_outputs(step):
+            producers[output] = step.name
+
+    return dependencies
+
+
+def downstream_steps(
+    workflow: WorkflowDefinition,
+    changed: Iterable[str],
+) -> Set[str]:
+    """Return all steps transitively depending on any of the changed steps."""
+    dependencies = step_dependencies(workflow)
+    affected = set(changed)
+
+    # Steps are in execution order, so one forward pass is enough
+    for step in workflow.steps:
+        if dependencies[step.name] & affected:
+            affected.add(step.name)
+
+    return affected - set(changed)
+
+
+def critical_path(
+    workflow: WorkflowDefinition,
+    durations: Mapping[str, float],
+    dependencies: Optional[Dict[str, Set[str]]] = None,
+) -> Tuple[float, List[str]]:
+    """
+    Return the length and steps of the longest dependency chain.
+
+    This is the shortest possible wall-clock time if every step started
+    as soon as its dependencies finished. Steps missing from `durations`
+    count as 0; dependencies on steps that do not precede are ignored.
+    """
+    dependencies = dependencies or step_dependencies(workflow)
+    finish: Dict[str, float] = {}
+    via: Dict[str, Optional[str]] = {}
+
+    # Steps are in execution order, so one forward pass is enough
+    for step in workflow.steps:
+        previous = max(
+            (name for name in dependencies.get(step.name, ()) if name in finish),
+            key=lambda name: finish[name],
+            default=None,
+        )
+        finish[step.name] = (finish[previous] if previous else 0.0) + durations.get(step.name, 0.0)
+        via[step.name] = previous
+
+    if not finish:
+        return 0.0, []
+
+    name: Optional[str] = max(finish, key=lambda step_name: finish[step_name])
+    length = finish[name]
+    path = []
+    while name is not None:
+        path.append(name)
+        name = via[name]
+    return length, path[::-1]
+
+
+def parallel_levels(
+    workflow: WorkflowDefinition,
+    dependencies: Optional[Dict[str, Set[str]]] = None,
+) -> List[List[str]]:
+    """
+    Group steps by dependency depth; steps of one level are independent.
+
+    Dependencies on steps that do not precede are ignored.
+    """
+    dependencies = dependencies or step_dependencies(workflow)
+    depth: Dict[str, int] = {}
+    levels: List[List[str]] = []
+
+    for step in workflow.steps:
+        depth[step.name] = max(
+            (depth[name] + 1 for name in dependencies.get(step.name, ()) if name in depth),
+            default=0,
+        )
+        if depth[step.name] == len(levels):
+            levels.append([])
+        levels[depth[step.name]].append(step.name)
+
+    return levels
+
+
+def _template_roots(template: str) -> Set[str]:
+    """Extract the root variable names from a template string."""
+    return {_root(match.group(1)) for match in Interpolator.PATTERN.finditer(template)}
+
+
+def _root(expression: str) -> str:
+    """Root name of an accessor expression ("step.items[0]" -> "step")."""
+    return re.split(r"[.\[]", expression.strip(), maxsplit=1)[0]
@@ -0,0 +1,303 @@
+"""
+Workflow Engine - Run Estimator
+
+Cost, token and duration estimates for a workflow run, learned from the
+step metrics of past runs and priced per model with MODEL_COSTS.
+"""
+
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from workflows.engine.context import estimate_cost
+from workflows.engine.dependencies import critical_path, step_dependencies
+from workflows.engine.executor import ModelSelector
+from workflows.engine.metrics_store import MetricsStore, MetricsTable, percentile
+from workflows.engine.models import ModelType, WorkflowDefinition
+
+
+# Fallbacks for steps without history: tokens and seconds by step type
+DEFAULT_TOKENS = {
+    "bash": 100,
+    "command": 500,
+    "script": 200,
+    "prompt": 2000,
+    "agent": 5000,
+    "framework": 10000,
+    "output": 100,
+    "branch": 500,
+}
+
+DEFAULT_DURATION_SECONDS = {
+    "bash": 5,
+    "command": 30,
+    "script": 10,
+    "prompt": 20,
+    "agent": 60,
+    "framework": 120,
+    "output": 2,
+    "branch": 10,
+}
+
+# Step types that call a model (may borrow the model's pooled history)
+MODEL_STEP_TYPES = ("command", "prompt", "agent", "framework")
+
+# Metrics columns the estimator samples from
+HISTORY_COLUMNS = (
+    "started_at", "run_id", "workflow", "step", "model", "status",
+    "tokens", "duration_ms", "cache_hit", "reused",
+)
+
+MODEL_FAMILIES = (ModelType.OPUS.value, ModelType.SONNET.value, ModelType.HAIKU.value)
+
+
+def _family(model: str) -> str:
+    model = (model or "").lower()
+    for family in MODEL_FAMILIES:
+        if family in model:
+            return family
+    return model
+
+
+@dataclass
+class StepEstimate:
+    """Estimated usage of one step."""
+    name: str
+    model: str
+    # "history" (this step), "model" (pooled runs of the model) or "default"
+    source: str
+    samples: int
+    tokens_p50: float = 0.0
+    tokens_p95: float = 0.0
+    cost_p50: float = 0.0
+    cost_p95: float = 0.0
+    duration_p50_seconds: float = 0.0
+    duration_p95_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class RunEstimate:
+    """
+    Estimated totals of a run (p50/p95 over simulated runs).
+
+    critical_path_* is the wall-clock time if independent steps run
+    concurrently; sequential_* is the time with one step at a time.
+    """
+    workflow_name: str
+    history_runs: int
+    confident: bool
+    tokens_p50: float = 0.0
+    tokens_p95: float = 0.0
+    cost_p50: float = 0.0
+    cost_p95: float = 0.0
+    critical_path_p50_seconds: float = 0.0
+    critical_path_p95_seconds: float = 0.0
+    sequential_p50_seconds: float = 0.0
+    sequential_p95_seconds: float = 0.0
+    critical_path: List[str] = field(default_factory=list)
+    steps: List[StepEstimate] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RunEstimator:
+    """
+    Estimates a run by resampling measured step usage.
+
+    For every step the estimator takes the (tokens, seconds) samples of
+    that step in recent runs; with fewer than `min_samples` it borrows
+    the pooled samples of the step's model, and without any history it
+    falls back to DEFAULT_TOKENS / DEFAULT_DURATION_SECONDS. Each of
+    `simulations` simulated runs draws one sample per step, prices the
+    tokens for the model the step would run on now, and computes the
+    critical path through the step dependency graph.
+
+    An estimate is `confident` once at least `min_runs` runs of the
+    workflow were measured (steps added since then use the defaults);
+    only then should it be used to reject a run.
+
+    Usage:
+        estimator = RunEstimator()
+        estimate = estimator.estimate(load_workflow("idea-forge-full"))
+        print(estimate.cost_p50, estimate.cost_p95)
+    """
+
+    HISTORY_DAYS = 90
+    MIN_RUNS = 5
+    MIN_SAMPLES = 5
+    SIMULATIONS = 1000
+
+    def __init__(
+        self,
+        logs_dir: Optional[Path] = None,
+        model_selector: Optional[ModelSelector] = None,
+        history_days: int = HISTORY_DAYS,
+        min_runs: int = MIN_RUNS,
+        min_samples: int = MIN_SAMPLES,
+        simulations: int = SIMULATIONS,
+    ):
+        logs_dir = logs_dir or Path("workflows/logs")
+        self.store = MetricsStore(logs_dir / "metrics")
+        self.model_selector = model_selector or ModelSelector()
+        self.history_days = history_days
+        self.min_runs = min_runs
+        self.min_samples = min_samples
+        self.simulations = simulations
+
+        self._table: Optional[MetricsTable] = None
+        self._model_samples: Optional[Dict[str, List[Tuple[float, float]]]] = None
+
+    def estimate(self, workflow: WorkflowDefinition) -> RunEstimate:
+        """Estimate a run of the workflow (blocking: reads the metrics store)."""
+        history, history_runs = self._step_history(workflow.name)
+
+        steps: List[StepEstimate] = []
+        samples: Dict[str, List[Tuple[float, float]]] = {}
+        for step in workflow.steps:
+            model = self.model_selector.select(step)
+            step_type = step.get_execution_type()
+
+            source, step_samples = "history", history.get(step.name, [])
+            if len(step_samples) < self.min_samples and step_type in MODEL_STEP_TYPES:
+                pooled = self._samples_for_model(model)
+                if len(pooled) >= self.min_samples:
+                    source, step_samples = "model", pooled
+            if not step_samples:
+                source = "default"
+                step_samples = [(
+                    DEFAULT_TOKENS.get(step_type, 1000),
+                    DEFAULT_DURATION_SECONDS.get(step_type, 30),
+                )]
+
+            samples[step.name] = step_samples
+            steps.append(self._step_estimate(step.name, model, source, step_samples))
+
+        estimate = self._simulate(workflow, steps, samples)
+        estimate.history_runs = history_runs
+        estimate.confident = history_runs >= self.min_runs
+        return estimate
+
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    def _simulate(
+        self,
+        workflow: WorkflowDefinition,
+        steps: List[StepEstimate],
+        samples: Dict[str, List[Tuple[float, float]]],
+    ) -> RunEstimate:
+        dependencies = step_dependencies(workflow)
+        # Fixed seed: the same history gives the same estimate
+        rng = random.Random(0)
+
+        tokens, costs, critical, sequential = [], [], [], []
+        for _ in range(self.simulations):
+            run_tokens = run_cost = 0.0
+            durations: Dict[str, float] = {}
+            for step in steps:
+                step_tokens, seconds = rng.choice(samples[step.name])
+                run_tokens += step_tokens
+                run_cost += estimate_cost(step_tokens, step.model) if step_tokens else 0.0
+                durations[step.name] = seconds
+            tokens.append(run_tokens)
+            costs.append(run_cost)
+            sequential.append(sum(durations.values()))
+            critical.append(critical_path(workflow, durations, dependencies)[0])
+
+        for values in (tokens, costs, critical, sequential):
+            values.sort()
+
+        median_durations = {step.name: step.duration_p50_seconds for step in steps}
+        return RunEstimate(
+            workflow_name=workflow.name,
+            history_runs=0,
+            confident=False,
+            tokens_p50=percentile(tokens, 50),
+            tokens_p95=percentile(tokens, 95),
+            cost_p50=percentile(costs, 50),
+            cost_p95=percentile(costs, 95),
+            critical_path_p50_seconds=percentile(critical, 50),
+            critical_path_p95_seconds=percentile(critical, 95),
+            sequential_p50_seconds=percentile(sequential, 50),
+            sequential_p95_seconds=percentile(sequential, 95),
+            critical_path=critical_path(workflow, median_durations, dependencies)[1],
+            steps=steps,
+        )
+
+    @staticmethod
+    def _step_estimate(
+        name: str, model: str, source: str, samples: List[Tuple[float, float]]
+    ) -> StepEstimate:
+        tokens = sorted(t for t, _ in samples)
+        seconds = sorted(s for _, s in samples)
+        return StepEstimate(
+            name=name,
+            model=model,
+            source=source,
+            samples=len(samples) if source != "default" else 0,
+            tokens_p50=percentile(tokens, 50),
+            tokens_p95=percentile(tokens, 95),
+            cost_p50=estimate_cost(percentile(tokens, 50), model),
+            cost_p95=estimate_cost(percentile(tokens, 95), model),
+            duration_p50_seconds=percentile(seconds, 50),
+            duration_p95_seconds=percentile(seconds, 95),
+        )
+
+    def _load_table(self) -> MetricsTable:
+        """Metrics of recent runs, reloaded when rows were appended."""
+        if self._table is None or len(self._table) != len(self.store):
+            self._table = self.store.load(HISTORY_COLUMNS)
+            self._model_samples = None
+        return self._table
+
+    def _since(self) -> datetime:
+        return datetime.now() - timedelta(days=self.history_days)
+
+    def _measured(self, **filters) -> List[Dict[str, Any]]:
+        """
+        Rows of steps that ran to completion in runs without failed steps.
+
+        Cache hits and reused steps cost (almost) nothing, and failed or
+        paused steps stop early; either would bias estimates downward.
+        """
+        table = self._load_table()
+        filters["since"] = self._since()
+        values = [table.values(column, **dict(filters)) for column in HISTORY_COLUMNS]
+        rows = [dict(zip(HISTORY_COLUMNS, row)) for row in zip(*values)]
+
+        failed = {row["run_id"] for row in rows if row["status"] == "failed"}
+        return [
+            row for row in rows
+            if row["status"] == "success"
+            and not row["cache_hit"]
+            and not row["reused"]
+            and row["run_id"] not in failed
+        ]
+
+    def _step_history(self, workflow_name: str) -> Tuple[Dict[str, List[Tuple[float, float]]], int]:
+        """(tokens, seconds) samples per step, and the number of runs measured."""
+        rows = self._measured(workflow=workflow_name)
+
+        history: Dict[str, List[Tuple[float, float]]] = {}
+        for row in rows:
+            history.setdefault(row["step"], []).append((row["tokens"], row["duration_ms"] / 1000))
+        return history, len({row["run_id"] for row in rows})
+
+    def _samples_for_model(self, model: str) -> List[Tuple[float, float]]:
+        """Pooled (tokens, seconds) samples of all steps that ran on a model family."""
+        if self._model_samples is None:
+            pooled: Dict[str, List[Tuple[float, float]]] = {}
+            for row in self._measured():
+                if row["tokens"]:
+                    pooled.setdefault(_family(row["model"]), []).append(
+                        (row["tokens"], row["duration_ms"] / 1000)
+                    )
+            self._model_samples = pooled
+        return self._model_samples.get(_family(model), [])
@@ -108,3 +108,12 @@ class LowConfidenceError(WorkflowError):
         self.step_name = step_name
         self.confidence = confidence
         self.threshold = threshold
+
+
+class WorkerError(WorkflowError):
+    """Raised when a pool worker fails to complete a run."""
+
+    def __init__(self, workflow_name: str, reason: str):
+        super().__init__(f"Worker failed running {workflow_name}: {reason}")
+        self.workflow_name = workflow_name
+        self.reason = reason
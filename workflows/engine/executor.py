@@ -23,6 +23,8 @@ from workflows.engine.models import (
     StepStatus,
 )
 from workflows.engine.interpolation import Interpolator
+from workflows.engine.cache import StepCache, hash_content, parse_ttl
+from workflows.engine.dependencies import step_references
 from workflows.engine.exceptions import (
     StepExecutionError,
     LowConfidenceError,
@@ -108,7 +110,7 @@ class BashHandler(StepHandler):
         interpolator: Interpolator,
         model: str,
     ) -> StepResult:
-        command = interpolator.interpolate(step.bash)
+        command = interpolator.interpolate_field(step, "bash")
         context.log(f"Executing bash: {command}")
 
         start_time = datetime.now()
@@ -178,7 +180,7 @@ class CommandHandler(StepHandler):
         interpolator: Interpolator,
         model: str,
     ) -> StepResult:
-        command = interpolator.interpolate(step.command)
+        command = interpolator.interpolate_field(step, "command")
         context.log(f"Executing command: {command}")
 
         start_time = datetime.now()
@@ -251,7 +253,7 @@ class PromptHandler(StepHandler):
         interpolator: Interpolator,
         model: str,
     ) -> StepResult:
-        prompt = interpolator.interpolate(step.prompt)
+        prompt = interpolator.interpolate_field(step, "prompt", allow_blobs=True)
         context.log(f"Executing prompt with {model}")
 
         start_time = datetime.now()
@@ -333,7 +335,7 @@ class AgentHandler(StepHandler):
         model: str,
     ) -> StepResult:
         agent_name = step.agent
-        prompt = interpolator.interpolate(step.prompt or "")
+        prompt = interpolator.interpolate_field(step, "prompt", allow_blobs=True) or ""
         context.log(f"Executing agent: {agent_name} with {model}")
 
         # Load agent prompt from .claude/agents/
@@ -424,7 +426,7 @@ class ScriptHandler(StepHandler):
         interpolator: Interpolator,
         model: str,
     ) -> StepResult:
-        script_path = interpolator.interpolate(step.script)
+        script_path = interpolator.interpolate_field(step, "script")
         context.log(f"Executing script: {script_path}")
 
         start_time = datetime.now()
@@ -432,7 +434,7 @@ class ScriptHandler(StepHandler):
             # Pass context variables as environment
             import os
             env = os.environ.copy()
-            for key, value in context.variables.items():
+            for key, value in context.scoped_variables().items():
                 env[f"WORKFLOW_{key.upper()}"] = str(value)
 
             result = subprocess.run(
@@ -534,6 +536,7 @@ class StepExecutor:
     - Loop execution
     - Error handling
     - Confidence gating
+    - Result caching
     - Result storage
     """
 
@@ -541,10 +544,13 @@ class StepExecutor:
         self,
         context: 'WorkflowContext',
         model_selector: Optional[ModelSelector] = None,
+        cache: Optional[StepCache] = None,
     ):
         self.context = context
         self.model_selector = model_selector or ModelSelector()
-        self.interpolator = Interpolator(context.get_all())
+        self.cache = cache
+        # Live view: stores and loop scopes are visible without rebuilding
+        self.interpolator = Interpolator(context.view(), serializer=context.serialization)
 
         # Step handlers by type
         self.handlers: Dict[str, StepHandler] = {
@@ -560,12 +566,10 @@ class StepExecutor:
         """Execute a single step."""
         self.context.log_step_start(step.name)
 
-        # Update interpolator context
-        self.interpolator.set_context(self.context.get_all())
-
         # Check condition
         if step.condition:
-            if not self.interpolator.evaluate_condition(step.condition):
+            condition = step.compiled.get("condition") or step.condition
+            if not self.interpolator.evaluate_condition(condition):
                 self.context.log(f"Condition not met: {step.condition}")
                 result = StepResult(status=StepStatus.SKIPPED)
                 self.context.log_step_end(step.name, result.status)
@@ -594,13 +598,36 @@ class StepExecutor:
             self.context.log_step_end(step.name, result.status)
             return result
 
+        # Consult result cache
+        cache_key = None
+        result = None
+        if step.cache and self.cache:
+            cache_key = self._cache_key(step, step_type, model)
+            if cache_key:
+                result = self._cached_result(step, cache_key)
+
         # Execute with retry logic
-        result = await self._execute_with_retry(step, handler, model)
+        if result is None:
+            result = await self._execute_with_retry(step, handler, model)
 
         # Check confidence gate
         if step.confidence_gate and result.success:
             result = self._check_confidence_gate(step, result)
 
+        # Populate cache
+        if cache_key and result.success and not result.cache_hit:
+            self.cache.put(
+                cache_key,
+                step.name,
+                {
+                    "data": result.data,
+                    "confidence": result.confidence,
+                    "tokens_used": result.tokens_used,
+                    "model_used": result.model_used,
+                },
+                parse_ttl(step.cache),
+            )
+
         # Store result
         if step.store_as and result.success:
             self.context.store(step.store_as, result.data)
@@ -639,6 +666,117 @@ class StepExecutor:
 
         return result
 
+    def resolve_inputs(self, step: StepDefinition) -> Optional[Dict[str, Any]]:
+        """
+        Resolve everything a step's outcome depends on.
+
+        Returns the fully interpolated prompt, command or script plus
+        digests of referenced files, or None for step types whose effect
+        is not captured by their inputs (output, branch).
+        """
+        step_type = step.get_execution_type()
+        interpolate = self.interpolator.interpolate_field
+
+        if step_type == "command":
+            return {"command": interpolate(step, "command")}
+
+        if step_type == "prompt":
+            return {"prompt": interpolate(step, "prompt", allow_blobs=True)}
+
+        if step_type == "bash":
+            return {"bash": interpolate(step, "bash")}
+
+        if step_type == "agent":
+            agent_path = Path(f".claude/agents/{step.agent}.md")
+            return {
+                "agent": step.agent,
+                "prompt": interpolate(step, "prompt", allow_blobs=True) or "",
+                "agent_file": self._file_digest(agent_path),
+            }
+
+        if step_type == "script":
+            script_path = interpolate(step, "script")
+            return {
+                "script": script_path,
+                "script_file": self._file_digest(Path(script_path)),
+                # Scripts receive all variables via WORKFLOW_* env vars
+                "env": hash_content(
+                    {k: str(v) for k, v in self.context.scoped_variables().items()}
+                ),
+            }
+
+        return None
+
+    def fingerprint(self, step: StepDefinition) -> Optional[str]:
+        """
+        Fingerprint a step's definition and resolved inputs.
+
+        Covers the step definition itself, the current value of every
+        variable it references (including builtins like {{date}}) and the
+        contents of referenced agent/script files. Returns None for step
+        types that must always run (branch, output).
+        """
+        step_type = step.get_execution_type()
+        if step_type in ("branch", "output", "unknown"):
+            return None
+
+        values = {}
+        for ref in sorted(step_references(step)):
+            if ref in Interpolator.BUILTINS:
+                values[ref] = Interpolator.BUILTINS[ref]()
+            else:
+                values[ref] = self.interpolator.context.get(ref)
+
+        files = {}
+        if step.agent:
+            files["agent"] = self._file_digest(Path(f".claude/agents/{step.agent}.md"))
+        if step.script:
+            try:
+                script_path = self.interpolator.interpolate_field(step, "script")
+            except Exception:
+                script_path = step.script
+            files["script"] = self._file_digest(Path(script_path))
+
+        return hash_content({
+            "definition": repr(step),
+            "model": self.model_selector.select(step),
+            "values": values,
+            "files": files,
+        })
+
+    def _file_digest(self, path: Path) -> Optional[str]:
+        """Hash a referenced file's contents (None if missing)."""
+        try:
+            return hash_content(path.read_bytes())
+        except OSError:
+            return None
+
+    def _cache_key(
+        self, step: StepDefinition, step_type: str, model: str
+    ) -> Optional[str]:
+        """Build the cache key for a step, or None if not cacheable."""
+        inputs = self.resolve_inputs(step)
+        if inputs is None:
+            return None
+        return StepCache.make_key(step_type, model, inputs)
+
+    def _cached_result(
+        self, step: StepDefinition, cache_key: str
+    ) -> Optional[StepResult]:
+        """Build a StepResult from a cache entry, if present."""
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return None
+
+        self.context.log(f"Cache hit for step: {step.name}")
+        return StepResult(
+            status=StepStatus.SUCCESS,
+            data=cached.get("data"),
+            confidence=cached.get("confidence"),
+            model_used=cached.get("model_used"),
+            cache_hit=True,
+        )
+
     def _handle_error(self, step: StepDefinition, result: StepResult) -> StepResult:
         """Handle step error based on on_error setting."""
         if step.on_error == ErrorAction.SKIP:
@@ -685,7 +823,7 @@ class StepExecutor:
 
     async def _execute_loop(self, step: StepDefinition) -> StepResult:
         """Execute step in a loop."""
-        loop_items = self.interpolator._resolve(step.loop)
+        loop_items = self.interpolator.resolve_value(step.loop)
 
         if not isinstance(loop_items, (list, tuple)):
             return StepResult(
@@ -699,11 +837,6 @@ class StepExecutor:
         for i, item in enumerate(loop_items):
             self.context.log(f"Loop iteration {i + 1}/{len(loop_items)}")
 
-            # Add loop variable to context
-            self.context.store(loop_var, item)
-            self.context.store("loop_index", i)
-            self.interpolator.set_context(self.context.get_all())
-
             # Create a copy of step without loop to execute
             step_copy = StepDefinition(
                 name=f"{step.name}[{i}]",
@@ -719,9 +852,13 @@ class StepExecutor:
                 model=step.model,
                 on_error=step.on_error,
                 timeout=step.timeout,
+                cache=step.cache,
+                compiled=step.compiled,
             )
 
-            result = await self.execute(step_copy)
+            # Loop variables live in a scope overlay, discarded afterwards
+            with self.context.scope(**{loop_var: item, "loop_index": i}):
+                result = await self.execute(step_copy)
             results.append(result.data)
 
             if not result.success and step.on_error == ErrorAction.ABORT:
@@ -739,7 +876,7 @@ class StepExecutor:
     async def _execute_branch(self, step: StepDefinition) -> StepResult:
         """Execute branching logic."""
         for branch in step.branch:
-            if self.interpolator.evaluate_condition(branch.condition):
+            if self.interpolator.evaluate_condition(branch.compiled or branch.condition):
                 self.context.log(f"Branch matched: {branch.condition}")
 
                 # Execute branch steps
@@ -0,0 +1,137 @@
+"""
+Workflow Engine - Import-Time Budget
+
+Measures cold import time of the user-facing entry points in fresh
+interpreters and fails when one exceeds its budget.
+
+Usage:
+    python -m workflows.engine.import_budget
+    python -m workflows.engine.import_budget --runs 10 --budget workflow-cli=150
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Entry point -> import statement executed in a fresh interpreter
+TARGETS: Dict[str, str] = {
+    # Spawned per client session by Claude Desktop
+    "mcp-server": "import mcp_server.server",
+    # /run-workflow CLI path
+    "workflow-cli": "from workflows.engine import run_workflow_sync",
+}
+
+# Budgets in milliseconds (best of N runs)
+DEFAULT_BUDGETS_MS: Dict[str, float] = {
+    "mcp-server": 400.0,
+    "workflow-cli": 100.0,
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+@dataclass
+class ImportMeasurement:
+    """Best-of-N import timing for one entry point."""
+    target: str
+    budget_ms: float
+    best_ms: Optional[float] = None
+    skipped: Optional[str] = None
+    # (self time µs, module) of the slowest modules in the best run
+    top_modules: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return self.skipped is not None or (
+            self.best_ms is not None and self.best_ms <= self.budget_ms
+        )
+
+
+def measure(target: str, statement: str, budget_ms: float, runs: int = 5) -> ImportMeasurement:
+    """Import a statement in `runs` fresh interpreters and keep the fastest run."""
+    result = ImportMeasurement(target=target, budget_ms=budget_ms)
+    root = Path(__file__).resolve().parents[2]
+    code = (
+        "import time\n"
+        "_start = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - _start)\n"
+    )
+
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            cwd=root,
+        )
+        if proc.returncode != 0:
+            missing = re.search(r"No module named '([^']+)'", proc.stderr)
+            result.skipped = (
+                f"missing dependency '{missing.group(1)}'" if missing
+                else proc.stderr.strip().splitlines()[-1]
+            )
+            return result
+
+        elapsed_ms = float(proc.stdout.strip().splitlines()[-1]) * 1000
+        if result.best_ms is None or elapsed_ms < result.best_ms:
+            result.best_ms = elapsed_ms
+            result.top_modules = _slowest_modules(proc.stderr)
+
+    return result
+
+
+def _slowest_modules(importtime_output: str, limit: int = 10) -> List[Tuple[int, str]]:
+    """Parse -X importtime output into the modules with the most self time."""
+    entries = []
+    for line in importtime_output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            entries.append((int(match.group(1)), match.group(4)))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Check import-time budgets")
+    arg_parser.add_argument("--runs", type=int, default=5, help="runs per target (best counts)")
+    arg_parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="TARGET=MS",
+        help="override a budget, e.g. workflow-cli=120",
+    )
+    arg_parser.add_argument("targets", nargs="*", help=f"targets (default: all of {', '.join(TARGETS)})")
+    args = arg_parser.parse_args(argv)
+
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    for override in args.budget:
+        name, _, value = override.partition("=")
+        budgets[name] = float(value)
+
+    failed = False
+    for target in args.targets or list(TARGETS):
+        result = measure(target, TARGETS[target], budgets[target], runs=args.runs)
+
+        if result.skipped:
+            print(f"SKIP {target}: {result.skipped}")
+            continue
+
+        status = "OK  " if result.passed else "FAIL"
+        print(f"{status} {target}: {result.best_ms:.1f} ms (budget {result.budget_ms:.0f} ms)")
+
+        if not result.passed:
+            failed = True
+            for self_us, module in result.top_modules:
+                print(f"       {self_us / 1000:7.1f} ms  {module}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
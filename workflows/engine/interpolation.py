@@ -4,11 +4,14 @@ Workflow Engine - Interpolation Engine
 Handles {{variable}} replacement and condition evaluation.
 """
 
+import hashlib
+import json
 import operator
 import re
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
 from workflows.engine.exceptions import (
     InterpolationError,
@@ -16,6 +19,476 @@ from workflows.engine.exceptions import (
 )
 
 
+TEMPLATE_PATTERN = re.compile(r'\{\{([^}]+)\}\}')
+
+
+# ═══════════════════════════════════════════════════════════════
+# COMPILED TEMPLATES
+# ═══════════════════════════════════════════════════════════════
+
+class Accessor:
+    """A {{variable}} reference with its dotted path pre-split."""
+
+    __slots__ = ("expression", "parts", "indices")
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.parts: Tuple[str, ...] = tuple(expression.split("."))
+        # Numeric parts double as list indices
+        self.indices: Tuple[Optional[int], ...] = tuple(
+            int(part) if part.isdigit() else None for part in self.parts
+        )
+
+    def __repr__(self) -> str:
+        return f"Accessor({self.expression!r})"
+
+
+class CompiledTemplate:
+    """
+    Template split once into literal text and accessor segments.
+
+    Rendering walks the segments and joins the result, without
+    re-scanning the template string.
+    """
+
+    __slots__ = ("source", "segments")
+
+    def __init__(self, source: str):
+        self.source = source
+
+        segments = []
+        position = 0
+        for match in TEMPLATE_PATTERN.finditer(source):
+            if match.start() > position:
+                segments.append(source[position:match.start()])
+            segments.append(compile_accessor(match.group(1).strip()))
+            position = match.end()
+        if position < len(source):
+            segments.append(source[position:])
+
+        self.segments: Tuple[Union[str, Accessor], ...] = tuple(segments)
+
+    @property
+    def is_static(self) -> bool:
+        """True if the template contains no variables."""
+        return all(type(segment) is str for segment in self.segments)
+
+    @property
+    def single(self) -> Optional[Accessor]:
+        """The accessor if the template is exactly one {{variable}}."""
+        if len(self.segments) == 1 and type(self.segments[0]) is Accessor:
+            return self.segments[0]
+        return None
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({self.source!r})"
+
+
+@lru_cache(maxsize=4096)
+def compile_accessor(expression: str) -> Accessor:
+    """Compile (and memoize) a variable expression."""
+    return Accessor(expression)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(template: str) -> CompiledTemplate:
+    """Compile (and memoize) a template string."""
+    return CompiledTemplate(template)
+
+
+# ═══════════════════════════════════════════════════════════════
+# SERIALIZATION CACHE
+# ═══════════════════════════════════════════════════════════════
+
+class SerializationCache:
+    """
+    Per-run memo of rendered context values.
+
+    Entries are keyed by object identity and tagged with a version that
+    WorkflowContext bumps on every store, so a value is serialized once
+    per version no matter how many templates reference it.
+
+    With a blob_threshold, values whose rendered form exceeds the
+    threshold (in characters) are written once to a content-addressed
+    file under blob_dir and referenced by a short handle instead of
+    being inlined.
+    """
+
+    def __init__(
+        self,
+        blob_threshold: Optional[int] = None,
+        blob_dir: Optional[Path] = None,
+    ):
+        self.blob_threshold = blob_threshold
+        self.blob_dir = blob_dir or Path("workflows/blobs")
+        self.version = 0
+
+        # id(value) -> (version, value, text, reference)
+        self._entries: Dict[int, list] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def bump(self):
+        """Invalidate all entries (context changed)."""
+        self.version += 1
+        self._entries.clear()
+
+    def dumps(self, value: Any) -> str:
+        """Render a list/dict as indented JSON, memoized."""
+        return self._entry(value)[2]
+
+    def reference(self, value: Any) -> str:
+        """Render a value for a template: inline text or a blob handle."""
+        entry = self._entry(value)
+        if entry[3] is None:
+            text = entry[2]
+            if self.blob_threshold is not None and len(text) > self.blob_threshold:
+                entry[3] = self._write_blob(text)
+            else:
+                entry[3] = text
+        return entry[3]
+
+    def _entry(self, value: Any) -> list:
+        entry = self._entries.get(id(value))
+        # The value reference keeps the id from being reused while cached
+        if entry is not None and entry[0] == self.version and entry[1] is value:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        if isinstance(value, str):
+            text = value
+        else:
+            text = json.dumps(value, ensure_ascii=False, indent=2)
+        entry = [self.version, value, text, None]
+        self._entries[id(value)] = entry
+        return entry
+
+    def _write_blob(self, text: str) -> str:
+        """Write text to a content-addressed blob file and return its handle."""
+        raw = text.encode("utf-8")
+        path = self.blob_dir / f"{hashlib.sha256(raw).hexdigest()[:32]}.txt"
+        if not path.exists():
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            tmp_path.write_bytes(raw)
+            tmp_path.replace(path)
+        return f"[blob: {path.as_posix()} ({len(raw)} bytes)]"
+
+
+# ═══════════════════════════════════════════════════════════════
+# COMPILED CONDITIONS
+# ═══════════════════════════════════════════════════════════════
+
+CONDITION_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<op>==|!=|>=|<=|>|<|\(|\))
+      | (?P<word>(?:\{\{[^}]+\}\}|[^\s()=!<>'"])+)
+    )
+""", re.VERBOSE)
+
+COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+KEYWORDS = ("and", "or", "not", "in")
+
+
+class _Literal:
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def evaluate(self, interpolator: "Interpolator") -> Any:
+        return self.value
+
+
+class _Variable:
+    __slots__ = ("accessor",)
+
+    def __init__(self, accessor: Accessor):
+        self.accessor = accessor
+
+    def evaluate(self, interpolator: "Interpolator") -> Any:
+        try:
+            return interpolator._resolve_accessor(self.accessor)
+        except Exception as e:
+            raise InterpolationError(self.accessor.expression, str(e))
+
+
+class _Template:
+    """Text mixing literals and variables, rendered at evaluation time."""
+    __slots__ = ("template", "quoted")
+
+    def __init__(self, template: CompiledTemplate, quoted: bool):
+        self.template = template
+        self.quoted = quoted
+
+    def evaluate(self, interpolator: "Interpolator") -> Any:
+        text = interpolator.render(self.template)
+        return text if self.quoted else interpolator._parse_value(text)
+
+
+class _Not:
+    __slots__ = ("operand",)
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def evaluate(self, interpolator: "Interpolator") -> bool:
+        return not _truthy(self.operand.evaluate(interpolator))
+
+
+class _BoolOp:
+    __slots__ = ("is_and", "operands")
+
+    def __init__(self, is_and: bool, operands: list):
+        self.is_and = is_and
+        self.operands = operands
+
+    def evaluate(self, interpolator: "Interpolator") -> bool:
+        if self.is_and:
+            return all(_truthy(o.evaluate(interpolator)) for o in self.operands)
+        return any(_truthy(o.evaluate(interpolator)) for o in self.operands)
+
+
+class _Compare:
+    __slots__ = ("op", "left", "right")
+
+    def __init__(self, op: str, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def evaluate(self, interpolator: "Interpolator") -> bool:
+        left = self.left.evaluate(interpolator)
+        right = self.right.evaluate(interpolator)
+
+        if self.op in ("in", "not in"):
+            found = _contains(right, left, interpolator)
+            return found if self.op == "in" else not found
+
+        left, right = _coerce_pair(left, right, interpolator)
+        return COMPARISONS[self.op](left, right)
+
+
+def _truthy(value: Any) -> bool:
+    """Truthiness with string forms like 'false', '0' or '[]' counting as false."""
+    if isinstance(value, str):
+        return bool(Interpolator._parse_value(value))
+    return bool(value)
+
+
+def _number(value: Any) -> Optional[Union[int, float]]:
+    """Parse a numeric string, or return None."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+
+def _coerce_pair(left: Any, right: Any, interpolator: "Interpolator") -> Tuple[Any, Any]:
+    """Bring two operands to comparable types without a string round-trip."""
+    left_type, right_type = type(left), type(right)
+    if left_type is right_type and left_type is not str:
+        return left, right
+
+    numeric = (int, float)
+    if isinstance(left, str) and isinstance(right, str):
+        # Numeric strings compare as numbers ("10" > "9")
+        left_num, right_num = _number(left), _number(right)
+        if left_num is not None and right_num is not None:
+            return left_num, right_num
+        return left, right
+
+    if isinstance(left, str) or isinstance(right, str):
+        text, other = (left, right) if isinstance(left, str) else (right, left)
+
+        if isinstance(other, bool) or other is None:
+            converted = interpolator._parse_value(text)
+        elif isinstance(other, numeric):
+            converted = _number(text)
+            if converted is None:
+                converted = text
+                other = interpolator._stringify(other)
+        else:
+            # Lists/dicts compare by their rendered form (e.g. != '[]')
+            converted = text
+            other = interpolator._stringify(other)
+
+        return (converted, other) if isinstance(left, str) else (other, converted)
+
+    return left, right
+
+
+def _contains(container: Any, item: Any, interpolator: "Interpolator") -> bool:
+    """Membership test for lists, dicts and substrings."""
+    if container is None:
+        return False
+    if isinstance(container, str):
+        return interpolator._stringify(item) in container
+    if isinstance(container, Mapping):
+        return item in container
+    if item in container:
+        return True
+    # Tolerate type mismatches like 3 in ["3"]
+    text = interpolator._stringify(item)
+    return any(interpolator._stringify(element) == text for element in container)
+
+
+class CompiledCondition:
+    """
+    Condition parsed once into an expression tree.
+
+    Grammar:
+        expr       := and_expr ("or" and_expr)*
+        and_expr   := not_expr ("and" not_expr)*
+        not_expr   := "not" not_expr | comparison
+        comparison := operand (("==" | "!=" | ">=" | "<=" | ">" | "<"
+                               | "in" | "not" "in") operand)?
+        operand    := "(" expr ")" | {{variable}} | 'string' | number
+                      | true | false | null | bareword
+
+    Variables are resolved to their raw values at evaluation time, so
+    values containing operators can no longer break parsing.
+    """
+
+    __slots__ = ("source", "root", "_tokens", "_position")
+
+    def __init__(self, source: str):
+        self.source = source
+        self._tokens = self._tokenize(source)
+        self._position = 0
+
+        self.root = self._parse_or()
+        if self._position < len(self._tokens):
+            raise ConditionEvaluationError(
+                source, f"Unexpected token '{self._tokens[self._position][1]}'"
+            )
+        del self._tokens
+
+    def evaluate(self, interpolator: "Interpolator") -> bool:
+        """Evaluate against the interpolator's context."""
+        return _truthy(self.root.evaluate(interpolator))
+
+    def __repr__(self) -> str:
+        return f"CompiledCondition({self.source!r})"
+
+    # ─────────────────────────────────────────────────────────────
+    # PARSER
+    # ─────────────────────────────────────────────────────────────
+
+    def _tokenize(self, source: str) -> List[Tuple[str, str]]:
+        tokens = []
+        position = 0
+        source = source.rstrip()
+        while position < len(source):
+            match = CONDITION_TOKEN.match(source, position)
+            if not match or match.end() == position:
+                raise ConditionEvaluationError(
+                    source, f"Invalid syntax at position {position}"
+                )
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == "word" and value.lower() in KEYWORDS:
+                kind, value = "keyword", value.lower()
+            tokens.append((kind, value))
+            position = match.end()
+        return tokens
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        if self._position < len(self._tokens):
+            return self._tokens[self._position]
+        return None
+
+    def _accept(self, kind: str, value: str) -> bool:
+        if self._peek() == (kind, value):
+            self._position += 1
+            return True
+        return False
+
+    def _parse_or(self):
+        operands = [self._parse_and()]
+        while self._accept("keyword", "or"):
+            operands.append(self._parse_and())
+        return operands[0] if len(operands) == 1 else _BoolOp(False, operands)
+
+    def _parse_and(self):
+        operands = [self._parse_not()]
+        while self._accept("keyword", "and"):
+            operands.append(self._parse_not())
+        return operands[0] if len(operands) == 1 else _BoolOp(True, operands)
+
+    def _parse_not(self):
+        if self._accept("keyword", "not"):
+            return _Not(self._parse_not())
+        return self._parse_comparison()
+
+    def _parse_comparison(self):
+        left = self._parse_operand()
+        token = self._peek()
+
+        if token and token[0] == "op" and token[1] in COMPARISONS:
+            self._position += 1
+            return _Compare(token[1], left, self._parse_operand())
+        if self._accept("keyword", "in"):
+            return _Compare("in", left, self._parse_operand())
+        if token == ("keyword", "not"):
+            following = self._tokens[self._position + 1:self._position + 2]
+            if following == [("keyword", "in")]:
+                self._position += 2
+                return _Compare("not in", left, self._parse_operand())
+
+        return left
+
+    def _parse_operand(self):
+        token = self._peek()
+        if token is None:
+            raise ConditionEvaluationError(self.source, "Unexpected end of condition")
+        self._position += 1
+        kind, value = token
+
+        if kind == "op" and value == "(":
+            node = self._parse_or()
+            if not self._accept("op", ")"):
+                raise ConditionEvaluationError(self.source, "Missing ')'")
+            return node
+
+        if kind == "string":
+            text = re.sub(r"\\(.)", r"\1", value[1:-1])
+            if "{{" in text:
+                return _Template(compile_template(text), quoted=True)
+            return _Literal(text)
+
+        if kind == "word":
+            template = compile_template(value)
+            if template.single is not None:
+                return _Variable(template.single)
+            if not template.is_static:
+                return _Template(template, quoted=False)
+            return _Literal(Interpolator._parse_value(value))
+
+        raise ConditionEvaluationError(self.source, f"Unexpected token '{value}'")
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(condition: str) -> CompiledCondition:
+    """Parse (and memoize) a condition expression."""
+    return CompiledCondition(condition)
+
+
 # ═══════════════════════════════════════════════════════════════
 # INTERPOLATOR CLASS
 # ═══════════════════════════════════════════════════════════════
@@ -33,7 +506,7 @@ class Interpolator:
     - {{workflow}} - Workflow name
     """
 
-    PATTERN = re.compile(r'\{\{([^}]+)\}\}')
+    PATTERN = TEMPLATE_PATTERN
 
     # Built-in variables
     BUILTINS = {
@@ -45,16 +518,23 @@ class Interpolator:
         "day": lambda: datetime.now().strftime("%d"),
     }
 
-    def __init__(self, context: Dict[str, Any] = None):
+    def __init__(
+        self,
+        context: Mapping[str, Any] = None,
+        serializer: Optional[SerializationCache] = None,
+    ):
         """
         Initialize with a context dictionary.
 
         Args:
-            context: Dict containing variables and step results
+            context: Mapping containing variables and step results
+                     (a plain dict or a live WorkflowContext.view())
+            serializer: Optional per-run cache for rendered values
         """
-        self.context = context or {}
+        self.context = context if context is not None else {}
+        self.serializer = serializer
 
-    def set_context(self, context: Dict[str, Any]):
+    def set_context(self, context: Mapping[str, Any]):
         """Update the context dictionary."""
         self.context = context
 
@@ -62,12 +542,13 @@ class Interpolator:
         """Add a single value to context."""
         self.context[key] = value
 
-    def interpolate(self, template: str) -> str:
+    def interpolate(self, template: str, allow_blobs: bool = False) -> str:
         """
         Replace all {{variable}} patterns in template.
 
         Args:
             template: String containing {{variable}} patterns
+            allow_blobs: Reference large values by blob handle (prompts only)
 
         Returns:
             String with all variables replaced
@@ -78,15 +559,66 @@ class Interpolator:
         if not template or "{{" not in template:
             return template
 
-        def replacer(match):
-            expression = match.group(1).strip()
+        return self.render(compile_template(template), allow_blobs)
+
+    def interpolate_field(
+        self, step: Any, field_name: str, allow_blobs: bool = False
+    ) -> Optional[str]:
+        """
+        Interpolate a template field of a step definition.
+
+        Uses the compiled template cached on the step (filled by the
+        parser), compiling and caching it on first use otherwise.
+        """
+        template = step.compiled.get(field_name)
+        if template is None:
+            source = getattr(step, field_name)
+            if not source:
+                return source
+            template = step.compiled[field_name] = compile_template(source)
+        return self.render(template, allow_blobs)
+
+    def render(self, template: CompiledTemplate, allow_blobs: bool = False) -> str:
+        """
+        Render a compiled template against the current context.
+
+        Large values become blob handles only with allow_blobs: a model
+        can open the referenced file, but shell commands, paths and
+        output files need the value itself.
+        """
+        segments = template.segments
+        if len(segments) == 1 and type(segments[0]) is str:
+            return segments[0]
+
+        render_value = self._render_value if allow_blobs else self._stringify
+        parts = []
+        for segment in segments:
+            if type(segment) is str:
+                parts.append(segment)
+                continue
             try:
-                value = self._resolve(expression)
-                return self._stringify(value)
+                parts.append(render_value(self._resolve_accessor(segment)))
             except Exception as e:
-                raise InterpolationError(expression, str(e))
+                raise InterpolationError(segment.expression, str(e))
+        return "".join(parts)
 
-        return self.PATTERN.sub(replacer, template)
+    def resolve_value(self, expression: str) -> Any:
+        """
+        Resolve an expression to its raw (unstringified) value.
+
+        Accepts a bare name ("items", "step.list") or a single
+        "{{items}}" reference; mixed templates are rendered to a string.
+        """
+        expression = expression.strip()
+        template = compile_template(expression)
+        accessor = template.single
+
+        if accessor is None:
+            if not template.is_static:
+                return self.render(template)
+            accessor = compile_accessor(expression)
+
+        return self._resolve_accessor(accessor)
 
     def _resolve(self, expression: str) -> Any:
         """
@@ -98,17 +630,24 @@ class Interpolator:
         Returns:
             The resolved value
         """
+        return self._resolve_accessor(compile_accessor(expression))
+
+    def _resolve_accessor(self, accessor: Accessor) -> Any:
+        """Resolve a compiled accessor to its value."""
+        expression = accessor.expression
+
         # Check builtins first
-        if expression in self.BUILTINS:
-            return self.BUILTINS[expression]()
+        builtin = self.BUILTINS.get(expression)
+        if builtin is not None:
+            return builtin()
 
         # Check if it's a simple variable
         if expression in self.context:
             return self.context[expression]
 
         # Handle nested access (e.g., step.field.nested)
-        if "." in expression:
-            return self._resolve_nested(expression)
+        if len(accessor.parts) > 1:
+            return self._walk(accessor)
 
         # Not found
         raise KeyError(f"Variable '{expression}' not found in context")
@@ -123,11 +662,15 @@ class Interpolator:
         Returns:
             The resolved value
         """
-        parts = expression.split(".")
+        return self._walk(compile_accessor(expression))
+
+    def _walk(self, accessor: Accessor) -> Any:
+        """Walk a pre-split accessor path through the context."""
+        parts = accessor.parts
         current = self.context
 
         for i, part in enumerate(parts):
-            if isinstance(current, dict):
+            if isinstance(current, Mapping):
                 if part not in current:
                     path = ".".join(parts[:i+1])
                     raise KeyError(f"Key '{part}' not found at '{path}'")
@@ -137,8 +680,9 @@ class Interpolator:
             elif hasattr(current, '__getitem__'):
                 try:
                     # Try numeric index
-                    if part.isdigit():
-                        current = current[int(part)]
+                    index = accessor.indices[i]
+                    if index is not None:
+                        current = current[index]
                     else:
                         current = current[part]
                 except (KeyError, IndexError, TypeError):
@@ -157,10 +701,22 @@ class Interpolator:
         if isinstance(value, bool):
             return "true" if value else "false"
         if isinstance(value, (list, dict)):
-            import json
+            if self.serializer is not None:
+                return self.serializer.dumps(value)
             return json.dumps(value, ensure_ascii=False, indent=2)
         return str(value)
 
+    def _render_value(self, value: Any) -> str:
+        """Stringify a resolved value, possibly as a blob handle."""
+        serializer = self.serializer
+        if serializer is not None:
+            if isinstance(value, (list, dict)):
+                return serializer.reference(value)
+            threshold = serializer.blob_threshold
+            if isinstance(value, str) and threshold is not None and len(value) > threshold:
+                return serializer.reference(value)
+        return self._stringify(value)
+
     def resolve_path(self, path_template: str) -> Path:
         """
         Resolve a path template.
@@ -174,7 +730,7 @@ class Interpolator:
         resolved = self.interpolate(path_template)
         return Path(resolved)
 
-    def evaluate_condition(self, condition: str) -> bool:
+    def evaluate_condition(self, condition: Union[str, CompiledCondition]) -> bool:
         """
         Evaluate a condition expression.
 
@@ -183,9 +739,12 @@ class Interpolator:
         - {{status}} == 'active'
         - {{items}} != '[]'
         - {{flag}} == true
+        - {{type}} == 'idea' or {{type}} == 'pattern'
+        - 'urgent' in {{tags}}
+        - not ({{count}} > 10 and {{status}} != 'done')
 
         Args:
-            condition: Condition string
+            condition: Condition string or a precompiled condition
 
         Returns:
             Boolean result
@@ -197,58 +756,17 @@ class Interpolator:
             return True
 
         try:
-            # First interpolate all variables
-            interpolated = self.interpolate(condition)
-
-            # Parse and evaluate
-            return self._evaluate_expression(interpolated)
+            if isinstance(condition, str):
+                condition = compile_condition(condition)
+            return condition.evaluate(self)
 
-        except InterpolationError:
+        except (InterpolationError, ConditionEvaluationError):
             raise
         except Exception as e:
-            raise ConditionEvaluationError(condition, str(e))
-
-    def _evaluate_expression(self, expression: str) -> bool:
-        """
-        Safely evaluate a comparison expression.
-
-        Args:
-            expression: Interpolated expression like "5 > 0"
-
-        Returns:
-            Boolean result
-        """
-        expression = expression.strip()
-
-        # Handle boolean literals
-        if expression.lower() == "true":
-            return True
-        if expression.lower() == "false":
-            return False
+            raise ConditionEvaluationError(condition.source, str(e))
 
-        # Define operators
-        ops = {
-            "==": operator.eq,
-            "!=": operator.ne,
-            ">=": operator.ge,
-            "<=": operator.le,
-            ">": operator.gt,
-            "<": operator.lt,
-        }
-
-        # Find and apply operator (check longer operators first)
-        for op_str, op_func in sorted(ops.items(), key=lambda x: -len(x[0])):
-            if op_str in expression:
-                parts = expression.split(op_str, 1)
-                if len(parts) == 2:
-                    left = self._parse_value(parts[0].strip())
-                    right = self._parse_value(parts[1].strip())
-                    return op_func(left, right)
-
-        # If no operator found, treat as truthy check
-        return bool(self._parse_value(expression))
-
-    def _parse_value(self, value_str: str) -> Any:
+    @staticmethod
+    def _parse_value(value_str: str) -> Any:
         """
         Parse a string value to its Python type.
 
@@ -0,0 +1,460 @@
+"""
+Workflow Engine - Columnar Metrics Store
+
+Per-step run metrics in append-only column files (workflows/logs/metrics/),
+queried with NumPy when it is installed and with plain arrays otherwise.
+
+Usage:
+    python -m workflows.engine.metrics_store rebuild   # backfill from run logs
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from workflows.engine.context import estimate_cost
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within the process
+    fcntl = None
+
+# None until the first query: the runner only appends, and should not
+# pay for the numpy lookup at import time
+HAS_NUMPY: Optional[bool] = None
+
+
+# Column -> array typecode; "s" columns are dictionary-encoded strings
+# stored as int32 codes into <column>.dict
+COLUMNS: Dict[str, str] = {
+    "started_at": "d",      # run start (epoch seconds)
+    "run_id": "s",
+    "workflow": "s",
+    "step": "s",
+    "model": "s",
+    "status": "s",
+    "tokens": "q",
+    "cost": "d",
+    "duration_ms": "q",
+    "cache_hit": "b",
+    "reused": "b",
+}
+
+STRING_TYPECODE = "i"
+
+NUMPY_DTYPES = {"d": "<f8", "q": "<i8", "i": "<i4", "b": "i1"}
+
+ROWS_FILENAME = "rows"
+LOCK_FILENAME = ".lock"
+
+
+def _typecode(column: str) -> str:
+    code = COLUMNS[column]
+    return STRING_TYPECODE if code == "s" else code
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentile of sorted values with linear interpolation (as numpy)."""
+    if not values:
+        return 0.0
+    pos = (len(values) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+
+def step_rows(
+    workflow: str,
+    run_id: str,
+    started_at: datetime,
+    step_metrics: Dict[str, Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Metrics rows for the steps of one run (context.step_metrics)."""
+    timestamp = started_at.timestamp()
+    rows = []
+    for step, metrics in step_metrics.items():
+        tokens = metrics.get("tokens") or 0
+        model = metrics.get("model") or ""
+        rows.append({
+            "started_at": timestamp,
+            "run_id": run_id,
+            "workflow": workflow,
+            "step": step,
+            "model": model,
+            "status": metrics.get("status") or "",
+            "tokens": tokens,
+            "cost": estimate_cost(tokens, model) if tokens else 0.0,
+            "duration_ms": metrics.get("duration_ms") or 0,
+            "cache_hit": bool(metrics.get("cache_hit")),
+            "reused": bool(metrics.get("reused")),
+        })
+    return rows
+
+
+# ═══════════════════════════════════════════════════════════════
+# STORE
+# ═══════════════════════════════════════════════════════════════
+
+class MetricsStore:
+    """
+    Append-only columnar store of step metrics.
+
+    Each column is a file of fixed-width values; string columns hold
+    codes into an append-only dictionary file. The row count is written
+    last (atomically), so readers never see a partial append, and an
+    append interrupted by a crash is truncated away by the next one.
+    Appends from several processes are serialized with flock.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or Path("workflows/logs/metrics")
+        self._lock = threading.Lock()
+        # column -> (values, value -> code, bytes read from the .dict file)
+        self._dicts: Dict[str, tuple] = {}
+
+    # ─────────────────────────────────────────────────────────────
+    # WRITING
+    # ─────────────────────────────────────────────────────────────
+
+    def append(self, rows: List[Dict[str, Any]]):
+        """Append rows (dicts with every column)."""
+        if not rows:
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path / LOCK_FILENAME, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            count = self._row_count()
+            for column, code in COLUMNS.items():
+                values = [row[column] for row in rows]
+                if code == "s":
+                    values = self._encode(column, values)
+                self._append_column(column, count, array(_typecode(column), values))
+
+            self._write_row_count(count + len(rows))
+
+    def rebuild(self, logs_dir: Optional[Path] = None) -> int:
+        """Recreate the store from the "steps" section of the run logs."""
+        from workflows.engine.run_index import is_run_log
+
+        logs_dir = logs_dir or self.path.parent
+        runs = []
+        for log_file in logs_dir.glob("*.json"):
+            if not is_run_log(log_file):
+                continue
+            try:
+                data = json.loads(log_file.read_text(encoding="utf-8"))
+                started_at = datetime.fromisoformat(data["started_at"])
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            if data.get("steps"):
+                runs.append((started_at, data))
+        runs.sort(key=lambda run: run[0])
+
+        with self._lock:
+            if self.path.exists():
+                for file in self.path.iterdir():
+                    if file.name != LOCK_FILENAME:
+                        file.unlink()
+            self._dicts.clear()
+
+        rows = []
+        for started_at, data in runs:
+            rows.extend(step_rows(data["workflow"], data["run_id"], started_at, data["steps"]))
+        self.append(rows)
+        return len(rows)
+
+    # ─────────────────────────────────────────────────────────────
+    # READING
+    # ─────────────────────────────────────────────────────────────
+
+    def load(self, columns: Optional[Iterable[str]] = None) -> "MetricsTable":
+        """Load (a subset of) the columns of all committed rows."""
+        global HAS_NUMPY
+        columns = list(columns or COLUMNS)
+        if HAS_NUMPY is None:
+            HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+        np = None
+        if HAS_NUMPY:
+            import numpy as np
+
+        with self._lock:
+            count = self._row_count()
+            data: Dict[str, Any] = {}
+            dictionaries: Dict[str, List[str]] = {}
+            for column in columns:
+                data[column] = self._read_column(column, count, np)
+                if COLUMNS[column] == "s":
+                    dictionaries[column] = list(self._dictionary(column)[0])
+
+        return MetricsTable(data, dictionaries, count, np)
+
+    def __len__(self) -> int:
+        return self._row_count()
+
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    def _row_count(self) -> int:
+        try:
+            return int((self.path / ROWS_FILENAME).read_text())
+        except (OSError, ValueError):
+            return 0
+
+    def _write_row_count(self, count: int):
+        tmp_path = self.path / f".{ROWS_FILENAME}.tmp"
+        tmp_path.write_text(str(count))
+        os.replace(tmp_path, self.path / ROWS_FILENAME)
+
+    def _append_column(self, column: str, count: int, values: array):
+        path = self.path / f"{column}.col"
+        with open(path, "ab") as f:
+            # Drop the tail of an append that never committed its row count
+            committed = count * values.itemsize
+            if f.tell() != committed:
+                f.truncate(committed)
+            f.write(values.tobytes())
+
+    def _read_column(self, column: str, count: int, np):
+        typecode = _typecode(column)
+        path = self.path / f"{column}.col"
+        if np is not None:
+            if count == 0 or not path.exists():
+                return np.zeros(0, dtype=NUMPY_DTYPES[typecode])
+            return np.fromfile(path, dtype=NUMPY_DTYPES[typecode], count=count)
+
+        values = array(typecode)
+        if count:
+            with open(path, "rb") as f:
+                values.frombytes(f.read(count * values.itemsize))
+        return values
+
+    def _dictionary(self, column: str) -> tuple:
+        """Values of a string column's dictionary, refreshed from disk."""
+        values, codes, offset = self._dicts.get(column) or ([], {}, 0)
+        path = self.path / f"{column}.dict"
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            chunk = b""
+
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            codes[json.loads(line)] = len(values)
+            values.append(json.loads(line))
+
+        entry = (values, codes, offset + end)
+        self._dicts[column] = entry
+        return entry
+
+    def _encode(self, column: str, values: List[str]) -> List[int]:
+        known, codes, offset = self._dictionary(column)
+        new = []
+        encoded = []
+        for value in values:
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(known)
+                known.append(value)
+                new.append(value)
+            encoded.append(code)
+
+        if new:
+            text = "".join(json.dumps(value, ensure_ascii=False) + "\n" for value in new)
+            data = text.encode("utf-8")
+            with open(self.path / f"{column}.dict", "ab") as f:
+                if f.tell() != offset:
+                    f.truncate(offset)  # Partial line of a crashed append
+                f.write(data)
+            self._dicts[column] = (known, codes, offset + len(data))
+        return encoded
+
+
+# ═══════════════════════════════════════════════════════════════
+# QUERIES
+# ═══════════════════════════════════════════════════════════════
+
+class MetricsTable:
+    """
+    Loaded metrics columns with filter and group-by helpers.
+
+    Filters are keyword arguments on string columns (workflow="...",
+    model="...") plus since/until (epoch seconds or datetime) on
+    started_at. With NumPy every operation is vectorized; without it
+    the same results come from plain loops.
+    """
+
+    def __init__(self, columns: Dict[str, Any], dictionaries: Dict[str, List[str]], rows: int, np=None):
+        self.columns = columns
+        self.dictionaries = dictionaries
+        self.rows = rows
+        self.np = np
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def values(self, column: str, **filters) -> List[Any]:
+        """Values of a column for the matching rows (strings decoded)."""
+        selected = self._take(column, self._select(filters))
+        if self.np is not None:
+            selected = selected.tolist()
+        if column in self.dictionaries:
+            names = self.dictionaries[column]
+            return [names[code] for code in selected]
+        return list(selected)
+
+    def summarize(self, column: str, by: Optional[str] = None, **filters) -> Dict[str, Dict[str, float]]:
+        """
+        count, sum, mean, p50 and p95 of a numeric column, per value
+        of the string column `by` (or under "all").
+        """
+        selection = self._select(filters)
+        values = self._take(column, selection)
+        if by is None:
+            return {"all": self._stats(values)} if len(values) else {}
+
+        keys = self._take(by, selection)
+        names = self.dictionaries[by]
+        np = self.np
+        if np is not None:
+            order = np.argsort(keys, kind="stable")
+            keys, values = keys[order], values[order]
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else []
+            groups = zip(keys[starts], np.split(values, starts[1:]))
+        else:
+            grouped: Dict[int, List[float]] = {}
+            for key, value in zip(keys, values):
+                grouped.setdefault(key, []).append(value)
+            groups = grouped.items()
+
+        return {names[key]: self._stats(group) for key, group in groups}
+
+    def daily(self, column: str, **filters) -> Dict[str, Dict[str, float]]:
+        """summarize() per UTC day of the run start (YYYY-MM-DD)."""
+        selection = self._select(filters)
+        values = self._take(column, selection)
+        days = self._take("started_at", selection)
+        np = self.np
+
+        if np is not None:
+            day_numbers = (days // 86400).astype("i8")
+            order = np.argsort(day_numbers, kind="stable")
+            day_numbers, values = day_numbers[order], values[order]
+            if not len(day_numbers):
+                return {}
+            starts = np.flatnonzero(np.r_[True, day_numbers[1:] != day_numbers[:-1]])
+            groups = zip(day_numbers[starts].tolist(), np.split(values, starts[1:]))
+        else:
+            grouped: Dict[int, List[float]] = {}
+            for day, value in zip(days, values):
+                grouped.setdefault(int(day // 86400), []).append(value)
+            groups = sorted(grouped.items())
+
+        return {
+            datetime.fromtimestamp(day * 86400, timezone.utc).strftime("%Y-%m-%d"): self._stats(group)
+            for day, group in groups
+        }
+
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    def _select(self, filters: Dict[str, Any]):
+        """Boolean mask (NumPy) or list of row indices matching the filters."""
+        since = filters.pop("since", None)
+        until = filters.pop("until", None)
+        since = since.timestamp() if isinstance(since, datetime) else since
+        until = until.timestamp() if isinstance(until, datetime) else until
+
+        conditions = []
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column not in self.dictionaries:
+                raise KeyError(f"Not a loaded string column: {column}")
+            try:
+                code = self.dictionaries[column].index(value)
+            except ValueError:
+                code = -1  # Unknown value matches nothing
+            conditions.append((column, code))
+
+        np = self.np
+        if np is not None:
+            mask = np.ones(self.rows, dtype=bool)
+            for column, code in conditions:
+                mask &= self.columns[column] == code
+            if since is not None:
+                mask &= self.columns["started_at"] >= since
+            if until is not None:
+                mask &= self.columns["started_at"] < until
+            return mask
+
+        return [
+            i for i in range(self.rows)
+            if all(self.columns[column][i] == code for column, code in conditions)
+            and (since is None or self.columns["started_at"][i] >= since)
+            and (until is None or self.columns["started_at"][i] < until)
+        ]
+
+    def _take(self, column: str, selection):
+        values = self.columns[column]
+        if self.np is not None:
+            return values[selection]
+        return [values[i] for i in selection]
+
+    def _stats(self, values) -> Dict[str, float]:
+        np = self.np
+        if np is not None:
+            values = values.astype("f8")
+            p50, p95 = np.percentile(values, [50, 95])
+            return {
+                "count": int(len(values)),
+                "sum": float(values.sum()),
+                "mean": float(values.mean()),
+                "p50": float(p50),
+                "p95": float(p95),
+            }
+
+        ordered = sorted(float(v) for v in values)
+        total = sum(ordered)
+        return {
+            "count": len(ordered),
+            "sum": total,
+            "mean": total / len(ordered),
+            "p50": percentile(ordered, 50),
+            "p95": percentile(ordered, 95),
+        }
+
+
+# ═══════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    command = args[0] if args else "rebuild"
+
+    if command == "rebuild":
+        logs_dir = Path(args[1]) if len(args) > 1 else Path("workflows/logs")
+        store = MetricsStore(logs_dir / "metrics")
+        count = store.rebuild(logs_dir)
+        print(f"Stored {count} step metrics in {store.path}")
+        return 0
+
+    print(f"Unknown command: {command} (use 'rebuild')")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -64,6 +64,12 @@ class LowConfidenceAction(str, Enum):
     MANUAL_REVIEW = "manual_review"
 
 
+class CatchUpPolicy(str, Enum):
+    SKIP = "skip"    # Drop runs missed while the scheduler was down
+    ONCE = "once"    # Run once for any number of missed runs
+    ALL = "all"      # Run every missed occurrence
+
+
 # ═══════════════════════════════════════════════════════════════
 # TRIGGER CONFIG
 # ═══════════════════════════════════════════════════════════════
@@ -74,6 +80,11 @@ class TriggerConfig:
     cron: Optional[str] = None
     watch: Optional[str] = None
     event: Optional[str] = None
+    catch_up: CatchUpPolicy = CatchUpPolicy.SKIP
+    # Concurrent runs of this workflow started by triggers
+    max_concurrency: int = 1
+    # Merge triggers that arrive while a run is still pending
+    coalesce: bool = False
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -104,6 +115,7 @@ class AuditConfig:
     log_level: LogLevel = LogLevel.STANDARD
     include_prompts: bool = False
     include_outputs: bool = True
+    log_buffer_size: int = 5000
 
 
 @dataclass
@@ -122,6 +134,9 @@ class BranchCondition:
     condition: str
     steps: List['StepDefinition'] = field(default_factory=list)
 
+    # Parsed condition (filled by the parser)
+    compiled: Optional[Any] = field(default=None, repr=False, compare=False)
+
 
 @dataclass
 class StepDefinition:
@@ -169,6 +184,12 @@ class StepDefinition:
     retry_delay: Optional[str] = None
     timeout: Optional[str] = None
 
+    # Result caching (TTL, e.g. "1h")
+    cache: Optional[str] = None
+
+    # Compiled templates/condition by field name (filled by the parser)
+    compiled: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
     def get_execution_type(self) -> str:
         """Return the type of execution for this step."""
         if self.command:
@@ -201,6 +222,9 @@ class WorkflowSettings:
     timeout: str = "30m"
     dry_run: bool = False
 
+    # Inline values up to this many characters; larger ones become blob handles
+    blob_threshold: Optional[int] = None
+
 
 @dataclass
 class WorkflowDefinition:
@@ -238,6 +262,7 @@ class StepResult:
     tokens_used: int = 0
     duration_ms: int = 0
     model_used: Optional[str] = None
+    cache_hit: bool = False
 
     @property
     def success(self) -> bool:
@@ -4,22 +4,22 @@ Workflow Engine - YAML Parser
 Loads YAML workflow definitions and converts them to typed objects.
 """
 
+import importlib.util
 import json
+import logging
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-import yaml
-
-try:
-    import jsonschema
-    HAS_JSONSCHEMA = True
-except ImportError:
-    HAS_JSONSCHEMA = False
+# yaml and jsonschema are imported on first use: with a fresh definition
+# bundle (see bundle.py) neither is needed at all
+HAS_JSONSCHEMA = importlib.util.find_spec("jsonschema") is not None
 
 from workflows.engine.models import (
     AuditConfig,
     BranchCondition,
     BudgetConfig,
+    CatchUpPolicy,
     Complexity,
     DecisionMaking,
     CodingPrefs,
@@ -43,7 +43,14 @@ from workflows.engine.models import (
     WorkflowDefinition,
     WorkflowSettings,
 )
+from workflows.engine.dependencies import TEMPLATE_FIELDS
+from workflows.engine.interpolation import (
+    CompiledCondition,
+    compile_condition,
+    compile_template,
+)
 from workflows.engine.exceptions import (
+    ConditionEvaluationError,
     WorkflowNotFoundError,
     WorkflowValidationError,
     ProfileNotFoundError,
@@ -88,6 +95,8 @@ def load_yaml(path: Path) -> Dict[str, Any]:
     if not path.exists():
         raise FileNotFoundError(f"File not found: {path}")
 
+    import yaml
+
     with open(path, 'r', encoding='utf-8') as f:
         return yaml.safe_load(f) or {}
 
@@ -101,11 +110,16 @@ def validate_against_schema(data: Dict[str, Any], schema_name: str) -> List[str]
     if not schema_path.exists():
         return [f"Schema not found: {schema_path}"]
 
-    with open(schema_path, 'r', encoding='utf-8') as f:
-        schema = json.load(f)
+    validator = _definition_cache.lookup("schema", schema_name)
+    if validator is None:
+        stamps = _stamp_files([schema_path])
+        with open(schema_path, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+        import jsonschema
+        validator = jsonschema.Draft7Validator(schema)
+        _definition_cache.store("schema", schema_name, stamps, validator)
 
     errors = []
-    validator = jsonschema.Draft7Validator(schema)
     for error in validator.iter_errors(data):
         path = ".".join(str(p) for p in error.absolute_path)
         errors.append(f"{path}: {error.message}" if path else error.message)
@@ -113,6 +127,109 @@ def validate_against_schema(data: Dict[str, Any], schema_name: str) -> List[str]
     return errors
 
 
+# ═══════════════════════════════════════════════════════════════
+# DEFINITION CACHE
+# ═══════════════════════════════════════════════════════════════
+
+FileStamp = Optional[Tuple[int, int]]
+FileStamps = List[Tuple[Path, FileStamp]]
+
+
+def _file_stamp(path: Path) -> FileStamp:
+    """Identify a file version by (mtime_ns, size); None if missing."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _stamp_files(paths: Iterable[Path]) -> FileStamps:
+    """Stamp source files before reading them, so later edits invalidate."""
+    return [(path, _file_stamp(path)) for path in paths]
+
+
+class DefinitionCache:
+    """
+    Process-wide cache of parsed definitions and schema validators.
+
+    Each entry records the stamps of the files it was built from
+    (e.g. a permissions profile and all profiles it inherits from) and
+    is rebuilt as soon as any of them changes. A lookup costs one
+    stat() per source file instead of a YAML parse.
+
+    Cached objects are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[Tuple[Tuple[Path, FileStamp], ...], Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, kind: str, name: str) -> Optional[Any]:
+        """Return the cached value if none of its source files changed."""
+        with self._lock:
+            entry = self._entries.get((kind, name))
+
+        if entry is not None:
+            stamps, value = entry
+            if all(_file_stamp(path) == stamp for path, stamp in stamps):
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def store(self, kind: str, name: str, stamps: FileStamps, value: Any):
+        """Cache a value with the stamps of the files it was built from."""
+        with self._lock:
+            self._entries[(kind, name)] = (tuple(stamps), value)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache statistics."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_definition_cache = DefinitionCache()
+
+
+def get_definition_cache() -> DefinitionCache:
+    """Get the process-wide definition cache."""
+    return _definition_cache
+
+
+def clear_definition_cache():
+    """Force the next load of every definition to re-read its files."""
+    _definition_cache.clear()
+
+
+def _from_bundle(kind: str, name: str) -> Optional[Tuple[Any, FileStamps]]:
+    """Get prebuilt data and source stamps from a fresh definition bundle."""
+    from workflows.engine.bundle import get_bundle
+
+    bundle = get_bundle()
+    if bundle is None:
+        return None
+
+    found = bundle.lookup(kind, name)
+    if found is None:
+        return None
+
+    data, paths = found
+    return data, _stamp_files(paths)
+
+
 # ═══════════════════════════════════════════════════════════════
 # WORKFLOW PARSER
 # ═══════════════════════════════════════════════════════════════
@@ -127,6 +244,9 @@ def parse_trigger(data: Dict[str, Any]) -> TriggerConfig:
         cron=data.get("cron"),
         watch=data.get("watch"),
         event=data.get("event"),
+        catch_up=CatchUpPolicy(data.get("catch_up", "skip")),
+        max_concurrency=data.get("max_concurrency", 1),
+        coalesce=data.get("coalesce", False),
     )
 
 
@@ -143,10 +263,12 @@ def parse_variable(data: Dict[str, Any]) -> VariableConfig:
 
 def parse_branch(data: Dict[str, Any]) -> BranchCondition:
     """Parse a branch condition with nested steps."""
-    return BranchCondition(
+    branch = BranchCondition(
         condition=data["condition"],
         steps=[parse_step(s) for s in data.get("steps", [])],
     )
+    branch.compiled = _compile_condition(branch.condition)
+    return branch
 
 
 def parse_step(data: Dict[str, Any]) -> StepDefinition:
@@ -176,7 +298,7 @@ def parse_step(data: Dict[str, Any]) -> StepDefinition:
     if "on_low_confidence" in data:
         on_low_confidence = LowConfidenceAction(data["on_low_confidence"])
 
-    return StepDefinition(
+    step = StepDefinition(
         name=data["name"],
         description=data.get("description"),
         command=data.get("command"),
@@ -204,7 +326,32 @@ def parse_step(data: Dict[str, Any]) -> StepDefinition:
         retry_count=data.get("retry_count", 0),
         retry_delay=data.get("retry_delay"),
         timeout=data.get("timeout"),
+        cache=data.get("cache"),
     )
+    compile_step_templates(step)
+    return step
+
+
+def compile_step_templates(step: StepDefinition):
+    """Compile a step's template fields and condition once, at parse time."""
+    for field_name in TEMPLATE_FIELDS:
+        value = getattr(step, field_name)
+        if field_name == "condition":
+            compiled = _compile_condition(value)
+            if compiled is not None:
+                step.compiled[field_name] = compiled
+        elif isinstance(value, str) and "{{" in value:
+            step.compiled[field_name] = compile_template(value)
+
+
+def _compile_condition(condition: Optional[str]) -> Optional[CompiledCondition]:
+    """Parse a condition; invalid ones are left to fail at evaluation."""
+    if not isinstance(condition, str) or not condition:
+        return None
+    try:
+        return compile_condition(condition)
+    except ConditionEvaluationError:
+        return None
 
 
 def parse_budget(data: Optional[Dict[str, Any]]) -> Optional[BudgetConfig]:
@@ -231,6 +378,7 @@ def parse_audit(data: Optional[Dict[str, Any]]) -> AuditConfig:
         log_level=log_level,
         include_prompts=data.get("include_prompts", False),
         include_outputs=data.get("include_outputs", True),
+        log_buffer_size=data.get("log_buffer_size", 5000),
     )
 
 
@@ -257,11 +405,15 @@ def parse_settings(data: Dict[str, Any]) -> WorkflowSettings:
         max_steps=data.get("max_steps", 50),
         timeout=data.get("timeout", "30m"),
         dry_run=data.get("dry_run", False),
+        blob_threshold=data.get("blob_threshold"),
     )
 
 
 def parse_workflow(data: Dict[str, Any], source_path: Optional[Path] = None) -> WorkflowDefinition:
     """Parse a complete workflow definition from dict."""
+    steps = [parse_step(s) for s in data.get("steps", [])]
+    _check_depends_on(data["name"], steps)
+
     return WorkflowDefinition(
         name=data["name"],
         description=data.get("description", ""),
@@ -270,7 +422,7 @@ def parse_workflow(data: Dict[str, Any], source_path: Optional[Path] = None) ->
         permissions_profile=data.get("permissions_profile", "default"),
         preferences_profile=data.get("preferences_profile", "default"),
         variables=[parse_variable(v) for v in data.get("variables", [])],
-        steps=[parse_step(s) for s in data.get("steps", [])],
+        steps=steps,
         settings=parse_settings(data),
         budget=parse_budget(data.get("budget")),
         audit=parse_audit(data.get("audit")),
@@ -279,23 +431,55 @@ def parse_workflow(data: Dict[str, Any], source_path: Optional[Path] = None) ->
     )
 
 
+def _check_depends_on(workflow_name: str, steps: List[StepDefinition]):
+    """Steps run in order, so depends_on must name an earlier step."""
+    earlier: set = set()
+    errors = []
+    for step in steps:
+        if step.depends_on and step.depends_on not in earlier:
+            errors.append(
+                f"steps.{step.name}.depends_on: '{step.depends_on}' is not an earlier step"
+            )
+        earlier.add(step.name)
+
+    if errors:
+        raise WorkflowValidationError(
+            f"Workflow '{workflow_name}' has invalid dependencies", errors
+        )
+
+
 def load_workflow(name: str) -> WorkflowDefinition:
-    """Load a workflow by name from the definitions directory."""
+    """
+    Load a workflow by name from the definitions directory.
+
+    Parsed definitions are cached until the YAML file changes.
+    """
     path = get_definitions_path() / f"{name}.yaml"
 
+    cached = _definition_cache.lookup("workflow", name)
+    if cached is not None:
+        return cached
+
     if not path.exists():
         raise WorkflowNotFoundError(name)
 
-    data = load_yaml(path)
+    bundled = _from_bundle("workflows", name)
+    if bundled is not None:
+        # Bundled data was schema-checked at build time
+        data, stamps = bundled
+    else:
+        stamps = _stamp_files([path])
+        data = load_yaml(path)
 
-    # Validate against schema (non-blocking - parser handles edge cases)
-    errors = validate_against_schema(data, "workflow")
-    if errors:
-        # Log validation warnings but continue - parser is more flexible
-        import logging
-        logging.warning(f"Workflow '{name}' has schema warnings: {errors}")
+        # Validate against schema (non-blocking - parser handles edge cases)
+        errors = validate_against_schema(data, "workflow")
+        if errors:
+            # Log validation warnings but continue - parser is more flexible
+            logging.warning(f"Workflow '{name}' has schema warnings: {errors}")
 
-    return parse_workflow(data, source_path=path)
+    workflow = parse_workflow(data, source_path=path)
+    _definition_cache.store("workflow", name, stamps, workflow)
+    return workflow
 
 
 def list_workflows() -> List[str]:
@@ -374,10 +558,38 @@ def parse_permissions(data: Dict[str, Any]) -> PermissionsProfile:
 
 
 def load_permissions(name: str, resolved: Dict[str, PermissionsProfile] = None) -> PermissionsProfile:
-    """Load a permissions profile by name, resolving inheritance."""
-    if resolved is None:
-        resolved = {}
+    """
+    Load a permissions profile by name, resolving inheritance.
 
+    Resolved profiles are cached until the profile or any profile it
+    inherits from changes.
+    """
+    if resolved is None:
+        cached = _definition_cache.lookup("permissions", name)
+        if cached is not None:
+            return cached
+
+        bundled = _from_bundle("permissions", name)
+        if bundled is not None:
+            from workflows.engine.bundle import restore_permissions
+            data, stamps = bundled
+            profile = restore_permissions(data)
+        else:
+            stamps = []
+            profile = _load_permissions(name, {}, stamps)
+
+        _definition_cache.store("permissions", name, stamps, profile)
+        return profile
+
+    return _load_permissions(name, resolved, [])
+
+
+def _load_permissions(
+    name: str,
+    resolved: Dict[str, PermissionsProfile],
+    stamps: FileStamps,
+) -> PermissionsProfile:
+    """Load and merge a permissions profile, recording source file stamps."""
     if name in resolved:
         return resolved[name]
 
@@ -386,12 +598,13 @@ def load_permissions(name: str, resolved: Dict[str, PermissionsProfile] = None)
     if not path.exists():
         raise ProfileNotFoundError("Permissions", name)
 
+    stamps.extend(_stamp_files([path]))
     data = load_yaml(path)
     profile = parse_permissions(data)
 
     # Resolve inheritance
     if profile.inherits:
-        parent = load_permissions(profile.inherits, resolved)
+        parent = _load_permissions(profile.inherits, resolved, stamps)
 
         # Merge with parent (child overrides)
         profile.always_allow = list(set(parent.always_allow + profile.always_allow))
@@ -460,11 +673,23 @@ def parse_preferences(data: Dict[str, Any]) -> PreferencesProfile:
 
 
 def load_preferences(name: str) -> PreferencesProfile:
-    """Load a preferences profile by name."""
+    """Load a preferences profile by name (cached until the file changes)."""
+    cached = _definition_cache.lookup("preferences", name)
+    if cached is not None:
+        return cached
+
     path = get_preferences_path() / f"{name}.yaml"
 
     if not path.exists():
         raise ProfileNotFoundError("Preferences", name)
 
-    data = load_yaml(path)
-    return parse_preferences(data)
+    bundled = _from_bundle("preferences", name)
+    if bundled is not None:
+        data, stamps = bundled
+    else:
+        stamps = _stamp_files([path])
+        data = load_yaml(path)
+
+    preferences = parse_preferences(data)
+    _definition_cache.store("preferences", name, stamps, preferences)
+    return preferences
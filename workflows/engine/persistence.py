@@ -0,0 +1,331 @@
+"""
+Workflow Engine - Background Persistence
+
+Off-loop file writer for checkpoints, run logs and audit logs.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+
+# A payload is either ready text or a callable producing it in the writer thread
+Payload = Union[str, Callable[[], str]]
+WrittenCallback = Optional[Callable[[int], None]]
+# (sequence number, operation, payload, callback, durable)
+Operation = Tuple[int, str, Payload, WrittenCallback, bool]
+
+
+# ═══════════════════════════════════════════════════════════════
+# BACKGROUND WRITER
+# ═══════════════════════════════════════════════════════════════
+
+class BackgroundWriter:
+    """
+    Dedicated writer thread fed by a bounded, per-file coalescing queue.
+
+    Operations per path:
+    - write:  replace file contents (atomic via temp file + rename);
+              supersedes any pending operations on the same path
+    - append: append to file, preserving order with other appends
+    - delete: remove file; supersedes pending operations
+
+    Payloads may be callables so JSON encoding also runs off the event
+    loop. Values captured by such callables are treated as immutable
+    once handed over. Durable operations are fsynced.
+
+    Every operation gets a sequence number (returned on submit). A
+    write that supersedes pending operations inherits the lowest of
+    their numbers, and operations submitted by an on_written callback
+    share the number of the operation that triggered them.
+
+    Guarantees:
+    - flush(seq) / flush_async(seq) return once every operation up to
+      seq is on disk (default: everything submitted before the call);
+      later submissions do not delay them
+    - pending writes are flushed at interpreter exit (atexit)
+
+    Backpressure: once max_pending operations are queued, threads
+    submitting operations that grow the queue wait for the writer. A
+    thread running an event loop - stalling it would stall every run on
+    the loop - may queue up to OVERFLOW_FACTOR times as many (counted
+    as "overflow") before it waits too. The writer thread itself (its
+    callbacks) never waits.
+    """
+
+    DEFAULT_MAX_PENDING = 1024
+    OVERFLOW_FACTOR = 4
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING):
+        self.max_pending = max_pending
+
+        self._pending: "OrderedDict[Path, List[Operation]]" = OrderedDict()
+        self._pending_ops = 0
+        self._seq = 0
+        # Lowest sequence number of the batch being written (None if idle)
+        self._busy_seq: Optional[int] = None
+        # Sequence number of the operation whose callback is running
+        self._callback_seq: Optional[int] = None
+        self._waiters: List[Tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "written": 0,
+            "bytes_written": 0,
+            "errors": 0,
+            "overflow": 0,
+            "blocked": 0,
+        }
+
+    # ─────────────────────────────────────────────────────────────
+    # PUBLIC API
+    # ─────────────────────────────────────────────────────────────
+
+    def write(
+        self, path: Path, payload: Payload, on_written: WrittenCallback = None, durable: bool = False
+    ) -> int:
+        """Queue a full-file write (latest write wins); return its sequence number."""
+        return self._submit(Path(path), "write", payload, on_written, durable)
+
+    def append(
+        self, path: Path, payload: Payload, on_written: WrittenCallback = None, durable: bool = False
+    ) -> int:
+        """Queue an append; return its sequence number."""
+        return self._submit(Path(path), "append", payload, on_written, durable)
+
+    def delete(self, path: Path) -> int:
+        """Queue a file removal; return its sequence number."""
+        return self._submit(Path(path), "delete", "", None, False)
+
+    def flush(self, timeout: Optional[float] = None, seq: Optional[int] = None) -> bool:
+        """Block until all operations up to seq (default: submitted so far) are written."""
+        with self._cond:
+            target = self._seq if seq is None else seq
+            return self._cond.wait_for(lambda: self._done_through(target), timeout=timeout)
+
+    async def flush_async(self, timeout: Optional[float] = None, seq: Optional[int] = None) -> bool:
+        """flush() without blocking the event loop (or tying up an executor thread)."""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            target = self._seq if seq is None else seq
+            if self._done_through(target):
+                return True
+            future = loop.create_future()
+            self._waiters.append((target, loop, future))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def is_pending(self, path: Path) -> bool:
+        """Check whether a path has queued operations."""
+        with self._cond:
+            return Path(path) in self._pending
+
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    def _submit(
+        self, path: Path, op: str, payload: Payload, on_written: WrittenCallback, durable: bool
+    ) -> int:
+        """Add an operation, coalescing with pending ones for the same path."""
+        self._ensure_thread()
+        on_writer = threading.current_thread() is self._thread
+        on_loop = not on_writer and _on_event_loop()
+
+        with self._cond:
+            ops = self._pending.get(path)
+            # Writes and deletes replace the pending operations of their path
+            grows = op == "append" or not ops
+            if grows and self._pending_ops >= self.max_pending:
+                limit = self.max_pending * self.OVERFLOW_FACTOR if on_loop else self.max_pending
+                if on_writer or self._pending_ops < limit:
+                    self.stats["overflow"] += 1
+                else:
+                    # Backpressure: wait for the writer when the queue is full
+                    self.stats["blocked"] += 1
+                    self._cond.wait_for(lambda: self._pending_ops < limit)
+                    ops = self._pending.get(path)
+
+            if on_writer and self._callback_seq is not None:
+                seq = self._callback_seq
+            else:
+                self._seq += 1
+                seq = self._seq
+
+            if ops is None:
+                ops = self._pending[path] = []
+
+            if op in ("write", "delete") and ops:
+                # Superseded operations never need to hit the disk; this
+                # one stands in for them when flushing
+                seq = min(seq, min(pending[0] for pending in ops))
+                self.stats["coalesced"] += len(ops)
+                self._pending_ops -= len(ops)
+                ops.clear()
+
+            ops.append((seq, op, payload, on_written, durable))
+            self._pending_ops += 1
+            self.stats["submitted"] += 1
+            self._cond.notify_all()
+            return seq
+
+    def _done_through(self, target: int) -> bool:
+        """True if no operation numbered <= target is queued or being written."""
+        if self._busy_seq is not None and self._busy_seq <= target:
+            return False
+        return not any(op[0] <= target for ops in self._pending.values() for op in ops)
+
+    def _wake_waiters(self):
+        """Resolve flush_async() waiters whose operations are written (holding _cond)."""
+        remaining = []
+        for waiter in self._waiters:
+            target, loop, future = waiter
+            if not self._done_through(target):
+                remaining.append(waiter)
+                continue
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                pass  # Loop closed; nobody is waiting anymore
+        self._waiters = remaining
+
+    def _ensure_thread(self):
+        """Start the writer thread on first use."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="workflow-persistence", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        """Writer thread main loop."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: bool(self._pending))
+                path, ops = self._pending.popitem(last=False)
+                self._pending_ops -= len(ops)
+                self._busy_seq = min(op[0] for op in ops)
+                self._cond.notify_all()
+
+            try:
+                self._apply(path, ops)
+            finally:
+                with self._cond:
+                    self._busy_seq = None
+                    self._wake_waiters()
+                    self._cond.notify_all()
+
+    def _apply(self, path: Path, ops: List[Operation]):
+        """Apply queued operations for one path, merging consecutive appends."""
+        appends: List[str] = []
+        appends_durable = False
+        callbacks: List[Tuple[int, WrittenCallback, int]] = []
+
+        for seq, op, payload, on_written, durable in ops:
+            try:
+                if op == "append":
+                    text = payload() if callable(payload) else payload
+                    appends.append(text)
+                    appends_durable = appends_durable or durable
+                    callbacks.append((seq, on_written, len(text.encode("utf-8"))))
+                    continue
+
+                self._write_appends(path, appends, appends_durable)
+                appends, appends_durable = [], False
+
+                if op == "delete":
+                    if path.exists():
+                        path.unlink()
+                else:
+                    text = payload() if callable(payload) else payload
+                    self._write_atomic(path, text, durable)
+                    callbacks.append((seq, on_written, len(text.encode("utf-8"))))
+            except Exception as e:
+                self.stats["errors"] += 1
+                logging.warning(f"Background write to {path} failed: {e}")
+
+        try:
+            self._write_appends(path, appends, appends_durable)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Background append to {path} failed: {e}")
+
+        for seq, on_written, size in callbacks:
+            self.stats["written"] += 1
+            self.stats["bytes_written"] += size
+            if on_written:
+                self._callback_seq = seq
+                try:
+                    on_written(size)
+                except Exception as e:
+                    logging.warning(f"Write callback for {path} failed: {e}")
+                finally:
+                    self._callback_seq = None
+
+    def _write_appends(self, path: Path, chunks: List[str], durable: bool):
+        if not chunks:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(chunks))
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _write_atomic(self, path: Path, text: str, durable: bool):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(True)
+
+
+def _on_event_loop() -> bool:
+    """True if the calling thread is running an asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+# ═══════════════════════════════════════════════════════════════
+# PROCESS-WIDE WRITER
+# ═══════════════════════════════════════════════════════════════
+
+# Upper bound for the final flush at interpreter exit (seconds)
+FLUSH_ON_EXIT_TIMEOUT = 30
+
+_writer: Optional[BackgroundWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> BackgroundWriter:
+    """Get the process-wide background writer."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BackgroundWriter()
+            atexit.register(_writer.flush, FLUSH_ON_EXIT_TIMEOUT)
+        return _writer
@@ -0,0 +1,295 @@
+"""
+Workflow Engine - Run Index
+
+Append-only JSONL manifest of run summaries (workflows/logs/index.jsonl),
+so run history never has to open the full run logs.
+
+Usage:
+    python -m workflows.engine.run_index rebuild   # rebuild index and aggregates from run logs
+"""
+
+import heapq
+import json
+import os
+import sys
+import threading
+from bisect import insort
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from workflows.engine.persistence import get_writer
+
+
+INDEX_FILENAME = "index.jsonl"
+
+# First line of a manifest built by rebuild(): without it the manifest
+# was started by appends only and lacks the runs logged before it
+HEADER = {"run_index": 1}
+
+# Longer errors are truncated in the index (the run log has them in full)
+MAX_ERROR_LENGTH = 300
+
+
+def summarize_run(log_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the index entry for a run log (as written by WorkflowRunner)."""
+    error = log_data.get("error")
+    if error and len(error) > MAX_ERROR_LENGTH:
+        error = error[:MAX_ERROR_LENGTH] + "…"
+
+    return {
+        "run_id": log_data.get("run_id"),
+        "workflow": log_data.get("workflow"),
+        "version": log_data.get("version"),
+        "status": log_data.get("status", "unknown"),
+        "started_at": log_data.get("started_at", ""),
+        "completed_at": log_data.get("completed_at"),
+        "duration_seconds": log_data.get("duration_seconds", 0),
+        "total_tokens": log_data.get("total_tokens", 0),
+        "total_cost": log_data.get("total_cost", 0.0),
+        "steps": len(log_data.get("step_results", {})),
+        "error": error,
+    }
+
+
+def is_run_log(path: Path) -> bool:
+    """True for `<workflow>-<run_id>.json` run logs (not audit logs etc.)."""
+    return (
+        path.suffix == ".json"
+        and not path.name.startswith(".")
+        and not path.name.endswith(".audit.json")
+    )
+
+
+class RunIndex:
+    """
+    Run summaries indexed by workflow and start time.
+
+    Writers only append a line per completed run (through the background
+    writer). Readers keep the parsed manifest in memory and on every
+    query parse just the bytes appended since the last one. A later
+    entry for the same run_id replaces the earlier one.
+    """
+
+    def __init__(self, logs_dir: Optional[Path] = None):
+        self.logs_dir = logs_dir or Path("workflows/logs")
+        self.path = self.logs_dir / INDEX_FILENAME
+
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._generation: Optional[int] = None
+        self._runs: Dict[str, Dict[str, Any]] = {}
+        # workflow -> [(started_at, run_id)] sorted ascending
+        self._by_workflow: Dict[str, List[Tuple[str, str]]] = {}
+
+    # ─────────────────────────────────────────────────────────────
+    # WRITING
+    # ─────────────────────────────────────────────────────────────
+
+    def append(self, summary: Dict[str, Any]):
+        """Append a run summary (off the event loop)."""
+        get_writer().append(
+            self.path,
+            lambda: json.dumps(summary, ensure_ascii=False, default=str) + "\n",
+        )
+
+    def rebuild(self) -> int:
+        """Rewrite the manifest from the run logs; return the number of runs."""
+        summaries = []
+        for log_file in self.logs_dir.glob("*.json"):
+            if not is_run_log(log_file):
+                continue
+            try:
+                data = json.loads(log_file.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                continue
+            if data.get("run_id") and data.get("workflow"):
+                summaries.append(summarize_run(data))
+
+        summaries.sort(key=lambda s: s["started_at"])
+
+        # Pending appends must not land in the file we are replacing
+        get_writer().flush()
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(
+            "".join(
+                json.dumps(s, ensure_ascii=False, default=str) + "\n"
+                for s in [HEADER, *summaries]
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+
+        with self._lock:
+            self._reset()
+        return len(summaries)
+
+    # ─────────────────────────────────────────────────────────────
+    # QUERIES
+    # ─────────────────────────────────────────────────────────────
+
+    def refresh(self):
+        """Load entries appended since the last call."""
+        generation = self.generation
+        if generation != self._generation and not self._has_header():
+            if generation is None and not self._has_run_logs():
+                return
+            # First use on an existing logs directory: the runner may
+            # already have appended to a new manifest
+            self.rebuild()
+
+        with self._lock:
+            generation = self.generation
+            if generation != self._generation:
+                # Replaced by a rebuild (possibly in another process)
+                self._reset()
+                self._generation = generation
+            entries, self._offset = self.read_entries(self._offset)
+            for entry in entries:
+                self._add(entry)
+
+    def read_entries(self, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Parse the entries appended after byte `offset`.
+
+        Returns the entries and the offset to continue from. A trailing
+        partial line is left for the next call.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return [], offset
+
+        end = chunk.rfind(b"\n") + 1
+        entries = []
+        for line in chunk[:end].splitlines():
+            if line.strip():
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries, offset + end
+
+    @property
+    def generation(self) -> Optional[int]:
+        """Changes whenever the manifest is replaced by a rebuild."""
+        try:
+            return self.path.stat().st_ino
+        except FileNotFoundError:
+            return None
+
+    def query(
+        self,
+        workflow: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Run summaries, newest first.
+
+        since/until are ISO dates or timestamps compared against
+        started_at (until is inclusive for whole dates). Returns
+        {"runs": [...], "total": n}.
+        """
+        self.refresh()
+
+        with self._lock:
+            if workflow is not None:
+                keys = reversed(self._by_workflow.get(workflow, []))
+            else:
+                keys = heapq.merge(
+                    *(reversed(entries) for entries in self._by_workflow.values()),
+                    reverse=True,
+                )
+
+            matches = []
+            for started_at, run_id in keys:
+                if since and started_at < since:
+                    break
+                if until and started_at[:len(until)] > until:
+                    continue
+                summary = self._runs[run_id]
+                if status and summary["status"] != status:
+                    continue
+                matches.append(summary)
+
+        return {"runs": matches[offset:offset + limit], "total": len(matches)}
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Summary of one run."""
+        self.refresh()
+        return self._runs.get(run_id)
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._runs)
+
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    def _add(self, summary: Dict[str, Any]):
+        run_id = summary.get("run_id")
+        workflow = summary.get("workflow")
+        if not run_id or not workflow:
+            return
+
+        previous = self._runs.get(run_id)
+        entries = self._by_workflow.setdefault(workflow, [])
+        if previous is not None:
+            entries.remove((previous["started_at"], run_id))
+
+        self._runs[run_id] = summary
+        insort(entries, (summary["started_at"], run_id))
+
+    def _reset(self):
+        self._offset = 0
+        self._generation = None
+        self._runs.clear()
+        self._by_workflow.clear()
+
+    def _has_header(self) -> bool:
+        try:
+            with open(self.path, "rb") as f:
+                return json.loads(f.readline()) == HEADER
+        except (OSError, ValueError):
+            return False
+
+    def _has_run_logs(self) -> bool:
+        return self.logs_dir.exists() and any(
+            is_run_log(p) for p in self.logs_dir.glob("*.json")
+        )
+
+
+# ═══════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    command = args[0] if args else "rebuild"
+
+    if command == "rebuild":
+        from workflows.engine.aggregates import RunAggregates
+
+        index = RunIndex(Path(args[1]) if len(args) > 1 else None)
+        count = index.rebuild()
+        print(f"Indexed {count} runs in {index.path}")
+
+        aggregates = RunAggregates(index.logs_dir, index)
+        aggregates.rebuild()
+        get_writer().flush()
+        print(f"Aggregated {len(aggregates.workflows())} workflows in {aggregates.path}")
+        return 0
+
+    print(f"Unknown command: {command} (use 'rebuild')")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""
+Workflow Engine - Run Registry
+
+Bounded registry of API-started runs: live contexts while running,
+compact summaries afterwards, optionally shared via SQLite.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from workflows.engine.context import WorkflowContext
+from workflows.engine.streaming import EventChannel
+
+
+ACTIVE_STATUSES = ("starting", "running")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    workflow_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    completed_at TEXT,
+    current_step INTEGER NOT NULL DEFAULT 0,
+    total_steps INTEGER NOT NULL DEFAULT 0,
+    tokens_used INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status);
+"""
+
+
+@dataclass
+class RunRecord:
+    """Compact summary of a run (everything the status endpoint needs)."""
+    run_id: str
+    workflow_name: str
+    status: str
+    started_at: str
+    completed_at: Optional[str] = None
+    current_step: int = 0
+    total_steps: int = 0
+    tokens_used: int = 0
+    cost: float = 0.0
+    error: Optional[str] = None
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    @property
+    def progress_percent(self) -> float:
+        if not self.active:
+            return 100.0
+        return self.current_step / self.total_steps * 100 if self.total_steps else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RunRegistry:
+    """
+    Registry of runs started through the API.
+
+    While a run is active the registry holds its live WorkflowContext
+    (and task, so it can be cancelled). On completion only the RunRecord
+    is kept; the full result lives in the run log. Completed records
+    are evicted after `ttl_seconds` or, beyond `max_records`, least
+    recently used first; callers then fall back to the log file.
+
+    With `db_path`, records are also written to SQLite so several API
+    processes (e.g. uvicorn workers) see each other's runs.
+
+    Every update() is published on `changes`; wait_for_update() wakes on
+    it. SQLite has no change notification, so records of runs in other
+    processes are re-read every SHARED_POLL_SECONDS while waiting.
+    """
+
+    DEFAULT_TTL_SECONDS = 3600.0
+    DEFAULT_MAX_RECORDS = 1000
+    SHARED_POLL_SECONDS = 1.0
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_records: int = DEFAULT_MAX_RECORDS,
+        db_path: Union[Path, str, None] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_records = max_records
+        self.db_path = db_path
+
+        self._records: "OrderedDict[str, RunRecord]" = OrderedDict()
+        self._contexts: Dict[str, WorkflowContext] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._context_waiters: Dict[str, List[asyncio.Future]] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.changes = EventChannel()
+        self.evicted = 0
+
+    # ─────────────────────────────────────────────────────────────
+    # LIFECYCLE
+    # ─────────────────────────────────────────────────────────────
+
+    def start(self, run_id: str, workflow_name: str, total_steps: int = 0) -> RunRecord:
+        """Register a new run."""
+        record = RunRecord(
+            run_id=run_id,
+            workflow_name=workflow_name,
+            status="starting",
+            started_at=datetime.now().isoformat(),
+            total_steps=total_steps,
+        )
+        with self._lock:
+            self._records[run_id] = record
+        self._persist(record)
+        self._evict()
+        return record
+
+    def attach(self, run_id: str, context: Optional[WorkflowContext] = None, task: Optional[asyncio.Task] = None):
+        """Attach the live context and/or task of an active run."""
+        if context is not None:
+            self._contexts[run_id] = context
+            self._notify(run_id, context)
+        if task is not None:
+            self._tasks[run_id] = task
+
+    def update(self, run_id: str, **changes) -> Optional[RunRecord]:
+        """Change fields of a record (e.g. status) and persist it."""
+        record = self._records.get(run_id)
+        if record is None:
+            return None
+        for name, value in changes.items():
+            setattr(record, name, value)
+        record.updated_at = time.time()
+        self._persist(record)
+        self.changes.publish()
+        return record
+
+    def refresh(self, run_id: str) -> Optional[RunRecord]:
+        """Copy progress from the live context into the record."""
+        record = self._records.get(run_id)
+        context = self._contexts.get(run_id)
+        if record is None or context is None:
+            return record
+
+        progress = (context.current_step, context.token_usage, context.cost)
+        if progress != (record.current_step, record.tokens_used, record.cost):
+            self.update(
+                run_id,
+                current_step=context.current_step,
+                tokens_used=context.token_usage,
+                cost=context.cost,
+            )
+        return record
+
+    async def follow(self, run_id: str):
+        """Copy progress into the record whenever the live context changes."""
+        context = await self.wait_for_context(run_id)
+        if context is None:
+            return
+
+        channel = context.events
+        version = -1
+        while not channel.closed:
+            await channel.wait(version)
+            version = channel.version
+            self.refresh(run_id)
+
+    def complete(self, run_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        """Finish a run: keep the summary, drop the context and task."""
+        changes: Dict[str, Any] = {
+            "status": status,
+            "completed_at": datetime.now().isoformat(),
+            "error": error,
+        }
+        if result is not None:
+            changes.update(
+                current_step=len(result.step_results),
+                total_steps=max(len(result.step_results), self._records[run_id].total_steps)
+                if run_id in self._records else len(result.step_results),
+                tokens_used=result.total_tokens,
+                cost=result.total_cost,
+                error=result.error or error,
+            )
+        self.update(run_id, **changes)
+
+        context = self._contexts.pop(run_id, None)
+        if context is not None:
+            # Lets stream subscribers finish after the record is final
+            context.events.close()
+        self._tasks.pop(run_id, None)
+        self._notify(run_id, None)
+        self._evict()
+
+    def cancel(self, run_id: str) -> bool:
+        """Cancel the task of an active run started in this process."""
+        task = self._tasks.get(run_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    # ─────────────────────────────────────────────────────────────
+    # LOOKUPS
+    # ─────────────────────────────────────────────────────────────
+
+    def get(self, run_id: str) -> Optional[RunRecord]:
+        """Get a record (from memory, else from the shared store)."""
+        with self._lock:
+            record = self._records.get(run_id)
+            if record is not None:
+                self._records.move_to_end(run_id)
+        if record is not None:
+            return self.refresh(run_id)
+        return self._load(run_id)
+
+    def context(self, run_id: str) -> Optional[WorkflowContext]:
+        """Live context of an active run in this process."""
+        return self._contexts.get(run_id)
+
+    async def wait_for_context(self, run_id: str) -> Optional[WorkflowContext]:
+        """
+        Live context of a run started in this process, waiting for the
+        runner to create it if necessary.
+
+        Returns None if the run belongs to another process or ends
+        without a context (e.g. a dry run).
+        """
+        context = self._contexts.get(run_id)
+        if context is not None or run_id not in self._tasks:
+            return context
+
+        future = asyncio.get_running_loop().create_future()
+        self._context_waiters.setdefault(run_id, []).append(future)
+        return await future
+
+    async def wait_for_update(
+        self,
+        run_id: str,
+        updated_at: float,
+        timeout: Optional[float] = None,
+    ) -> Optional[RunRecord]:
+        """
+        Wait until a run's record changes after `updated_at` or the run ends.
+
+        Returns the current record (None if it is gone), also when the
+        timeout expired first.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        while True:
+            version = self.changes.version
+            record = self.get(run_id)
+            if record is None or not record.active or record.updated_at > updated_at:
+                return record
+
+            wait = deadline - loop.time() if deadline is not None else None
+            if wait is not None and wait <= 0:
+                return record
+            if run_id not in self._records:
+                # Owned by another process: only the shared store changes
+                wait = min(wait, self.SHARED_POLL_SECONDS) if wait is not None else self.SHARED_POLL_SECONDS
+            await self.changes.wait(version, wait)
+
+    def active(self) -> List[RunRecord]:
+        """Active runs (of all processes when backed by SQLite)."""
+        if self.db_path is not None:
+            rows = self._db().execute(
+                f"SELECT * FROM runs WHERE status IN ({','.join('?' * len(ACTIVE_STATUSES))})",
+                ACTIVE_STATUSES,
+            ).fetchall()
+            return [self._from_row(row) for row in rows]
+        return [r for r in self._records.values() if r.active]
+
+    def _notify(self, run_id: str, context: Optional[WorkflowContext]):
+        for future in self._context_waiters.pop(run_id, []):
+            if not future.done():
+                future.set_result(context)
+
+    def __contains__(self, run_id: str) -> bool:
+        return self.get(run_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "records": len(self._records),
+            "live_contexts": len(self._contexts),
+            "evicted": self.evicted,
+            "shared": self.db_path is not None,
+        }
+
+    # ─────────────────────────────────────────────────────────────
+    # EVICTION
+    # ─────────────────────────────────────────────────────────────
+
+    def _evict(self):
+        """Drop expired completed records, then the least recently used beyond capacity."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [
+                run_id for run_id, record in self._records.items()
+                if not record.active and record.updated_at < cutoff
+            ]
+            for run_id in expired:
+                del self._records[run_id]
+
+            overflow = len(self._records) - self.max_records
+            if overflow > 0:
+                for run_id in [
+                    run_id for run_id, record in self._records.items() if not record.active
+                ][:overflow]:
+                    del self._records[run_id]
+                    expired.append(run_id)
+
+        self.evicted += len(expired)
+
+        if self.db_path is not None:
+            with self._db() as conn:
+                conn.execute(
+                    f"DELETE FROM runs WHERE status NOT IN ({','.join('?' * len(ACTIVE_STATUSES))}) "
+                    "AND updated_at < ?",
+                    (*ACTIVE_STATUSES, cutoff),
+                )
+
+    # ─────────────────────────────────────────────────────────────
+    # SHARED STORE
+    # ─────────────────────────────────────────────────────────────
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _persist(self, record: RunRecord):
+        if self.db_path is None:
+            return
+        data = record.to_dict()
+        columns = ", ".join(data)
+        with self._db() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO runs ({columns}) VALUES ({', '.join('?' * len(data))})",
+                tuple(data.values()),
+            )
+
+    def _load(self, run_id: str) -> Optional[RunRecord]:
+        if self.db_path is None:
+            return None
+        row = self._db().execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> RunRecord:
+        return RunRecord(**{f.name: row[f.name] for f in fields(RunRecord)})
@@ -5,9 +5,10 @@ Main orchestrator that executes complete workflows.
 """
 
 import asyncio
+import json
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from workflows.engine.models import (
     BudgetConfig,
@@ -23,6 +24,12 @@ from workflows.engine.parser import (
 )
 from workflows.engine.context import WorkflowContext
 from workflows.engine.executor import StepExecutor, ModelSelector
+from workflows.engine.cache import StepCache
+from workflows.engine.dependencies import step_dependencies
+from workflows.engine.persistence import get_writer
+from workflows.engine.run_index import RunIndex, summarize_run
+from workflows.engine.metrics_store import MetricsStore, step_rows
+from workflows.engine.estimator import RunEstimate, RunEstimator
 from workflows.engine.interpolation import Interpolator
 from workflows.engine.exceptions import (
     WorkflowError,
@@ -58,6 +65,7 @@ class WorkflowRunner:
         self,
         logs_dir: Optional[Path] = None,
         checkpoint_dir: Optional[Path] = None,
+        cache_dir: Optional[Path] = None,
     ):
         self.logs_dir = logs_dir or Path("workflows/logs")
         self.checkpoint_dir = checkpoint_dir or Path("workflows/checkpoints")
@@ -67,6 +75,10 @@ class WorkflowRunner:
         self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
 
         self.model_selector = ModelSelector()
+        self.step_cache = StepCache(cache_dir)
+        self.run_index = RunIndex(self.logs_dir)
+        self.metrics_store = MetricsStore(self.logs_dir / "metrics")
+        self.estimator = RunEstimator(self.logs_dir, self.model_selector)
 
     # ─────────────────────────────────────────────────────────────
     # PUBLIC API
@@ -78,6 +90,9 @@ class WorkflowRunner:
         variables: Optional[Dict[str, Any]] = None,
         dry_run: bool = False,
         resume_from: Optional[str] = None,
+        incremental_from: Optional[str] = None,
+        run_id: Optional[str] = None,
+        on_context: Optional[Callable[[WorkflowContext], None]] = None,
     ) -> WorkflowResult:
         """
         Run a workflow by name.
@@ -87,6 +102,10 @@ class WorkflowRunner:
             variables: Override/provide workflow variables
             dry_run: Preview only, don't execute
             resume_from: Run ID to resume from checkpoint
+            incremental_from: Previous run ID whose unchanged step
+                results are reused (only changed steps re-run)
+            run_id: Run ID to use instead of a generated one
+            on_context: Called with the live context before execution
 
         Returns:
             WorkflowResult with execution details
@@ -102,6 +121,9 @@ class WorkflowRunner:
             workflow,
             variables=variables,
             resume_from=resume_from,
+            incremental_from=incremental_from,
+            run_id=run_id,
+            on_context=on_context,
         )
 
     async def run_definition(
@@ -109,6 +131,9 @@ class WorkflowRunner:
         workflow: WorkflowDefinition,
         variables: Optional[Dict[str, Any]] = None,
         resume_from: Optional[str] = None,
+        incremental_from: Optional[str] = None,
+        run_id: Optional[str] = None,
+        on_context: Optional[Callable[[WorkflowContext], None]] = None,
     ) -> WorkflowResult:
         """
         Run a workflow from its definition.
@@ -117,6 +142,9 @@ class WorkflowRunner:
             workflow: Parsed workflow definition
             variables: Override/provide workflow variables
             resume_from: Run ID to resume from checkpoint
+            incremental_from: Previous run ID to reuse unchanged steps from
+            run_id: Run ID to use instead of a generated one
+            on_context: Called with the live context before execution
 
         Returns:
             WorkflowResult
@@ -127,27 +155,58 @@ class WorkflowRunner:
 
         # Create or restore context
         if resume_from:
-            context = WorkflowContext.load_checkpoint(workflow.name, resume_from)
+            context = WorkflowContext.load_checkpoint(
+                workflow.name, resume_from, logs_dir=self.logs_dir
+            )
             if not context:
                 raise WorkflowError(f"Checkpoint not found: {resume_from}")
             context.log(f"Resumed from checkpoint at step {context.current_step}")
         else:
             context = WorkflowContext(
                 workflow_name=workflow.name,
+                run_id=run_id,
                 log_level=workflow.audit.log_level,
+                log_capacity=workflow.audit.log_buffer_size,
+                logs_dir=self.logs_dir,
             )
+        context.serialization.blob_threshold = workflow.settings.blob_threshold
+        # Metrics restored from a checkpoint were stored by the earlier invocation
+        stored_metrics = dict(context.step_metrics)
+        if on_context:
+            on_context(context)
+
+        # Load previous run for incremental execution
+        previous = None
+        if incremental_from:
+            previous = self._load_run_log(workflow.name, incremental_from)
+            if previous is None:
+                raise WorkflowError(f"Run log not found: {incremental_from}")
+            context.log(f"Incremental run based on {incremental_from}")
 
         # Initialize variables
         await self._init_variables(workflow, context, variables or {})
 
+        # Estimate fresh runs with a budget, so they can be rejected up front
+        estimate = None
+        if workflow.budget and not resume_from and previous is None:
+            estimate = await asyncio.to_thread(self.estimator.estimate, workflow)
+
         # Create executor
-        executor = StepExecutor(context, self.model_selector)
+        executor = StepExecutor(context, self.model_selector, self.step_cache)
 
-        # Execute workflow
-        result = await self._execute_workflow(workflow, context, executor)
+        try:
+            # Execute workflow
+            result = await self._execute_workflow(
+                workflow, context, executor, previous, estimate
+            )
 
-        # Write logs
-        self._write_logs(workflow, context, result)
+            # Write logs
+            self._write_logs(workflow, context, result, stored_metrics)
+        finally:
+            # Checkpoints and logs are persisted off-loop; make sure they
+            # are on disk before the caller sees the result (or the error).
+            # Writes queued later (e.g. by other runs) are not waited for.
+            await get_writer().flush_async()
 
         return result
 
@@ -170,13 +229,14 @@ class WorkflowRunner:
         context = WorkflowContext(
             workflow_name=workflow.name,
             log_level=workflow.audit.log_level,
+            logs_dir=self.logs_dir,
         )
 
         # Initialize variables
         await self._init_variables(workflow, context, variables or {})
 
         # Create interpolator for previewing
-        interpolator = Interpolator(context.get_all())
+        interpolator = Interpolator(context.view())
 
         # Preview each step
         preview_steps = []
@@ -215,11 +275,10 @@ class WorkflowRunner:
 
             preview_steps.append(step_preview)
 
-        # Estimate resources
-        estimated_tokens = sum(
-            self._estimate_step_tokens(s) for s in workflow.steps
-        )
-        estimated_cost = self._estimate_cost(estimated_tokens)
+        # Estimate resources from run history
+        estimate = await asyncio.to_thread(self.estimator.estimate, workflow)
+        for step_preview, step_estimate in zip(preview_steps, estimate.steps):
+            step_preview["estimate"] = step_estimate.to_dict()
 
         return WorkflowResult(
             workflow_name=workflow.name,
@@ -228,9 +287,9 @@ class WorkflowRunner:
             started_at=datetime.now(),
             completed_at=datetime.now(),
             variables=context.variables,
-            step_results={"preview": preview_steps},
-            total_tokens=estimated_tokens,
-            total_cost=estimated_cost,
+            step_results={"preview": preview_steps, "estimate": estimate.to_dict()},
+            total_tokens=round(estimate.tokens_p50),
+            total_cost=estimate.cost_p50,
         )
 
     async def list_available(self) -> List[Dict[str, Any]]:
@@ -291,7 +350,6 @@ class WorkflowRunner:
             elif var_config.type == "boolean" and value is not None:
                 value = bool(value)
             elif var_config.type == "list" and isinstance(value, str):
-                import json
                 value = json.loads(value)
 
             context.store(name, value)
@@ -301,12 +359,20 @@ class WorkflowRunner:
         workflow: WorkflowDefinition,
         context: WorkflowContext,
         executor: StepExecutor,
+        previous: Optional[Dict[str, Any]] = None,
+        estimate: Optional[RunEstimate] = None,
     ) -> WorkflowResult:
         """Execute all workflow steps."""
         context.mark_running()
         context.log(f"Starting workflow: {workflow.name} (v{workflow.version})")
 
+        dependencies = step_dependencies(workflow)
+        executed: set = set()
+
         try:
+            if estimate is not None:
+                self._check_estimate(workflow.budget, estimate, context)
+
             # Execute steps
             for i, step in enumerate(workflow.steps):
                 context.current_step = i
@@ -321,11 +387,24 @@ class WorkflowRunner:
                         f"Max steps ({workflow.settings.max_steps}) exceeded"
                     )
 
+                fingerprint = executor.fingerprint(step)
+
+                # Reuse unchanged steps from the previous run
+                if previous and self._can_reuse(
+                    step, fingerprint, previous, dependencies[step.name] & executed
+                ):
+                    self._reuse_step(step, previous, context)
+                    context.record_step(step.name, fingerprint=fingerprint, reused=True)
+                    await self._checkpoint(context)
+                    continue
+
                 # Execute step
                 result = await executor.execute(step)
+                executed.add(step.name)
+                context.record_step(step.name, result, fingerprint=fingerprint)
 
                 # Checkpoint after each step
-                context.checkpoint()
+                await self._checkpoint(context)
 
                 # Handle step failure
                 if not result.success:
@@ -357,6 +436,62 @@ class WorkflowRunner:
                 workflow, context, StepStatus.FAILED, str(e)
             )
 
+    async def _checkpoint(self, context: WorkflowContext):
+        """Checkpoint and wait (without blocking the loop) until it is on disk."""
+        context.checkpoint()
+        await get_writer().flush_async(seq=context.checkpoint_seq)
+
+    def _load_run_log(
+        self, workflow_name: str, run_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """Load a previous run's log file."""
+        log_file = self.logs_dir / f"{workflow_name}-{run_id}.json"
+        if not log_file.exists():
+            return None
+        return json.loads(log_file.read_text())
+
+    def _can_reuse(
+        self,
+        step,
+        fingerprint: Optional[str],
+        previous: Dict[str, Any],
+        rerun_upstream: set,
+    ) -> bool:
+        """Check whether a step's previous result is still valid."""
+        if not fingerprint or rerun_upstream:
+            return False
+
+        previous_step = previous.get("steps", {}).get(step.name)
+        if not previous_step:
+            return False
+        if previous_step.get("fingerprint") != fingerprint:
+            return False
+        if previous_step.get("status") != StepStatus.SUCCESS.value:
+            return False
+
+        # Stored output must be available to restore
+        if step.store_as and step.name not in previous.get("step_results", {}):
+            return False
+
+        return True
+
+    def _reuse_step(
+        self,
+        step,
+        previous: Dict[str, Any],
+        context: WorkflowContext,
+    ):
+        """Restore a step's output from the previous run."""
+        context.log_step_start(step.name)
+        context.log(f"Reusing result from {previous.get('run_id')}: inputs unchanged")
+
+        if step.store_as:
+            data = previous["step_results"][step.name]
+            context.store(step.store_as, data)
+            context.store_step_result(step.name, data)
+
+        context.log_step_end(step.name, StepStatus.SUCCESS)
+
     def _check_budget(self, budget: BudgetConfig, context: WorkflowContext):
         """Check if budget limits are exceeded."""
         if budget.max_tokens and context.token_usage > budget.max_tokens:
@@ -369,6 +504,26 @@ class WorkflowRunner:
                 "cost", context.cost, budget.max_cost
             )
 
+    def _check_estimate(self, budget: BudgetConfig, estimate: RunEstimate, context: WorkflowContext):
+        """Reject a run whose median estimate already exceeds the budget."""
+        context.log(
+            f"Estimated: {estimate.tokens_p50:.0f} tokens, ${estimate.cost_p50:.4f} "
+            f"(p95 ${estimate.cost_p95:.4f}) from {estimate.history_runs} runs"
+        )
+        # Without enough history the estimate is a guess - let the run decide
+        if not estimate.confident:
+            return
+
+        if budget.max_tokens and estimate.tokens_p50 > budget.max_tokens:
+            raise BudgetExceededError(
+                "estimated tokens", round(estimate.tokens_p50), budget.max_tokens
+            )
+
+        if budget.max_cost and estimate.cost_p50 > budget.max_cost:
+            raise BudgetExceededError(
+                "estimated cost", round(estimate.cost_p50, 4), budget.max_cost
+            )
+
     def _create_result(
         self,
         workflow: WorkflowDefinition,
@@ -395,11 +550,16 @@ class WorkflowRunner:
         workflow: WorkflowDefinition,
         context: WorkflowContext,
         result: WorkflowResult,
+        stored_metrics: Optional[Dict[str, Any]] = None,
     ):
-        """Write execution logs to file."""
-        import json
+        """
+        Write execution logs to file.
 
+        stored_metrics are the step metrics already in the metrics store
+        (restored on resume); only steps recorded since are appended.
+        """
         log_file = self.logs_dir / f"{workflow.name}-{context.run_id}.json"
+        context.logs.flush_spill()
 
         log_data = {
             "workflow": workflow.name,
@@ -412,37 +572,38 @@ class WorkflowRunner:
             "total_tokens": result.total_tokens,
             "total_cost": round(result.total_cost, 4),
             "error": result.error,
-            "variables": context.variables,
-            "step_results": context.step_results,
+            # Shallow copies: the payload is encoded later, on the writer thread
+            "variables": dict(context.variables),
+            "step_results": dict(context.step_results),
+            "steps": dict(context.step_metrics),
+            "metrics": {"checkpoint": dict(context.checkpoint_stats)},
             "logs": [log.to_dict() for log in context.logs],
+            "logs_spilled": context.logs.spilled,
         }
 
-        log_file.write_text(
-            json.dumps(log_data, indent=2, ensure_ascii=False, default=str)
-        )
-
-    def _estimate_step_tokens(self, step) -> int:
-        """Estimate tokens for a step."""
-        step_type = step.get_execution_type()
-
-        estimates = {
-            "bash": 100,
-            "command": 500,
-            "script": 200,
-            "prompt": 2000,
-            "agent": 5000,
-            "framework": 10000,
-            "output": 100,
-            "branch": 500,
+        stored_metrics = stored_metrics or {}
+        new_metrics = {
+            step: metrics for step, metrics in context.step_metrics.items()
+            if stored_metrics.get(step) is not metrics
         }
+        metrics_rows = step_rows(workflow.name, context.run_id, result.started_at, new_metrics)
 
-        return estimates.get(step_type, 1000)
+        summary = summarize_run(log_data)
 
-    def _estimate_cost(self, tokens: int) -> float:
-        """Estimate cost for tokens (using average model pricing)."""
-        # Average pricing between haiku/sonnet/opus
-        avg_cost_per_1m = 0.005  # ~$5 per 1M tokens average
-        return (tokens / 1_000_000) * avg_cost_per_1m
+        def on_log_written(_size: int):
+            # Indexed runs always have their log file on disk
+            try:
+                self.metrics_store.append(metrics_rows)
+            finally:
+                self.run_index.append(summary)
+
+        # Encoding and I/O happen on the background writer thread; step
+        # metrics and the index entry follow once the run log is on disk
+        get_writer().write(
+            log_file,
+            lambda: json.dumps(log_data, indent=2, ensure_ascii=False, default=str),
+            on_written=on_log_written,
+        )
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -0,0 +1,149 @@
+"""
+Workflow Engine - Live Streaming
+
+Change notifications for a running context and per-subscriber cursors
+that turn them into batched events (used by the API WebSocket).
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class EventChannel:
+    """
+    Async wake-up channel for one context.
+
+    publish() only bumps a version and wakes current waiters - nothing is
+    queued per subscriber, so publishing costs nothing without
+    subscribers and an idle subscriber is a single pending future. The
+    data itself is read from the context (see RunStream).
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.closed = False
+        self._waiters: List[asyncio.Future] = []
+
+    def publish(self):
+        """Signal a change (log entry, step or status)."""
+        self.version += 1
+        if self._waiters:
+            self._wake()
+
+    def close(self):
+        """Signal that no further changes will follow."""
+        self.closed = True
+        self.version += 1
+        self._wake()
+
+    async def wait(self, version: int, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the channel moves past `version` or is closed.
+
+        Returns False if the timeout expired first.
+        """
+        if self.version != version or self.closed:
+            return True
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if future in self._waiters:
+                self._waiters.remove(future)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._waiters)
+
+    def _wake(self):
+        waiters, self._waiters = self._waiters, []
+        for future in waiters:
+            # Publishers may run outside the loop thread (e.g. to_thread)
+            future.get_loop().call_soon_threadsafe(_resolve, future)
+
+
+class RunStream:
+    """
+    Cursor of one subscriber over a context's logs and progress.
+
+    next_batch() waits for a change, lets a short burst accumulate and
+    returns all new events at once. A slow client only falls behind in
+    the context's log ring buffer; entries that were evicted before it
+    caught up are reported as a single "gap" event.
+    """
+
+    BATCH_WINDOW_SECONDS = 0.05
+    MAX_BATCH = 200
+
+    def __init__(self, context, cursor: int = 0):
+        self.context = context
+        self.cursor = cursor
+        self._version = -1
+        self._step: Optional[tuple] = None
+
+    @property
+    def finished(self) -> bool:
+        """True once the run is over and every event has been delivered."""
+        channel = self.context.events
+        return channel.closed and self._version == channel.version
+
+    async def next_batch(self, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """Wait for and return the next events (None if the timeout expired)."""
+        channel = self.context.events
+        if not await channel.wait(self._version, timeout):
+            return None
+
+        if not channel.closed and self.BATCH_WINDOW_SECONDS:
+            await asyncio.sleep(self.BATCH_WINDOW_SECONDS)
+
+        version = channel.version
+        events, complete = self._collect()
+        # Leave the version stale if entries are left over, so the next
+        # call returns immediately
+        self._version = version if complete else -1
+        return events
+
+    def _collect(self):
+        context = self.context
+        events: List[Dict[str, Any]] = []
+
+        step = (context.current_step, context.current_step_name, context.status.value)
+        if step != self._step:
+            self._step = step
+            events.append({
+                "type": "step_update",
+                "step": context.current_step,
+                "step_name": context.current_step_name,
+                "status": context.status.value,
+                "tokens": context.token_usage,
+                "cost": context.cost,
+            })
+
+        entries = context.logs.since(self.cursor)
+        if entries and entries[0].seq > self.cursor:
+            events.append({"type": "gap", "missed": entries[0].seq - self.cursor})
+
+        complete = len(entries) <= self.MAX_BATCH
+        for entry in entries[:self.MAX_BATCH]:
+            events.append({
+                "type": "log",
+                "seq": entry.seq,
+                "level": entry.type.value,
+                "message": entry.message,
+                "step": entry.step,
+                "timestamp": entry.timestamp.isoformat(),
+            })
+        if entries:
+            self.cursor = entries[min(len(entries), self.MAX_BATCH) - 1].seq + 1
+
+        return events, complete
@@ -0,0 +1,346 @@
+"""
+Workflow Engine - Durable Trigger Queue
+
+SQLite-backed queue between trigger handlers and workflow runs with
+at-least-once delivery.
+"""
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+from workflows.engine.models import TriggerType
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS triggers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    workflow TEXT NOT NULL,
+    trigger_type TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    data TEXT NOT NULL,
+    idempotency_key TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    merged INTEGER NOT NULL DEFAULT 1,
+    enqueued_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS triggers_ready ON triggers (status, available_at, id);
+CREATE INDEX IF NOT EXISTS triggers_workflow ON triggers (workflow, status);
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL
+);
+"""
+
+# Row status
+PENDING = "pending"
+INFLIGHT = "inflight"
+DEAD = "dead"
+
+
+@dataclass
+class QueuedTrigger:
+    """A trigger event claimed from the queue."""
+    id: int
+    workflow_name: str
+    trigger_type: TriggerType
+    timestamp: datetime
+    data: Dict[str, Any]
+    attempts: int
+    enqueued_at: float
+    idempotency_key: Optional[str] = None
+
+
+def merge_trigger_data(previous: Dict[str, Any], new: Dict[str, Any], count: int) -> Dict[str, Any]:
+    """Fold the data of a coalesced trigger into a pending one (newest wins)."""
+    data = {**previous, **new}
+
+    if "file" in new:
+        files = previous.get("files") or ([previous["file"]] if "file" in previous else [])
+        if new["file"] not in files:
+            files = files + [new["file"]]
+        data["files"] = files
+
+    data["coalesced"] = count
+    return data
+
+
+class DurableTriggerQueue:
+    """
+    Persistent trigger queue.
+
+    Lifecycle of an item: pending → inflight (claim) → deleted (ack).
+    nack() puts it back with exponential backoff until max_attempts
+    claims have failed; then it is dead-lettered. Items still inflight
+    when the process died are redelivered by open().
+
+    Idempotency keys are remembered for KEY_RETENTION_SECONDS, so a
+    replayed cron occurrence or an unchanged file is only queued once.
+    """
+
+    DEFAULT_PATH = Path("workflows/.trigger-queue.db")
+    MAX_ATTEMPTS = 3
+    RETRY_BASE_SECONDS = 5.0
+    RETRY_MAX_SECONDS = 300.0
+    KEY_RETENTION_SECONDS = 7 * 24 * 3600
+
+    def __init__(
+        self,
+        path: Union[Path, str, None] = None,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.path = path if path is not None else self.DEFAULT_PATH
+        self.max_attempts = max_attempts
+        self._conn: Optional[sqlite3.Connection] = None
+        self.redelivered = 0
+
+    # ─────────────────────────────────────────────────────────────
+    # CONNECTION
+    # ─────────────────────────────────────────────────────────────
+
+    def open(self) -> int:
+        """Open the database and requeue items left inflight; return their count."""
+        if self._conn is not None:
+            return 0
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(str(self.path))
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Survives process crashes; only an OS crash can lose the last commits
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+        with conn:
+            cursor = conn.execute(
+                "UPDATE triggers SET status = ?, available_at = ? WHERE status = ?",
+                (PENDING, time.time(), INFLIGHT),
+            )
+            conn.execute(
+                "DELETE FROM idempotency_keys WHERE seen_at < ?",
+                (time.time() - self.KEY_RETENTION_SECONDS,),
+            )
+        self.redelivered = cursor.rowcount
+        return cursor.rowcount
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        return self._conn
+
+    # ─────────────────────────────────────────────────────────────
+    # PRODUCER
+    # ─────────────────────────────────────────────────────────────
+
+    def enqueue_many(self, events: Iterable[Any], coalesce: Optional[Set[str]] = None) -> Dict[str, int]:
+        """
+        Persist trigger events in one transaction.
+
+        Events are TriggerEvent-like (workflow_name, trigger_type,
+        timestamp, data, idempotency_key). Events for workflows in
+        `coalesce` are merged into a pending item of the same workflow
+        if one exists. Returns counts of queued, coalesced and duplicate
+        events.
+        """
+        coalesce = coalesce or set()
+        counts = {"queued": 0, "coalesced": 0, "duplicates": 0}
+        now = time.time()
+
+        with self.conn as conn:
+            for event in events:
+                key = getattr(event, "idempotency_key", None)
+                if key:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO idempotency_keys (key, seen_at) VALUES (?, ?)",
+                        (key, now),
+                    )
+                    if cursor.rowcount == 0:
+                        counts["duplicates"] += 1
+                        continue
+
+                if event.workflow_name in coalesce:
+                    row = conn.execute(
+                        "SELECT id, data, merged FROM triggers "
+                        "WHERE workflow = ? AND status = ? AND attempts = 0 "
+                        "ORDER BY id LIMIT 1",
+                        (event.workflow_name, PENDING),
+                    ).fetchone()
+                    if row is not None:
+                        merged = row["merged"] + 1
+                        data = merge_trigger_data(json.loads(row["data"]), event.data, merged)
+                        conn.execute(
+                            "UPDATE triggers SET data = ?, merged = ?, timestamp = ? WHERE id = ?",
+                            (self._dumps(data), merged, event.timestamp.isoformat(), row["id"]),
+                        )
+                        counts["coalesced"] += 1
+                        continue
+
+                conn.execute(
+                    "INSERT INTO triggers "
+                    "(workflow, trigger_type, timestamp, data, idempotency_key, enqueued_at, available_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        event.workflow_name,
+                        event.trigger_type.value,
+                        event.timestamp.isoformat(),
+                        self._dumps(event.data),
+                        key,
+                        now,
+                        now,
+                    ),
+                )
+                counts["queued"] += 1
+
+        return counts
+
+    # ─────────────────────────────────────────────────────────────
+    # CONSUMER
+    # ─────────────────────────────────────────────────────────────
+
+    def claim(self, exclude: Iterable[str] = ()) -> Optional[QueuedTrigger]:
+        """Mark the oldest ready item (not for an excluded workflow) inflight."""
+        exclude = list(exclude)
+        placeholders = ",".join("?" * len(exclude))
+        query = "SELECT * FROM triggers WHERE status = ? AND available_at <= ?"
+        if exclude:
+            query += f" AND workflow NOT IN ({placeholders})"
+        query += " ORDER BY id LIMIT 1"
+
+        with self.conn as conn:
+            row = conn.execute(query, (PENDING, time.time(), *exclude)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE triggers SET status = ?, attempts = attempts + 1 WHERE id = ?",
+                (INFLIGHT, row["id"]),
+            )
+
+        return QueuedTrigger(
+            id=row["id"],
+            workflow_name=row["workflow"],
+            trigger_type=TriggerType(row["trigger_type"]),
+            timestamp=datetime.fromisoformat(row["timestamp"]),
+            data=json.loads(row["data"]),
+            attempts=row["attempts"] + 1,
+            enqueued_at=row["enqueued_at"],
+            idempotency_key=row["idempotency_key"],
+        )
+
+    def ack(self, item_id: int):
+        """The run finished - remove the item."""
+        with self.conn as conn:
+            conn.execute("DELETE FROM triggers WHERE id = ?", (item_id,))
+
+    def nack(self, item_id: int, error: str = "") -> bool:
+        """
+        The run failed - retry with backoff or dead-letter it.
+
+        Returns True if the item was dead-lettered.
+        """
+        with self.conn as conn:
+            row = conn.execute("SELECT attempts FROM triggers WHERE id = ?", (item_id,)).fetchone()
+            if row is None:
+                return False
+
+            if row["attempts"] >= self.max_attempts:
+                conn.execute(
+                    "UPDATE triggers SET status = ?, last_error = ? WHERE id = ?",
+                    (DEAD, error, item_id),
+                )
+                return True
+
+            delay = min(self.RETRY_BASE_SECONDS * 2 ** (row["attempts"] - 1), self.RETRY_MAX_SECONDS)
+            conn.execute(
+                "UPDATE triggers SET status = ?, available_at = ?, last_error = ? WHERE id = ?",
+                (PENDING, time.time() + delay, error, item_id),
+            )
+            return False
+
+    def release(self, item_id: int):
+        """Return an inflight item without counting the attempt (e.g. on shutdown)."""
+        with self.conn as conn:
+            conn.execute(
+                "UPDATE triggers SET status = ?, attempts = MAX(attempts - 1, 0) "
+                "WHERE id = ? AND status = ?",
+                (PENDING, item_id, INFLIGHT),
+            )
+
+    def next_available_in(self) -> Optional[float]:
+        """Seconds until the next backed-off item becomes ready (None if none)."""
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT MIN(available_at) FROM triggers WHERE status = ? AND available_at > ?",
+            (PENDING, now),
+        ).fetchone()
+        if row[0] is None:
+            return None
+        return row[0] - now
+
+    # ─────────────────────────────────────────────────────────────
+    # DEAD LETTERS & STATS
+    # ─────────────────────────────────────────────────────────────
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """List dead-lettered items, newest first."""
+        rows = self.conn.execute(
+            "SELECT id, workflow, trigger_type, timestamp, data, attempts, last_error "
+            "FROM triggers WHERE status = ? ORDER BY id DESC LIMIT ?",
+            (DEAD, limit),
+        ).fetchall()
+        return [{**dict(row), "data": json.loads(row["data"])} for row in rows]
+
+    def retry_dead(self, item_id: Optional[int] = None) -> int:
+        """Requeue one (or all) dead-lettered items with a fresh attempt count."""
+        query = "UPDATE triggers SET status = ?, attempts = 0, available_at = ? WHERE status = ?"
+        params: List[Any] = [PENDING, time.time(), DEAD]
+        if item_id is not None:
+            query += " AND id = ?"
+            params.append(item_id)
+        with self.conn as conn:
+            return conn.execute(query, params).rowcount
+
+    def depth(self) -> Dict[str, Any]:
+        """Item counts by status and per workflow, plus the oldest pending age."""
+        conn = self.conn
+        by_status = {PENDING: 0, INFLIGHT: 0, DEAD: 0}
+        for status, count in conn.execute("SELECT status, COUNT(*) FROM triggers GROUP BY status"):
+            by_status[status] = count
+
+        workflows: Dict[str, Dict[str, int]] = {}
+        for workflow, status, count in conn.execute(
+            "SELECT workflow, status, COUNT(*) FROM triggers "
+            "WHERE status != ? GROUP BY workflow, status",
+            (DEAD,),
+        ):
+            workflows.setdefault(workflow, {PENDING: 0, INFLIGHT: 0})[status] = count
+
+        oldest = conn.execute(
+            "SELECT MIN(enqueued_at) FROM triggers WHERE status = ?", (PENDING,)
+        ).fetchone()[0]
+
+        return {
+            **by_status,
+            "workflows": workflows,
+            "oldest_pending_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+        }
+
+    @staticmethod
+    def _dumps(data: Dict[str, Any]) -> str:
+        return json.dumps(data, ensure_ascii=False, default=str)
@@ -5,16 +5,26 @@ Handles cron, file watch, and event-based workflow triggers.
 """
 
 import asyncio
+import heapq
 import json
+import logging
+import os
 import re
+import time
 from abc import ABC, abstractmethod
+from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
 
-from workflows.engine.models import TriggerConfig, TriggerType
+from workflows.engine.cron import CronExpression
+from workflows.engine.models import CatchUpPolicy, TriggerConfig, TriggerType
 from workflows.engine.parser import load_workflow, list_workflows
+from workflows.engine.persistence import get_writer
+from workflows.engine.trigger_queue import DurableTriggerQueue, QueuedTrigger
+from workflows.engine.watcher import GlobMatcher, InotifyBackend
+from workflows.engine.worker_pool import WorkerPool
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -28,6 +38,16 @@ class TriggerEvent:
     workflow_name: str
     timestamp: datetime
     data: Dict[str, Any] = field(default_factory=dict)
+    # Events with the same key are queued only once
+    idempotency_key: Optional[str] = None
+
+
+def trigger_variables(event: TriggerEvent) -> Dict[str, Any]:
+    """Workflow variables for a triggered run (trigger data plus metadata)."""
+    variables = event.data.copy()
+    variables["_trigger_type"] = event.trigger_type.value
+    variables["_trigger_time"] = event.timestamp.isoformat()
+    return variables
 
 
 class TriggerHandler(ABC):
@@ -61,6 +81,8 @@ class CronJob:
     next_run: Optional[datetime] = None
     last_run: Optional[datetime] = None
     enabled: bool = True
+    catch_up: CatchUpPolicy = CatchUpPolicy.SKIP
+    schedule: Optional[CronExpression] = None
 
 
 class CronScheduler(TriggerHandler):
@@ -71,17 +93,43 @@ class CronScheduler(TriggerHandler):
     - "0 9 * * 1" - Every Monday at 9:00
     - "0 8 * * *" - Every day at 8:00
     - "*/30 * * * *" - Every 30 minutes
+
+    Jobs sit in a min-heap ordered by next fire time. A single task
+    sleeps until the earliest one is due (or until a registration
+    changes the schedule), so jobs fire on time and scheduling is
+    O(log n).
+
+    The last fire time of every job is persisted; on startup, runs
+    missed during downtime are handled per the job's catch_up policy.
     """
 
+    STATE_FILE = Path("workflows/.cron-state.json")
+
+    # Occurrences older than this when they come due count as missed
+    CATCH_UP_GRACE = timedelta(seconds=60)
+
+    # Upper bound for replayed runs with catch_up: all
+    MAX_CATCH_UP_RUNS = 100
+
+    # Re-check the wall clock at least this often (suspend, clock changes)
+    MAX_SLEEP_SECONDS = 300
+
     def __init__(self, on_trigger: Callable[[TriggerEvent], None]):
         self.on_trigger = on_trigger
         self.jobs: Dict[str, CronJob] = {}
         self._running = False
         self._task: Optional[asyncio.Task] = None
 
+        # (next_run, sequence, workflow_name); stale entries are skipped
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._sequence = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._state: Optional[Dict[str, str]] = None
+
     async def start(self):
         """Start the cron scheduler."""
         self._running = True
+        self._wake = asyncio.Event()
         self._task = asyncio.create_task(self._run_loop())
 
     async def stop(self):
@@ -99,69 +147,124 @@ class CronScheduler(TriggerHandler):
         if config.type != TriggerType.CRON or not config.cron:
             return
 
+        schedule = CronExpression(config.cron)
         job = CronJob(
             workflow_name=workflow_name,
             cron_expression=config.cron,
+            catch_up=config.catch_up,
+            schedule=schedule,
         )
-        job.next_run = self._calculate_next_run(config.cron)
+
+        # Resume from the persisted last run so missed runs can be caught up
+        last_run = self._load_state().get(workflow_name)
+        if last_run:
+            job.last_run = datetime.fromisoformat(last_run)
+            job.next_run = schedule.next_after(job.last_run)
+        else:
+            job.next_run = schedule.next_after(datetime.now())
+
         self.jobs[workflow_name] = job
+        self._push(job)
+
+    def unregister(self, workflow_name: str):
+        """Remove a job (its heap entry is dropped lazily)."""
+        if self.jobs.pop(workflow_name, None) is not None and self._wake:
+            self._wake.set()
 
     async def _run_loop(self):
-        """Main scheduler loop."""
+        """Main scheduler loop: sleep until the earliest job is due."""
         while self._running:
             now = datetime.now()
 
-            for job in self.jobs.values():
-                if not job.enabled or not job.next_run:
-                    continue
-
-                if now >= job.next_run:
-                    # Trigger workflow
-                    event = TriggerEvent(
-                        trigger_type=TriggerType.CRON,
-                        workflow_name=job.workflow_name,
-                        timestamp=now,
-                        data={"cron": job.cron_expression},
-                    )
-                    self.on_trigger(event)
-
-                    # Update job
-                    job.last_run = now
-                    job.next_run = self._calculate_next_run(job.cron_expression)
-
-            # Sleep until next check
-            await asyncio.sleep(60)  # Check every minute
-
-    def _calculate_next_run(self, cron_expression: str) -> datetime:
-        """Calculate next run time from cron expression."""
-        try:
-            from croniter import croniter
-            return croniter(cron_expression, datetime.now()).get_next(datetime)
-        except ImportError:
-            # Fallback: simple parsing for common patterns
-            return self._simple_next_run(cron_expression)
-
-    def _simple_next_run(self, cron_expression: str) -> datetime:
-        """Simple next run calculation without croniter."""
-        parts = cron_expression.split()
-        if len(parts) != 5:
-            return datetime.now()
-
-        minute, hour, day, month, weekday = parts
-        now = datetime.now()
+            while self._heap and self._heap[0][0] <= now:
+                next_run, _, name = heapq.heappop(self._heap)
+                job = self.jobs.get(name)
+                if job is None or not job.enabled or job.next_run != next_run:
+                    continue  # Stale entry
+                self._fire(job, now)
+                self._push(job)
 
-        # Very basic: just add 1 day for daily schedules
-        next_run = now.replace(second=0, microsecond=0)
+            delay = self.MAX_SLEEP_SECONDS
+            if self._heap:
+                delay = min(delay, (self._heap[0][0] - datetime.now()).total_seconds())
 
-        if hour != "*":
-            next_run = next_run.replace(hour=int(hour))
-        if minute != "*":
-            next_run = next_run.replace(minute=int(minute))
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(delay, 0))
+            except asyncio.TimeoutError:
+                pass
 
-        if next_run <= now:
-            next_run = next_run.replace(day=next_run.day + 1)
+    def _push(self, job: CronJob):
+        """Add a job's next run to the heap and wake the loop if it is earlier."""
+        if job.next_run is None:
+            return
+        self._sequence += 1
+        is_earliest = not self._heap or job.next_run < self._heap[0][0]
+        heapq.heappush(self._heap, (job.next_run, self._sequence, job.workflow_name))
+        if is_earliest and self._wake:
+            self._wake.set()
+
+    def _fire(self, job: CronJob, now: datetime):
+        """Trigger all due occurrences of a job, applying its catch-up policy."""
+        on_time: List[datetime] = []
+        missed: List[datetime] = []
+
+        occurrence = job.next_run
+        while occurrence <= now:
+            if now - occurrence <= self.CATCH_UP_GRACE:
+                on_time.append(occurrence)
+            elif len(missed) < self.MAX_CATCH_UP_RUNS:
+                missed.append(occurrence)
+            else:
+                # Long downtime: drop the rest of the backlog
+                occurrence = job.schedule.next_after(now - self.CATCH_UP_GRACE)
+                continue
+            occurrence = job.schedule.next_after(occurrence)
+
+        job.next_run = occurrence
+
+        if job.catch_up == CatchUpPolicy.ALL:
+            replay = list(missed)
+        elif job.catch_up == CatchUpPolicy.ONCE and missed:
+            replay = [missed[-1]]
+        else:
+            replay = []
+
+        for scheduled, catch_up in [(t, True) for t in replay] + [(t, False) for t in on_time]:
+            self.on_trigger(TriggerEvent(
+                trigger_type=TriggerType.CRON,
+                workflow_name=job.workflow_name,
+                timestamp=now,
+                data={
+                    "cron": job.cron_expression,
+                    "scheduled_for": scheduled.isoformat(),
+                    "catch_up": catch_up,
+                    "missed_runs": len(missed) if catch_up else 0,
+                },
+                idempotency_key=f"cron:{job.workflow_name}:{scheduled.isoformat()}",
+            ))
+
+        job.last_run = on_time[-1] if on_time else (missed[-1] if missed else job.last_run)
+        self._save_state()
+
+    def _load_state(self) -> Dict[str, str]:
+        """Load persisted last-run times."""
+        if self._state is None:
+            self._state = {}
+            if self.STATE_FILE.exists():
+                try:
+                    self._state = json.loads(self.STATE_FILE.read_text())
+                except (OSError, json.JSONDecodeError):
+                    pass
+        return self._state
 
-        return next_run
+    def _save_state(self):
+        """Persist last-run times (off the event loop)."""
+        state = self._load_state()
+        for job in self.jobs.values():
+            if job.last_run:
+                state[job.workflow_name] = job.last_run.isoformat()
+        get_writer().write(self.STATE_FILE, json.dumps(state, indent=2))
 
     def get_schedule(self) -> List[Dict[str, Any]]:
         """Get current schedule."""
@@ -172,8 +275,9 @@ class CronScheduler(TriggerHandler):
                 "next_run": job.next_run.isoformat() if job.next_run else None,
                 "last_run": job.last_run.isoformat() if job.last_run else None,
                 "enabled": job.enabled,
+                "catch_up": job.catch_up.value,
             }
-            for job in self.jobs.values()
+            for job in sorted(self.jobs.values(), key=lambda j: j.next_run or datetime.max)
         ]
 
 
@@ -187,6 +291,7 @@ class WatchConfig:
     workflow_name: str
     pattern: str
     debounce_ms: int = 1000
+    matcher: Optional[GlobMatcher] = None
 
 
 class FileWatcher(TriggerHandler):
@@ -196,23 +301,78 @@ class FileWatcher(TriggerHandler):
     Supports glob patterns:
     - "_inbox/*" - Any file in _inbox
     - "ideas/**/*.md" - Any markdown in ideas tree
+
+    On Linux, changes arrive through inotify (recursive directory
+    watches, no work while idle); elsewhere the watcher falls back to
+    polling. Bursts of changes to the same file are coalesced: the
+    trigger fires once, debounce_ms after the last change.
+
+    With inotify, a pattern whose base directory does not exist yet (or
+    was deleted or moved away) is retried every POLL_INTERVAL_SECONDS;
+    once the directory appears it is watched and the matching files
+    already in it fire.
+
+    The trigger's "file" is spelled like the pattern: relative to the
+    working directory for relative patterns, absolute otherwise.
     """
 
+    POLL_INTERVAL_SECONDS = 2
+
     def __init__(self, on_trigger: Callable[[TriggerEvent], None]):
         self.on_trigger = on_trigger
         self.watches: Dict[str, WatchConfig] = {}
         self._running = False
         self._task: Optional[asyncio.Task] = None
-        self._last_changes: Dict[str, datetime] = {}
+        self._backend: Optional[InotifyBackend] = None
+        self._pending: Dict[str, asyncio.TimerHandle] = {}
+        # Watches waiting for their base directory (inotify only)
+        self._missing: Dict[str, WatchConfig] = {}
+        self._retry_task: Optional[asyncio.Task] = None
+
+    @property
+    def backend_name(self) -> str:
+        if not self._running:
+            return "stopped"
+        return "inotify" if self._backend else "polling"
 
     async def start(self):
         """Start the file watcher."""
         self._running = True
+
+        if InotifyBackend.available():
+            try:
+                self._backend = InotifyBackend(self._on_file_changed, self._on_dir_lost)
+                self._backend.start(asyncio.get_running_loop())
+                for watch in self.watches.values():
+                    self._watch(watch)
+                return
+            except OSError as e:
+                logging.warning(f"inotify unavailable ({e}), falling back to polling")
+                self._backend = None
+
         self._task = asyncio.create_task(self._watch_loop())
 
     async def stop(self):
         """Stop the file watcher."""
         self._running = False
+
+        for handle in self._pending.values():
+            handle.cancel()
+        self._pending.clear()
+        self._missing.clear()
+
+        if self._retry_task:
+            self._retry_task.cancel()
+            try:
+                await self._retry_task
+            except asyncio.CancelledError:
+                pass
+            self._retry_task = None
+
+        if self._backend:
+            self._backend.stop()
+            self._backend = None
+
         if self._task:
             self._task.cancel()
             try:
@@ -225,15 +385,72 @@ class FileWatcher(TriggerHandler):
         if config.type != TriggerType.WATCH or not config.watch:
             return
 
-        self.watches[workflow_name] = WatchConfig(
+        watch = WatchConfig(
             workflow_name=workflow_name,
             pattern=config.watch,
+            matcher=GlobMatcher(config.watch),
         )
+        self.watches[workflow_name] = watch
+
+        if self._backend:
+            self._watch(watch)
+
+    def _watch(self, watch: WatchConfig):
+        """Add inotify watches for a pattern's base directory."""
+        base = watch.matcher.base
+        if not base.is_dir():
+            logging.warning(
+                f"Watch base {base} for '{watch.workflow_name}' does not exist; "
+                "watching it once it is created"
+            )
+            self._missing[watch.workflow_name] = watch
+            if self._retry_task is None or self._retry_task.done():
+                self._retry_task = asyncio.create_task(self._retry_missing())
+            return
+        self._missing.pop(watch.workflow_name, None)
+        self._backend.watch(base, recursive=watch.matcher.recursive)
+
+    async def _retry_missing(self):
+        """Add the watches of base directories created since they were registered."""
+        while self._running and self._missing:
+            await asyncio.sleep(self.POLL_INTERVAL_SECONDS)
+            if not self._backend:
+                return
+
+            for watch in list(self._missing.values()):
+                base = watch.matcher.base
+                if not base.is_dir():
+                    continue
+                self._watch(watch)
+
+                # Files created before the watch existed
+                if watch.matcher.recursive:
+                    files = (Path(d) / f for d, _, names in os.walk(base) for f in names)
+                else:
+                    files = (p for p in base.iterdir() if p.is_file())
+                for file_path in files:
+                    if watch.matcher.matches(file_path):
+                        self._schedule(watch, file_path)
+
+    def _on_file_changed(self, file_path: Path):
+        """Dispatch a changed file to all watches whose pattern matches."""
+        for watch in self.watches.values():
+            if watch.matcher.matches(file_path):
+                self._schedule(watch, file_path)
+
+    def _on_dir_lost(self, directory: Path):
+        """Re-queue the watches whose base directory lost its inotify watch."""
+        if not self._running:
+            return
+        for watch in self.watches.values():
+            if watch.matcher.base.resolve() == directory:
+                self._watch(watch)
 
     async def _watch_loop(self):
-        """Main watcher loop using polling."""
-        # Track file modification times
+        """Fallback watcher loop using polling."""
+        # Track file modification times; the first scan is the baseline
         file_mtimes: Dict[str, float] = {}
+        initial_scan = True
 
         while self._running:
             for watch in self.watches.values():
@@ -254,40 +471,56 @@ class FileWatcher(TriggerHandler):
                         mtime = file_path.stat().st_mtime
                         path_key = str(file_path)
 
-                        if path_key in file_mtimes:
-                            if mtime > file_mtimes[path_key]:
-                                # File changed
-                                await self._handle_change(watch, file_path)
+                        previous = file_mtimes.get(path_key)
+                        if (previous is None and not initial_scan) or (
+                            previous is not None and mtime > previous
+                        ):
+                            # File created or changed
+                            self._schedule(watch, file_path)
 
                         file_mtimes[path_key] = mtime
 
                 except Exception:
                     pass
 
-            await asyncio.sleep(2)  # Poll every 2 seconds
+            initial_scan = False
+            await asyncio.sleep(self.POLL_INTERVAL_SECONDS)
 
-    async def _handle_change(self, watch: WatchConfig, file_path: Path):
-        """Handle a file change."""
-        # Debounce
-        now = datetime.now()
+    def _schedule(self, watch: WatchConfig, file_path: Path):
+        """Debounce: (re)start the timer for this workflow and file."""
+        file_path = Path(watch.matcher.display(file_path))
         key = f"{watch.workflow_name}:{file_path}"
 
-        if key in self._last_changes:
-            elapsed = (now - self._last_changes[key]).total_seconds() * 1000
-            if elapsed < watch.debounce_ms:
-                return
+        handle = self._pending.pop(key, None)
+        if handle:
+            handle.cancel()
+
+        loop = asyncio.get_running_loop()
+        self._pending[key] = loop.call_later(
+            watch.debounce_ms / 1000,
+            self._handle_change,
+            watch,
+            file_path,
+        )
+
+    def _handle_change(self, watch: WatchConfig, file_path: Path):
+        """Fire the trigger once the file has settled."""
+        self._pending.pop(f"{watch.workflow_name}:{file_path}", None)
 
-        self._last_changes[key] = now
+        try:
+            version = file_path.stat().st_mtime_ns
+        except OSError:
+            version = time.time_ns()
 
-        # Trigger
         event = TriggerEvent(
             trigger_type=TriggerType.WATCH,
             workflow_name=watch.workflow_name,
-            timestamp=now,
+            timestamp=datetime.now(),
             data={
                 "file": str(file_path),
                 "pattern": watch.pattern,
             },
+            idempotency_key=f"watch:{watch.workflow_name}:{file_path}:{version}",
         )
         self.on_trigger(event)
 
@@ -303,6 +536,38 @@ class EventSubscription:
     event_pattern: str
 
 
+class _SegmentNode:
+    """Trie node for dot-separated event patterns."""
+
+    __slots__ = ("children", "wildcards", "star", "globstar", "subscriptions")
+
+    def __init__(self):
+        self.children: Dict[str, "_SegmentNode"] = {}
+        # Segments with embedded wildcards, e.g. "file_*"
+        self.wildcards: List[Tuple["re.Pattern[str]", "_SegmentNode"]] = []
+        self.star: Optional["_SegmentNode"] = None
+        self.globstar: Optional["_SegmentNode"] = None
+        self.subscriptions: List[EventSubscription] = []
+
+    def child(self, segment: str) -> "_SegmentNode":
+        """Get or create the child node for a pattern segment."""
+        if segment == "*":
+            self.star = self.star or _SegmentNode()
+            return self.star
+        if segment == "**":
+            self.globstar = self.globstar or _SegmentNode()
+            return self.globstar
+        if "*" in segment:
+            regex = re.compile(re.escape(segment).replace(r"\*", ".*") + r"\Z")
+            for existing, node in self.wildcards:
+                if existing.pattern == regex.pattern:
+                    return node
+            node = _SegmentNode()
+            self.wildcards.append((regex, node))
+            return node
+        return self.children.setdefault(segment, _SegmentNode())
+
+
 class EventBus(TriggerHandler):
     """
     Event-based workflow triggering.
@@ -311,12 +576,26 @@ class EventBus(TriggerHandler):
     - "idea.created" - New idea created
     - "knowledge.updated" - KB updated
     - "workflow.completed" - Workflow finished
+
+    Patterns are dot-separated segments compiled into a trie:
+    - "idea.created"    - exact
+    - "idea.*"          - exactly one segment ("idea.created")
+    - "knowledge.**"    - zero or more segments ("knowledge.file.changed")
+    - "file_*"          - wildcard within a segment
+
+    emit() walks the trie in O(depth); results are memoized per event
+    name until the next registration. A workflow fires at most once per
+    event, even if several of its patterns match.
     """
 
+    MATCH_CACHE_SIZE = 1024
+
     def __init__(self, on_trigger: Callable[[TriggerEvent], None]):
         self.on_trigger = on_trigger
         self.subscriptions: Dict[str, List[EventSubscription]] = {}
         self._running = False
+        self._root = _SegmentNode()
+        self._match_cache: Dict[str, List[EventSubscription]] = {}
 
     async def start(self):
         """Start the event bus."""
@@ -335,42 +614,91 @@ class EventBus(TriggerHandler):
         if event_pattern not in self.subscriptions:
             self.subscriptions[event_pattern] = []
 
-        self.subscriptions[event_pattern].append(EventSubscription(
+        subscription = EventSubscription(
             workflow_name=workflow_name,
             event_pattern=event_pattern,
-        ))
+        )
+        self.subscriptions[event_pattern].append(subscription)
+
+        node = self._root
+        for segment in event_pattern.split("."):
+            node = node.child(segment)
+        node.subscriptions.append(subscription)
+
+        self._match_cache.clear()
+
+    def match(self, event_name: str) -> List[EventSubscription]:
+        """Return the subscriptions matching an event (one per workflow)."""
+        cached = self._match_cache.get(event_name)
+        if cached is not None:
+            return cached
+
+        segments = event_name.split(".")
+        count = len(segments)
+        matched: Dict[str, EventSubscription] = {}
+
+        stack = [(self._root, 0)]
+        seen = set()
+        while stack:
+            node, index = stack.pop()
+            key = (id(node), index)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            # "**" consumes zero or more of the remaining segments
+            if node.globstar is not None:
+                for end in range(index, count + 1):
+                    stack.append((node.globstar, end))
+
+            if index == count:
+                for sub in node.subscriptions:
+                    matched.setdefault(sub.workflow_name, sub)
+                continue
 
-    def emit(self, event_name: str, data: Optional[Dict[str, Any]] = None):
-        """Emit an event."""
+            segment = segments[index]
+            child = node.children.get(segment)
+            if child is not None:
+                stack.append((child, index + 1))
+            if node.star is not None:
+                stack.append((node.star, index + 1))
+            for regex, wildcard_node in node.wildcards:
+                if regex.match(segment):
+                    stack.append((wildcard_node, index + 1))
+
+        result = list(matched.values())
+        if len(self._match_cache) >= self.MATCH_CACHE_SIZE:
+            self._match_cache.clear()
+        self._match_cache[event_name] = result
+        return result
+
+    def emit(
+        self,
+        event_name: str,
+        data: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+    ):
+        """Emit an event (events repeating an idempotency_key are dropped)."""
         if not self._running:
             return
 
         now = datetime.now()
-
-        # Check exact matches
-        if event_name in self.subscriptions:
-            for sub in self.subscriptions[event_name]:
-                event = TriggerEvent(
-                    trigger_type=TriggerType.EVENT,
-                    workflow_name=sub.workflow_name,
-                    timestamp=now,
-                    data={"event": event_name, **(data or {})},
-                )
-                self.on_trigger(event)
-
-        # Check wildcard matches
-        for pattern, subs in self.subscriptions.items():
-            if "*" in pattern:
-                regex = pattern.replace(".", r"\.").replace("*", ".*")
-                if re.match(regex, event_name):
-                    for sub in subs:
-                        event = TriggerEvent(
-                            trigger_type=TriggerType.EVENT,
-                            workflow_name=sub.workflow_name,
-                            timestamp=now,
-                            data={"event": event_name, **(data or {})},
-                        )
-                        self.on_trigger(event)
+        for sub in self.match(event_name):
+            event = TriggerEvent(
+                trigger_type=TriggerType.EVENT,
+                workflow_name=sub.workflow_name,
+                timestamp=now,
+                data={"event": event_name, **(data or {})},
+                idempotency_key=(
+                    f"event:{sub.workflow_name}:{idempotency_key}" if idempotency_key else None
+                ),
+            )
+            self.on_trigger(event)
+
+    def emit_many(self, events: Iterable[Tuple[str, Optional[Dict[str, Any]]]]):
+        """Emit a batch of (event_name, data) pairs."""
+        for event_name, data in events:
+            self.emit(event_name, data)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -381,6 +709,18 @@ class TriggerManager:
     """
     Central manager for all trigger types.
 
+    Trigger events are persisted in a DurableTriggerQueue before they
+    run, so triggers queued when the daemon stops or crashes are run
+    after the restart (at-least-once). Runs execute concurrently on up to
+    `max_workers` slots; each workflow is additionally limited to its
+    trigger's max_concurrency. With coalesce enabled, triggers that
+    arrive while a run of the workflow is still pending are merged into
+    that run.
+
+    A queue item is acked when the handler returns (a failed workflow is
+    logged by the runner like any other run). Handler exceptions are
+    retried with backoff and dead-lettered after max_attempts.
+
     Usage:
         manager = TriggerManager()
         manager.register_all_workflows()
@@ -390,9 +730,20 @@ class TriggerManager:
         manager.event_bus.emit("idea.created", {"id": "idea-2024-001"})
     """
 
-    def __init__(self, on_trigger: Optional[Callable[[TriggerEvent], None]] = None):
+    DEFAULT_MAX_WORKERS = 4
+    # Wait times kept for the status metrics
+    WAIT_SAMPLES = 200
+
+    def __init__(
+        self,
+        on_trigger: Optional[Callable[[TriggerEvent], None]] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        queue: Optional[DurableTriggerQueue] = None,
+    ):
         self._trigger_queue: asyncio.Queue = asyncio.Queue()
         self._on_trigger = on_trigger or self._default_handler
+        self.max_workers = max(1, max_workers)
+        self.queue = queue or DurableTriggerQueue()
 
         # Initialize handlers
         self.cron_scheduler = CronScheduler(self._handle_trigger)
@@ -402,6 +753,24 @@ class TriggerManager:
         self._running = False
         self._processor_task: Optional[asyncio.Task] = None
 
+        # Run slots
+        self._configs: Dict[str, TriggerConfig] = {}
+        self._active: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._retry_handle: Optional[asyncio.TimerHandle] = None
+
+        # Metrics
+        self._wait_times: Deque[float] = deque(maxlen=self.WAIT_SAMPLES)
+        self._counters = {
+            "received": 0,
+            "duplicates": 0,
+            "coalesced": 0,
+            "redelivered": 0,
+            "completed": 0,
+            "failed": 0,
+            "dead_lettered": 0,
+        }
+
     def _handle_trigger(self, event: TriggerEvent):
         """Handle a trigger event."""
         self._trigger_queue.put_nowait(event)
@@ -411,17 +780,12 @@ class TriggerManager:
         from workflows.engine import WorkflowRunner
 
         runner = WorkflowRunner()
-
-        # Add trigger data as variables
-        variables = event.data.copy()
-        variables["_trigger_type"] = event.trigger_type.value
-        variables["_trigger_time"] = event.timestamp.isoformat()
-
-        await runner.run(event.workflow_name, variables=variables)
+        await runner.run(event.workflow_name, variables=trigger_variables(event))
 
     async def start(self):
-        """Start all trigger handlers."""
+        """Start all trigger handlers and resume queued triggers."""
         self._running = True
+        self._counters["redelivered"] += self.queue.open()
 
         # Start handlers
         await self.cron_scheduler.start()
@@ -430,40 +794,159 @@ class TriggerManager:
 
         # Start processor
         self._processor_task = asyncio.create_task(self._process_triggers())
+        self._dispatch()
 
-    async def stop(self):
-        """Stop all trigger handlers."""
+    async def stop(self, drain_timeout: float = 0.0):
+        """
+        Stop all trigger handlers.
+
+        Running workflows get up to drain_timeout seconds to finish;
+        runs interrupted after that stay queued for the next start.
+        """
         self._running = False
 
         await self.cron_scheduler.stop()
         await self.file_watcher.stop()
         await self.event_bus.stop()
 
+        if self._tasks and drain_timeout > 0:
+            await asyncio.wait(list(self._tasks), timeout=drain_timeout)
+
+        if self._retry_handle:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+
+        tasks = list(self._tasks)
         if self._processor_task:
-            self._processor_task.cancel()
-            try:
-                await self._processor_task
-            except asyncio.CancelledError:
-                pass
+            tasks.append(self._processor_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Persist whatever arrived but was not processed yet
+        self._persist(self._drain_intake())
+        self.queue.close()
 
     async def _process_triggers(self):
-        """Process trigger events from queue."""
+        """Persist trigger events and hand them to run slots."""
         while self._running:
-            try:
-                event = await asyncio.wait_for(
-                    self._trigger_queue.get(),
-                    timeout=1.0
-                )
-                await self._on_trigger(event)
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                # Log error but continue
-                print(f"Trigger processing error: {e}")
+            event = await self._trigger_queue.get()
+            # Take everything that arrived in the same burst in one transaction
+            self._persist([event] + self._drain_intake())
+            self._dispatch()
+
+    def _drain_intake(self) -> List[TriggerEvent]:
+        events = []
+        while not self._trigger_queue.empty():
+            events.append(self._trigger_queue.get_nowait())
+        return events
+
+    def _persist(self, events: List[TriggerEvent]):
+        if not events:
+            return
+        coalesce = {name for name, config in self._configs.items() if config.coalesce}
+        counts = self.queue.enqueue_many(events, coalesce=coalesce)
+        self._counters["received"] += len(events)
+        self._counters["duplicates"] += counts["duplicates"]
+        self._counters["coalesced"] += counts["coalesced"]
+
+    # ─────────────────────────────────────────────────────────────
+    # RUN SLOTS
+    # ─────────────────────────────────────────────────────────────
+
+    def _config_for(self, workflow_name: str) -> TriggerConfig:
+        config = self._configs.get(workflow_name)
+        if config is None:
+            # Triggered but never registered (e.g. emitted manually)
+            config = self._configs[workflow_name] = TriggerConfig(type=TriggerType.MANUAL)
+        return config
+
+    def _dispatch(self):
+        """Start queued runs while slots and per-workflow limits allow."""
+        while self._running and len(self._tasks) < self.max_workers:
+            saturated = [
+                name for name, count in self._active.items()
+                if count >= self._config_for(name).max_concurrency
+            ]
+            item = self.queue.claim(exclude=saturated)
+            if item is None:
+                break
+
+            name = item.workflow_name
+            self._active[name] = self._active.get(name, 0) + 1
+            self._wait_times.append(max(0.0, time.time() - item.enqueued_at))
+
+            task = asyncio.create_task(self._run(item))
+            self._tasks.add(task)
+
+        self._schedule_retry()
+
+    def _schedule_retry(self):
+        """Wake up when the next backed-off item becomes ready."""
+        if self._retry_handle:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+
+        delay = self.queue.next_available_in() if self._running else None
+        if delay is not None:
+            self._retry_handle = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def _run(self, item: QueuedTrigger):
+        name = item.workflow_name
+        event = TriggerEvent(
+            trigger_type=item.trigger_type,
+            workflow_name=name,
+            timestamp=item.timestamp,
+            data=item.data,
+            idempotency_key=item.idempotency_key,
+        )
+        try:
+            await self._on_trigger(event)
+            self.queue.ack(item.id)
+            self._counters["completed"] += 1
+        except asyncio.CancelledError:
+            self.queue.release(item.id)
+            raise
+        except Exception as e:
+            # Log error but continue
+            self._counters["failed"] += 1
+            if self.queue.nack(item.id, error=str(e)):
+                self._counters["dead_lettered"] += 1
+                print(f"Trigger for {name} dead-lettered after {item.attempts} attempts: {e}")
+            else:
+                print(f"Trigger processing error (attempt {item.attempts}): {e}")
+        finally:
+            self._active[name] -= 1
+            if not self._active[name]:
+                del self._active[name]
+            self._tasks.discard(asyncio.current_task())
+            self._dispatch()
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Queue depth, slot usage and wait-time metrics."""
+        waits = sorted(self._wait_times)
+        depth = self.queue.depth()
+
+        return {
+            "max_workers": self.max_workers,
+            "running": len(self._tasks),
+            "queue_depth": depth["pending"] + self._trigger_queue.qsize(),
+            "dead_letters": depth["dead"],
+            "oldest_pending_seconds": depth["oldest_pending_seconds"],
+            "wait_seconds": {
+                "samples": len(waits),
+                "avg": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else 0.0,
+                "max": round(waits[-1], 3) if waits else 0.0,
+            },
+            "workflows": depth["workflows"],
+            **self._counters,
+        }
 
     def register_workflow(self, workflow_name: str):
         """Register a single workflow's triggers."""
         workflow = load_workflow(workflow_name)
+        self._configs[workflow_name] = workflow.trigger
 
         if workflow.trigger.type == TriggerType.CRON:
             self.cron_scheduler.register(workflow_name, workflow.trigger)
@@ -486,10 +969,12 @@ class TriggerManager:
             "running": self._running,
             "cron_jobs": len(self.cron_scheduler.jobs),
             "file_watches": len(self.file_watcher.watches),
+            "file_watch_backend": self.file_watcher.backend_name,
             "event_subscriptions": sum(
                 len(subs) for subs in self.event_bus.subscriptions.values()
             ),
             "schedule": self.cron_scheduler.get_schedule(),
+            "queue": self.get_queue_stats(),
         }
 
 
@@ -501,8 +986,13 @@ class WorkflowDaemon:
     """
     Background daemon for running scheduled workflows.
 
+    With workers > 0 the daemon is a supervisor: runs are dispatched to
+    a WorkerPool of that many processes instead of running on the
+    daemon's own event loop. On stop, running workflows get
+    drain_timeout seconds to finish.
+
     Usage:
-        daemon = WorkflowDaemon()
+        daemon = WorkflowDaemon(workers=4)
         await daemon.start()
 
         # In another process/terminal:
@@ -512,9 +1002,21 @@ class WorkflowDaemon:
     PID_FILE = Path("workflows/.daemon.pid")
     STATUS_FILE = Path("workflows/.daemon.status")
 
-    def __init__(self):
-        self.trigger_manager = TriggerManager()
+    DRAIN_TIMEOUT_SECONDS = 120.0
+
+    def __init__(self, workers: int = 0, drain_timeout: float = DRAIN_TIMEOUT_SECONDS):
+        self.pool = WorkerPool(size=workers) if workers > 0 else None
+        self.drain_timeout = drain_timeout
+        self.trigger_manager = TriggerManager(
+            on_trigger=self._run_in_pool if self.pool else None,
+            max_workers=workers or TriggerManager.DEFAULT_MAX_WORKERS,
+        )
         self._running = False
+        self._stopped = False
+
+    async def _run_in_pool(self, event: TriggerEvent):
+        """Trigger handler for supervisor mode."""
+        await self.pool.run(event.workflow_name, trigger_variables(event))
 
     async def start(self):
         """Start the daemon."""
@@ -528,7 +1030,9 @@ class WorkflowDaemon:
         # Register workflows
         self.trigger_manager.register_all_workflows()
 
-        # Start trigger manager
+        # Start workers, then the trigger manager
+        if self.pool:
+            await self.pool.start()
         await self.trigger_manager.start()
 
         # Keep running
@@ -537,13 +1041,25 @@ class WorkflowDaemon:
                 self._update_status("running")
                 await asyncio.sleep(60)
         finally:
-            await self.trigger_manager.stop()
+            await self._shutdown()
             self._cleanup()
 
     async def stop(self):
-        """Stop the daemon."""
+        """Stop the daemon, draining running workflows."""
         self._running = False
-        await self.trigger_manager.stop()
+        await self._shutdown()
+
+    async def _shutdown(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        if self.pool:
+            # Runs cancelled after the drain must not respawn workers
+            self.pool.close()
+        await self.trigger_manager.stop(drain_timeout=self.drain_timeout)
+        if self.pool:
+            # Runs were drained above; only the processes remain
+            await self.pool.stop(drain_timeout=0)
 
     def _update_status(self, status: str):
         """Update status file."""
@@ -552,6 +1068,8 @@ class WorkflowDaemon:
             "timestamp": datetime.now().isoformat(),
             **self.trigger_manager.get_status(),
         }
+        if self.pool:
+            status_data["workers"] = self.pool.get_stats()
         self.STATUS_FILE.write_text(json.dumps(status_data, indent=2))
 
     def _cleanup(self):
@@ -588,9 +1106,9 @@ class WorkflowDaemon:
 # CONVENIENCE FUNCTIONS
 # ═══════════════════════════════════════════════════════════════
 
-async def run_daemon():
-    """Start the workflow daemon."""
-    daemon = WorkflowDaemon()
+async def run_daemon(workers: int = 0):
+    """Start the workflow daemon (workers > 0: run workflows in worker processes)."""
+    daemon = WorkflowDaemon(workers=workers)
     await daemon.start()
 
 
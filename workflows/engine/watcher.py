@@ -0,0 +1,282 @@
+"""
+Workflow Engine - File Watching
+
+Glob compilation and a Linux inotify backend (via ctypes) for FileWatcher.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import struct
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+
+
+# ═══════════════════════════════════════════════════════════════
+# GLOB MATCHING
+# ═══════════════════════════════════════════════════════════════
+
+GLOB_CHARS = set("*?[")
+
+
+def compile_glob(pattern: str) -> "re.Pattern[str]":
+    """
+    Compile a glob pattern to a regex over '/'-separated paths.
+
+    - "**" matches zero or more directories
+    - "*" and "?" never cross a '/'
+    - "[...]" character classes are passed through
+    """
+    regex = ""
+    segments = pattern.split("/")
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+        if segment == "**":
+            regex += ".*" if last else "(?:[^/]+/)*"
+            continue
+
+        position = 0
+        while position < len(segment):
+            char = segment[position]
+            if char == "*":
+                regex += "[^/]*"
+            elif char == "?":
+                regex += "[^/]"
+            elif char == "[":
+                end = segment.find("]", position + 1)
+                if end == -1:
+                    regex += re.escape(char)
+                else:
+                    body = segment[position + 1:end]
+                    if body.startswith("!"):
+                        body = "^" + body[1:]
+                    regex += f"[{body}]"
+                    position = end
+            else:
+                regex += re.escape(char)
+            position += 1
+
+        if not last:
+            regex += "/"
+
+    return re.compile(regex + r"\Z")
+
+
+class GlobMatcher:
+    """
+    A watch pattern resolved against a root directory.
+
+    base is the deepest directory without wildcards; recursive is True
+    if matches can occur below its direct children.
+    """
+
+    def __init__(self, pattern: str, root: Optional[Path] = None):
+        self.pattern = pattern
+        path = Path(pattern)
+
+        self.absolute = path.is_absolute()
+        if self.absolute:
+            self.root = Path(path.anchor)
+            relative = path.relative_to(path.anchor).as_posix()
+        else:
+            self.root = (root or Path.cwd()).resolve()
+            relative = path.as_posix()
+
+        segments = relative.split("/")
+        static = []
+        for segment in segments[:-1]:
+            if GLOB_CHARS & set(segment):
+                break
+            static.append(segment)
+
+        self.base = self.root.joinpath(*static) if static else self.root
+        wildcard_dirs = segments[len(static):-1]
+        self.recursive = bool(wildcard_dirs) or "**" in segments
+        self.regex = compile_glob(relative)
+
+    def matches(self, path: Path) -> bool:
+        """Check an absolute path against the pattern."""
+        try:
+            relative = path.relative_to(self.root).as_posix()
+        except ValueError:
+            return False
+        return self.regex.match(relative) is not None
+
+    def display(self, path: Path) -> str:
+        """Spell a matched path like the pattern: relative to root unless absolute."""
+        if self.absolute or not path.is_absolute():
+            return str(path)
+        try:
+            return str(path.relative_to(self.root))
+        except ValueError:
+            return str(path)
+
+
+# ═══════════════════════════════════════════════════════════════
+# INOTIFY BACKEND
+# ═══════════════════════════════════════════════════════════════
+
+# From <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """
+    Recursive directory watches on a single inotify descriptor.
+
+    The descriptor is registered with the event loop (add_reader), so
+    nothing runs while the tree is idle. on_change receives the absolute
+    path of every file written, created or moved into a watched tree.
+    on_lost receives a watched directory that was deleted or moved away;
+    its watch is gone and has to be added again once it exists.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[Path], None],
+        on_lost: Optional[Callable[[Path], None]] = None,
+    ):
+        self.on_change = on_change
+        self.on_lost = on_lost
+        self._libc = None
+        self._fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._watches: Dict[int, Path] = {}
+        self._paths: Dict[Path, int] = {}
+        # Directories whose whole subtree is watched
+        self._recursive: Set[Path] = set()
+
+    @staticmethod
+    def available() -> bool:
+        """Check whether inotify can be used on this platform."""
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            return hasattr(libc, "inotify_init1")
+        except OSError:
+            return False
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Open the inotify descriptor and register it with the loop."""
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self._fd = fd
+        self._loop = loop
+        loop.add_reader(fd, self._read_events)
+
+    def stop(self):
+        """Unregister and close the descriptor."""
+        if self._fd is None:
+            return
+        if self._loop:
+            self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        self._watches.clear()
+        self._paths.clear()
+        self._recursive.clear()
+
+    def watch(self, directory: Path, recursive: bool):
+        """Watch a directory (and, if recursive, every directory below it)."""
+        directory = directory.resolve()
+        if recursive:
+            self._recursive.add(directory)
+            for current, _, _ in os.walk(directory):
+                self._add_watch(Path(current))
+        else:
+            self._add_watch(directory)
+
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    def _add_watch(self, directory: Path):
+        if directory in self._paths or self._fd is None:
+            return
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(str(directory)), WATCH_MASK
+        )
+        if wd < 0:
+            errno = ctypes.get_errno()
+            logging.warning(f"inotify watch on {directory} failed: {os.strerror(errno)}")
+            return
+        self._watches[wd] = directory
+        self._paths[directory] = wd
+
+    def _in_recursive_tree(self, directory: Path) -> bool:
+        return any(directory == root or root in directory.parents for root in self._recursive)
+
+    def _read_events(self):
+        """Drain and dispatch all pending events (called by the loop)."""
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logging.warning(f"inotify read failed: {e}")
+            return
+
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                logging.warning("inotify queue overflow - some file events were dropped")
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+
+            if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                self._watches.pop(wd, None)
+                self._paths.pop(directory, None)
+                if self.on_lost:
+                    self.on_lost(directory)
+                continue
+
+            path = directory / os.fsdecode(name)
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and self._in_recursive_tree(directory):
+                    # Watch the new directory and report files that were
+                    # created before the watch existed
+                    self._add_watch(path)
+                    for current, _, filenames in os.walk(path):
+                        self._add_watch(Path(current))
+                        for filename in filenames:
+                            self.on_change(Path(current) / filename)
+                continue
+
+            if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                self.on_change(path)
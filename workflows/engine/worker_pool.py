@@ -0,0 +1,405 @@
+"""
+Workflow Engine - Worker Pool
+
+Runs workflows in separate worker processes so CPU-bound steps of
+concurrent runs use more than one core.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from workflows.engine.exceptions import WorkerError
+
+
+def _rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak, not current - still good enough to decide on recycling
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return None
+
+
+# ═══════════════════════════════════════════════════════════════
+# WORKER PROCESS
+# ═══════════════════════════════════════════════════════════════
+
+def _worker_main(conn: Connection):
+    """
+    Worker process entry point.
+
+    Messages (tuples) from the supervisor:
+        ("run", job_id, workflow_name, variables)
+        ("ping", None)
+        ("stop", None)
+
+    Replies: ("result", job_id, summary, rss), ("error", job_id,
+    message, rss) and ("pong", None, None, rss).
+    """
+    # Ctrl-C goes to the whole process group; the supervisor drains us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from workflows.engine.persistence import get_writer
+    from workflows.engine.runner import WorkflowRunner
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        while True:
+            try:
+                kind, job_id, *payload = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            if kind == "stop":
+                break
+            if kind == "ping":
+                conn.send(("pong", None, None, _rss_mb()))
+                continue
+
+            workflow_name, variables = payload
+            try:
+                result = loop.run_until_complete(
+                    WorkflowRunner().run(workflow_name, variables=variables)
+                )
+                summary = {
+                    "run_id": result.run_id,
+                    "status": result.status.value,
+                    "duration_seconds": result.duration_seconds,
+                    "total_cost": result.total_cost,
+                    "error": result.error,
+                }
+                conn.send(("result", job_id, summary, _rss_mb()))
+            except Exception as e:
+                conn.send(("error", job_id, f"{type(e).__name__}: {e}", _rss_mb()))
+    finally:
+        get_writer().flush(timeout=10)
+        loop.close()
+        conn.close()
+
+
+# ═══════════════════════════════════════════════════════════════
+# SUPERVISOR
+# ═══════════════════════════════════════════════════════════════
+
+class _Worker:
+    """Supervisor-side handle of one worker process."""
+
+    def __init__(self, worker_id: int, process: multiprocessing.Process, conn: Connection):
+        self.id = worker_id
+        self.process = process
+        self.conn = conn
+        self.runs = 0
+        self.rss_mb: Optional[float] = None
+        self.started_at = time.time()
+        self.last_seen = time.monotonic()
+        self.job: Optional[Tuple[int, str, asyncio.Future]] = None
+        # Monotonic time by which the current job must have answered
+        self.deadline: Optional[float] = None
+        self.dead = False
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "pid": self.process.pid,
+            "busy": self.job[1] if self.job else None,
+            "runs": self.runs,
+            "rss_mb": round(self.rss_mb, 1) if self.rss_mb is not None else None,
+            "uptime_seconds": round(time.time() - self.started_at),
+        }
+
+
+class WorkerPool:
+    """
+    Pool of worker processes for workflow runs.
+
+    Each worker runs one workflow at a time and talks to the supervisor
+    over a pipe, which is registered with the event loop (no threads).
+    Workers are recycled after max_runs runs or when their RSS exceeds
+    max_rss_mb; crashed or unresponsive workers are replaced, and the
+    run they were executing fails with WorkerError. Idle workers are
+    pinged; a busy worker cannot answer until its run ends, so a run
+    that takes longer than run_timeout seconds counts as hung.
+
+    Usage:
+        pool = WorkerPool(size=4)
+        await pool.start()
+        summary = await pool.run("inbox-processing", {"file": "..."})
+        pool.close()                      # no new runs, no respawns
+        await pool.stop(drain_timeout=60)
+    """
+
+    MAX_RUNS = 100
+    MAX_RSS_MB = 1024
+    HEALTH_INTERVAL_SECONDS = 30.0
+    # Idle workers that have not answered for this long are replaced
+    UNRESPONSIVE_SECONDS = 90.0
+    STOP_TIMEOUT_SECONDS = 10.0
+    RUN_TIMEOUT_SECONDS = 3600.0
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_runs: int = MAX_RUNS,
+        max_rss_mb: float = MAX_RSS_MB,
+        run_timeout: Optional[float] = RUN_TIMEOUT_SECONDS,
+        start_method: str = "spawn",
+    ):
+        self.size = size or os.cpu_count() or 1
+        self.max_runs = max_runs
+        self.max_rss_mb = max_rss_mb
+        self.run_timeout = run_timeout
+        # spawn: workers do not inherit the supervisor's loop, threads or sockets
+        self._mp = multiprocessing.get_context(start_method)
+
+        self._workers: Dict[int, _Worker] = {}
+        self._idle: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._retiring: Set[asyncio.Task] = set()
+        self._accepting = False
+        self._ids = itertools.count(1)
+        self._jobs = itertools.count(1)
+        self._counters = {"runs": 0, "errors": 0, "recycled": 0, "crashed": 0}
+
+    # ─────────────────────────────────────────────────────────────
+    # LIFECYCLE
+    # ─────────────────────────────────────────────────────────────
+
+    async def start(self):
+        """Spawn the workers and start health checks."""
+        self._loop = asyncio.get_running_loop()
+        self._idle = asyncio.Queue()
+        self._accepting = True
+
+        for _ in range(self.size):
+            self._idle.put_nowait(self._spawn())
+
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    def close(self):
+        """
+        Stop accepting runs.
+
+        Running runs continue; workers that exit or are abandoned from
+        now on are not replaced. Call before cancelling runs on shutdown.
+        """
+        self._accepting = False
+
+    async def stop(self, drain_timeout: float = 60.0):
+        """Stop accepting runs, wait for running ones, then stop the workers."""
+        self.close()
+
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+
+        running = self._busy_jobs()
+        if running:
+            await asyncio.wait(running, timeout=drain_timeout)
+
+        await asyncio.gather(
+            *(self._shutdown(worker) for worker in list(self._workers.values())),
+            *self._retiring,
+            return_exceptions=True,
+        )
+
+    async def run(self, workflow_name: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run a workflow on the next free worker and return its summary."""
+        if not self._accepting:
+            raise WorkerError(workflow_name, "pool is not running")
+
+        worker = await self._acquire()
+        job_id = next(self._jobs)
+        future = self._loop.create_future()
+        worker.job = (job_id, workflow_name, future)
+        if self.run_timeout:
+            worker.deadline = time.monotonic() + self.run_timeout
+
+        try:
+            worker.conn.send(("run", job_id, workflow_name, variables or {}))
+            return await future
+        except asyncio.CancelledError:
+            # The worker keeps running the job; its result is no longer wanted
+            worker.dead = True
+            raise
+        except (OSError, BrokenPipeError) as e:
+            worker.dead = True
+            raise WorkerError(workflow_name, str(e))
+        finally:
+            worker.job = None
+            worker.deadline = None
+            worker.runs += 1
+            self._counters["runs"] += 1
+            self._release(worker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Worker states and lifetime counters."""
+        workers = [w.status() for w in self._workers.values()]
+        return {
+            "size": self.size,
+            "busy": sum(1 for w in workers if w["busy"]),
+            "workers": workers,
+            **self._counters,
+        }
+
+    # ─────────────────────────────────────────────────────────────
+    # INTERNAL METHODS
+    # ─────────────────────────────────────────────────────────────
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._mp.Pipe()
+        process = self._mp.Process(
+            target=_worker_main,
+            args=(child_conn,),
+            name="workflow-worker",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        worker = _Worker(next(self._ids), process, parent_conn)
+        self._workers[worker.id] = worker
+        self._loop.add_reader(parent_conn.fileno(), self._on_readable, worker)
+        return worker
+
+    async def _acquire(self) -> _Worker:
+        while True:
+            worker = await self._idle.get()
+            if not worker.dead and worker.process.is_alive():
+                return worker
+            self._replace(worker, "crashed")
+
+    def _release(self, worker: _Worker):
+        """Return a worker to the idle queue, or replace it if it should retire."""
+        if worker.dead or not worker.process.is_alive():
+            self._replace(worker, "crashed")
+        elif worker.runs >= self.max_runs or (
+            worker.rss_mb is not None and worker.rss_mb > self.max_rss_mb
+        ):
+            self._replace(worker, "recycled")
+        else:
+            self._idle.put_nowait(worker)
+
+    def _replace(self, worker: _Worker, reason: str):
+        """Retire a worker in the background and put a fresh one in its place."""
+        if worker.id not in self._workers:
+            return
+        self._counters[reason] += 1
+        task = asyncio.ensure_future(self._shutdown(worker))
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+        if self._accepting:
+            self._idle.put_nowait(self._spawn())
+
+    async def _shutdown(self, worker: _Worker):
+        """Ask a worker to exit; terminate it if it does not."""
+        self._workers.pop(worker.id, None)
+        self._remove_reader(worker)
+
+        if worker.dead:
+            # Crashed, hung or abandoned mid-run
+            worker.process.terminate()
+        elif worker.process.is_alive():
+            try:
+                worker.conn.send(("stop", None))
+            except OSError:
+                pass
+
+        await asyncio.to_thread(worker.process.join, self.STOP_TIMEOUT_SECONDS)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            await asyncio.to_thread(worker.process.join, self.STOP_TIMEOUT_SECONDS)
+        worker.conn.close()
+
+        if worker.job and not worker.job[2].done():
+            worker.job[2].set_exception(WorkerError(worker.job[1], "worker stopped"))
+
+    def _busy_jobs(self) -> List[asyncio.Future]:
+        return [w.job[2] for w in self._workers.values() if w.job]
+
+    def _remove_reader(self, worker: _Worker):
+        try:
+            self._loop.remove_reader(worker.conn.fileno())
+        except (OSError, ValueError):
+            pass
+
+    def _on_readable(self, worker: _Worker):
+        """Handle replies from a worker (called by the loop)."""
+        try:
+            while worker.conn.poll():
+                kind, job_id, payload, rss = worker.conn.recv()
+                worker.last_seen = time.monotonic()
+                worker.rss_mb = rss
+                if kind == "pong" or not worker.job or worker.job[0] != job_id:
+                    continue
+
+                _, workflow_name, future = worker.job
+                if future.done():
+                    continue
+                if kind == "result":
+                    future.set_result(payload)
+                else:
+                    self._counters["errors"] += 1
+                    future.set_exception(WorkerError(workflow_name, payload))
+        except (EOFError, OSError):
+            self._on_crash(worker)
+
+    def _on_crash(self, worker: _Worker):
+        worker.dead = True
+        self._remove_reader(worker)
+        if worker.job and not worker.job[2].done():
+            exitcode = worker.process.exitcode
+            worker.job[2].set_exception(
+                WorkerError(worker.job[1], f"worker process exited (code {exitcode})")
+            )
+
+    def _on_hung(self, worker: _Worker):
+        """Fail a run that exceeded run_timeout; its worker is replaced on release."""
+        _, workflow_name, future = worker.job
+        if not future.done():
+            future.set_exception(
+                WorkerError(workflow_name, f"run exceeded {self.run_timeout:.0f}s")
+            )
+        worker.dead = True
+        self._remove_reader(worker)
+        worker.process.terminate()
+
+    async def _health_loop(self):
+        """Ping idle workers, fail hung runs and replace dead or unresponsive workers."""
+        # Keeps running while a closed pool drains; stop() cancels it
+        while True:
+            await asyncio.sleep(self.HEALTH_INTERVAL_SECONDS)
+            now = time.monotonic()
+
+            for worker in list(self._workers.values()):
+                if worker.job:
+                    # Busy workers answer after their run
+                    if worker.deadline is not None and now > worker.deadline:
+                        self._on_hung(worker)
+                    continue
+                if worker.dead or not worker.process.is_alive():
+                    worker.dead = True
+                    continue  # Replaced when next acquired
+                if now - worker.last_seen > self.UNRESPONSIVE_SECONDS:
+                    worker.dead = True
+                    worker.process.terminate()
+                    continue
+                try:
+                    worker.conn.send(("ping", None))
+                except OSError:
+                    worker.dead = True